@@ -0,0 +1,48 @@
+"""Add lesson full-text search index (SQLite FTS5 / PostgreSQL tsvector)
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "004"
+down_revision: Union[str, None] = "003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Rows are filled by the app on startup (ensure_search_index) and on lesson writes
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        op.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS lessons_fts "
+            "USING fts5(title, topic, sections, tokenize='unicode61')"
+        )
+    elif dialect == "postgresql":
+        op.execute(
+            "CREATE TABLE IF NOT EXISTS lesson_search ("
+            " lesson_id INTEGER PRIMARY KEY REFERENCES lessons(id) ON DELETE CASCADE,"
+            " title TEXT, topic TEXT, sections TEXT,"
+            " document tsvector GENERATED ALWAYS AS ("
+            "  setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||"
+            "  setweight(to_tsvector('simple', coalesce(topic, '')), 'B') ||"
+            "  setweight(to_tsvector('simple', coalesce(sections, '')), 'C')"
+            " ) STORED)"
+        )
+        op.execute(
+            "CREATE INDEX IF NOT EXISTS ix_lesson_search_document "
+            "ON lesson_search USING GIN (document)"
+        )
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        op.execute("DROP TABLE IF EXISTS lessons_fts")
+    elif dialect == "postgresql":
+        op.execute("DROP TABLE IF EXISTS lesson_search")
@@ -0,0 +1,39 @@
+"""Add lesson_vocabulary (word <-> lesson inverted index)
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "005"
+down_revision: Union[str, None] = "004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Rows are filled by the app on startup (ensure_lesson_vocabulary) and on lesson/vocabulary writes
+    op.create_table(
+        "lesson_vocabulary",
+        sa.Column("lesson_id", sa.Integer(), nullable=False),
+        sa.Column("vocabulary_id", sa.Integer(), nullable=False),
+        sa.Column("occurrences", sa.Integer(), nullable=False, server_default=sa.text("1")),
+        sa.ForeignKeyConstraint(["lesson_id"], ["lessons.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["vocabulary_id"], ["vocabulary.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("lesson_id", "vocabulary_id"),
+    )
+    op.create_index(
+        "ix_lesson_vocabulary_vocabulary_id",
+        "lesson_vocabulary",
+        ["vocabulary_id", "lesson_id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_lesson_vocabulary_vocabulary_id", table_name="lesson_vocabulary")
+    op.drop_table("lesson_vocabulary")
@@ -0,0 +1,49 @@
+"""Add test question analytics rollups
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "006"
+down_revision: Union[str, None] = "005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Backfill from existing answers: python -m scripts.rebuild_item_stats
+    op.create_table(
+        "test_question_stats",
+        sa.Column("question_id", sa.Integer(), nullable=False),
+        sa.Column("test_id", sa.Integer(), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("correct", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("score_sum", sa.Float(), nullable=False, server_default=sa.text("0")),
+        sa.Column("score_sq_sum", sa.Float(), nullable=False, server_default=sa.text("0")),
+        sa.Column("correct_score_sum", sa.Float(), nullable=False, server_default=sa.text("0")),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["question_id"], ["test_questions.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["test_id"], ["tests.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("question_id"),
+    )
+    op.create_index("ix_test_question_stats_test_id", "test_question_stats", ["test_id"])
+    op.create_table(
+        "test_question_option_stats",
+        sa.Column("question_id", sa.Integer(), nullable=False),
+        sa.Column("option", sa.String(255), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.ForeignKeyConstraint(["question_id"], ["test_questions.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("question_id", "option"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("test_question_option_stats")
+    op.drop_index("ix_test_question_stats_test_id", table_name="test_question_stats")
+    op.drop_table("test_question_stats")
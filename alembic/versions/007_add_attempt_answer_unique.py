@@ -0,0 +1,34 @@
+"""Unique (test_attempt_id, question_id) on test_attempt_answers for autosave upserts
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "007"
+down_revision: Union[str, None] = "006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Keep the latest answer per question before adding the constraint
+    op.execute(
+        "DELETE FROM test_attempt_answers WHERE id NOT IN ("
+        " SELECT max_id FROM (SELECT MAX(id) AS max_id FROM test_attempt_answers"
+        " GROUP BY test_attempt_id, question_id) AS latest)"
+    )
+    op.create_index(
+        "uq_test_attempt_answer",
+        "test_attempt_answers",
+        ["test_attempt_id", "question_id"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("uq_test_attempt_answer", table_name="test_attempt_answers")
@@ -0,0 +1,24 @@
+"""Add ability (adaptive testing estimate) to test_attempts
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "008"
+down_revision: Union[str, None] = "007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("test_attempts", sa.Column("ability", sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("test_attempts", "ability")
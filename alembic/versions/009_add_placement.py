@@ -0,0 +1,41 @@
+"""Add placement test: users.placement_level and placement_attempts
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "009"
+down_revision: Union[str, None] = "008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("users", sa.Column("placement_level", sa.String(10), nullable=True))
+    op.create_table(
+        "placement_attempts",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("current_level", sa.String(10), nullable=False),
+        sa.Column("current_question_id", sa.Integer(), nullable=True),
+        sa.Column("level_stats", sa.JSON(), nullable=False),
+        sa.Column("asked", sa.JSON(), nullable=False),
+        sa.Column("result_level", sa.String(10), nullable=True),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("completed_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_placement_attempts_user_id", "placement_attempts", ["user_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_placement_attempts_user_id", table_name="placement_attempts")
+    op.drop_table("placement_attempts")
+    op.drop_column("users", "placement_level")
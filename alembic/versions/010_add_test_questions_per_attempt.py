@@ -0,0 +1,24 @@
+"""Add questions_per_attempt to tests (randomized variants)
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "010"
+down_revision: Union[str, None] = "009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("tests", sa.Column("questions_per_attempt", sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("tests", "questions_per_attempt")
@@ -0,0 +1,57 @@
+"""Add user_exercise_progress rollup
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "011"
+down_revision: Union[str, None] = "010"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user_exercise_progress",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("exercise_id", sa.Integer(), nullable=False),
+        sa.Column("lesson_id", sa.Integer(), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("correct_count", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("first_correct_at", sa.DateTime(), nullable=True),
+        sa.Column("last_attempt_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["exercise_id"], ["exercises.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["lesson_id"], ["lessons.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id", "exercise_id"),
+    )
+    op.create_index(
+        "ix_user_exercise_progress_user_lesson",
+        "user_exercise_progress",
+        ["user_id", "lesson_id"],
+    )
+    # Backfill from attempt history
+    op.execute(
+        """
+        INSERT INTO user_exercise_progress
+            (user_id, exercise_id, lesson_id, attempts, correct_count, first_correct_at, last_attempt_at)
+        SELECT a.user_id, a.exercise_id, e.lesson_id, COUNT(*),
+               SUM(CASE WHEN a.is_correct THEN 1 ELSE 0 END),
+               MIN(CASE WHEN a.is_correct THEN a.created_at END),
+               MAX(a.created_at)
+        FROM exercise_attempts a
+        JOIN exercises e ON e.id = a.exercise_id
+        GROUP BY a.user_id, a.exercise_id, e.lesson_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_user_exercise_progress_user_lesson", table_name="user_exercise_progress")
+    op.drop_table("user_exercise_progress")
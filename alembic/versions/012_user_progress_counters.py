@@ -0,0 +1,55 @@
+"""Add user_progress_counters
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "012"
+down_revision: Union[str, None] = "011"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user_progress_counters",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("lessons_completed", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("exercise_attempts", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("exercise_correct", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("test_attempts", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("test_passed", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("vocabulary_size", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("vocabulary_learned", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+    # Backfill; later drift is repaired by python -m scripts.reconcile_progress
+    op.execute(
+        """
+        INSERT INTO user_progress_counters
+            (user_id, lessons_completed, exercise_attempts, exercise_correct,
+             test_attempts, test_passed, vocabulary_size, vocabulary_learned, updated_at)
+        SELECT u.id,
+               (SELECT COUNT(*) FROM lesson_completions c WHERE c.user_id = u.id),
+               (SELECT COUNT(*) FROM exercise_attempts a WHERE a.user_id = u.id),
+               (SELECT COUNT(*) FROM exercise_attempts a WHERE a.user_id = u.id AND a.is_correct),
+               (SELECT COUNT(*) FROM test_attempts t WHERE t.user_id = u.id),
+               (SELECT COUNT(*) FROM test_attempts t WHERE t.user_id = u.id AND t.passed),
+               (SELECT COUNT(*) FROM user_vocabulary v WHERE v.user_id = u.id),
+               (SELECT COUNT(*) FROM user_vocabulary v WHERE v.user_id = u.id AND v.status = 'learned'),
+               CURRENT_TIMESTAMP
+        FROM users u
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("user_progress_counters")
@@ -0,0 +1,37 @@
+"""Add user_daily_activity rollup
+
+Revision ID: 013
+Revises: 012
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "013"
+down_revision: Union[str, None] = "012"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Backfill from history: python -m scripts.rebuild_daily_activity
+    op.create_table(
+        "user_daily_activity",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("lessons", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("exercises", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("tests", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("reviews", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("minutes", sa.Float(), nullable=False, server_default=sa.text("0")),
+        sa.Column("last_activity_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id", "day"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("user_daily_activity")
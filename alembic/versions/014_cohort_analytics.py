@@ -0,0 +1,92 @@
+"""Add teacher cohort summary tables and aggregation watermarks
+
+Revision ID: 014
+Revises: 013
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "014"
+down_revision: Union[str, None] = "013"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Filled from history by the first run of the cohort-aggregate job
+    op.create_table(
+        "aggregation_watermarks",
+        sa.Column("name", sa.String(100), nullable=False),
+        sa.Column("last_id", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("last_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("name"),
+    )
+    op.create_table(
+        "cohort_lesson_students",
+        sa.Column("lesson_id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("exercise_attempts", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("exercise_correct", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("test_attempts", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("tests_passed", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("test_score_sum", sa.Float(), nullable=False, server_default=sa.text("0")),
+        sa.Column("best_score", sa.Float(), nullable=True),
+        sa.Column("completed", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.ForeignKeyConstraint(["lesson_id"], ["lessons.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("lesson_id", "user_id"),
+    )
+    op.create_index("ix_cohort_lesson_students_user_id", "cohort_lesson_students", ["user_id"])
+    op.create_table(
+        "cohort_lesson_stats",
+        sa.Column("lesson_id", sa.Integer(), nullable=False),
+        sa.Column("students_started", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("students_tested", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("students_passed", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("students_completed", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("exercise_attempts", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("exercise_correct", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("test_attempts", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("test_score_sum", sa.Float(), nullable=False, server_default=sa.text("0")),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["lesson_id"], ["lessons.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("lesson_id"),
+    )
+    op.create_table(
+        "cohort_student_stats",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("lessons_started", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("lessons_completed", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("exercise_attempts", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("exercise_correct", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("test_attempts", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("tests_passed", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("avg_test_score", sa.Float(), nullable=True),
+        sa.Column("vocabulary_size", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("vocabulary_learned", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("last_active_day", sa.Date(), nullable=True),
+        sa.Column("struggle_score", sa.Float(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+    op.create_index("ix_cohort_student_stats_struggle", "cohort_student_stats", ["struggle_score", "user_id"])
+    # Incremental readers of the source tables
+    op.create_index("ix_test_attempts_completed_at", "test_attempts", ["completed_at", "id"])
+    op.create_index("ix_user_progress_counters_updated_at", "user_progress_counters", ["updated_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_user_progress_counters_updated_at", table_name="user_progress_counters")
+    op.drop_index("ix_test_attempts_completed_at", table_name="test_attempts")
+    op.drop_index("ix_cohort_student_stats_struggle", table_name="cohort_student_stats")
+    op.drop_table("cohort_student_stats")
+    op.drop_table("cohort_lesson_stats")
+    op.drop_index("ix_cohort_lesson_students_user_id", table_name="cohort_lesson_students")
+    op.drop_table("cohort_lesson_students")
+    op.drop_table("aggregation_watermarks")
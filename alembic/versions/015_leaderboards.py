@@ -0,0 +1,40 @@
+"""Add daily XP and leaderboard_snapshots
+
+Revision ID: 015
+Revises: 014
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "015"
+down_revision: Union[str, None] = "014"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Backfill daily XP from history: python -m scripts.rebuild_daily_activity
+    op.add_column(
+        "user_daily_activity",
+        sa.Column("xp", sa.Integer(), nullable=False, server_default=sa.text("0")),
+    )
+    op.create_table(
+        "leaderboard_snapshots",
+        sa.Column("board", sa.String(20), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("xp", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("board", "user_id"),
+    )
+    op.create_index("ix_leaderboard_snapshots_board_xp", "leaderboard_snapshots", ["board", "xp"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_leaderboard_snapshots_board_xp", table_name="leaderboard_snapshots")
+    op.drop_table("leaderboard_snapshots")
+    op.drop_column("user_daily_activity", "xp")
@@ -0,0 +1,27 @@
+"""Add recommendations dedupe index
+
+Revision ID: 016
+Revises: 015
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "016"
+down_revision: Union[str, None] = "015"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_recommendations_user_type_lesson",
+        "recommendations",
+        ["user_id", "recommendation_type", "target_lesson_id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_recommendations_user_type_lesson", table_name="recommendations")
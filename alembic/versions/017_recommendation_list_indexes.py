@@ -0,0 +1,25 @@
+"""Add recommendations keyset and unread indexes
+
+Revision ID: 017
+Revises: 016
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "017"
+down_revision: Union[str, None] = "016"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_recommendations_user_created", "recommendations", ["user_id", "created_at", "id"])
+    op.create_index("ix_recommendations_user_is_read", "recommendations", ["user_id", "is_read"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_recommendations_user_is_read", table_name="recommendations")
+    op.drop_index("ix_recommendations_user_created", table_name="recommendations")
@@ -0,0 +1,32 @@
+"""Add logs keyset and filter indexes
+
+Revision ID: 018
+Revises: 017
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "018"
+down_revision: Union[str, None] = "017"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = {
+    "ix_logs_created_at_id": ["created_at", "id"],
+    "ix_logs_user_created": ["user_id", "created_at", "id"],
+    "ix_logs_action_created": ["action", "created_at", "id"],
+    "ix_logs_entity_created": ["entity_type", "created_at", "id"],
+}
+
+
+def upgrade() -> None:
+    for name, columns in INDEXES.items():
+        op.create_index(name, "logs", columns)
+
+
+def downgrade() -> None:
+    for name in INDEXES:
+        op.drop_index(name, table_name="logs")
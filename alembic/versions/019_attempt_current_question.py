@@ -0,0 +1,24 @@
+"""Add current_question_id to test_attempts (adaptive mode)
+
+Revision ID: 019
+Revises: 018
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "019"
+down_revision: Union[str, None] = "018"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("test_attempts", sa.Column("current_question_id", sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("test_attempts", "current_question_id")
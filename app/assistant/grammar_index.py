@@ -0,0 +1,114 @@
+"""
+GRAMMAR_KB rule <-> lesson cross-reference index.
+Maps each rule key to the lessons whose grammar section ("Грамматикалық нүкте") covers it, with scores.
+Built at startup from the lesson store and updated per lesson on lesson writes;
+lookups at request time are dict reads.
+"""
+import math
+
+from app.assistant.rules import GRAMMAR_RULE_TERMS
+from app.lessons.content import parse_lesson_sections, tokenize
+
+# Short terms ("ма", "лар") must match a whole token; longer ones match as token prefix
+_PREFIX_MIN = 4
+
+_lessons: dict[int, dict] = {}  # lesson_id -> {id, title, order_index, rules: {rule_key: score}}
+_by_rule: dict[str, list[dict]] = {}
+_by_lesson: dict[int, list[tuple[str, float]]] = {}
+
+
+def _grammar_tokens(content: str) -> list[str]:
+    tokens = []
+    for heading, body in parse_lesson_sections(content or ""):
+        if "грамматик" in heading.lower():
+            tokens.extend(tokenize(body))
+    return tokens
+
+
+def _term_count(term: str, tokens: list[str]) -> int:
+    words = tokenize(term)
+    counts = []
+    for w in words:
+        if len(w) < _PREFIX_MIN:
+            counts.append(sum(1 for t in tokens if t == w))
+        else:
+            counts.append(sum(1 for t in tokens if t.startswith(w)))
+    return min(counts) if counts else 0
+
+
+def score_lesson_rules(content: str) -> dict[str, float]:
+    """Rule key -> coverage score for one lesson's grammar section. Rules not covered are omitted."""
+    tokens = _grammar_tokens(content)
+    if not tokens:
+        return {}
+    out = {}
+    for rule_key, terms in GRAMMAR_RULE_TERMS.items():
+        score = sum(math.log1p(_term_count(t, tokens)) for t in terms)
+        if score > 0:
+            out[rule_key] = round(score, 3)
+    return out
+
+
+def _reindex() -> None:
+    """Rebuild rule/lesson lookups and curriculum numbers from the in-memory lesson entries."""
+    global _by_rule, _by_lesson
+    ordered = sorted(
+        _lessons.values(),
+        key=lambda les: (les["order_index"] if les["order_index"] is not None else 999999, les["id"]),
+    )
+    by_rule: dict[str, list[dict]] = {}
+    by_lesson: dict[int, list[tuple[str, float]]] = {}
+    for number, les in enumerate(ordered, 1):
+        for rule_key, score in les["rules"].items():
+            by_rule.setdefault(rule_key, []).append(
+                {"lesson_id": les["id"], "title": les["title"], "number": number, "score": score}
+            )
+        by_lesson[les["id"]] = sorted(les["rules"].items(), key=lambda x: -x[1])
+    for refs in by_rule.values():
+        refs.sort(key=lambda r: (-r["score"], r["number"]))
+    _by_rule, _by_lesson = by_rule, by_lesson
+
+
+def _entry(lesson: dict) -> dict:
+    return {
+        "id": lesson["id"],
+        "title": lesson.get("title", ""),
+        "order_index": lesson.get("order_index"),
+        "rules": score_lesson_rules(lesson.get("content") or ""),
+    }
+
+
+def build_grammar_index(lessons: list[dict]) -> None:
+    """(Re)build the index from all lessons (dicts with id, title, order_index, content)."""
+    _lessons.clear()
+    for lesson in lessons:
+        _lessons[lesson["id"]] = _entry(lesson)
+    _reindex()
+
+
+def index_lesson(lesson: dict) -> None:
+    """Re-score one lesson after it was created or edited."""
+    _lessons[lesson["id"]] = _entry(lesson)
+    _reindex()
+
+
+def remove_lesson(lesson_id: int) -> None:
+    """Drop a deleted lesson."""
+    if _lessons.pop(lesson_id, None) is not None:
+        _reindex()
+
+
+def lessons_for_rule(rule_key: str, limit: int = 3, exclude_lesson_id: int | None = None) -> list[dict]:
+    """
+    Lessons covering a rule, best first: [{lesson_id, title, number, score}].
+    `number` is the 1-based curriculum position ("урок N").
+    """
+    refs = _by_rule.get(rule_key, [])
+    if exclude_lesson_id is not None:
+        refs = [r for r in refs if r["lesson_id"] != exclude_lesson_id]
+    return refs[:limit]
+
+
+def rules_for_lesson(lesson_id: int) -> list[tuple[str, float]]:
+    """Rules covered by a lesson's grammar section as (rule_key, score), best first."""
+    return _by_lesson.get(lesson_id, [])
@@ -0,0 +1,176 @@
+"""
+In-memory BM25 retrieval over lesson sections and GRAMMAR_KB entries.
+Used by the assistant when intent is unknown: the best passage is returned with its source.
+Built at startup; lesson passages are replaced on lesson create/update/delete.
+"""
+import math
+from bisect import bisect_left
+
+from app.assistant.rules import GRAMMAR_KB
+from app.lessons.content import parse_lesson_sections, tokenize
+from app.lessons.search_service import query_terms, stem_token
+
+# Lesson sections that carry no answerable content
+SKIP_SECTIONS = ("Оқу мақсаты", "Тәжірибеде қолдану")
+# Below this score a hit is noise (one common word matched) — keep FALLBACK
+MIN_SCORE = 2.0
+MAX_PREFIX_EXPANSION = 20
+
+
+def _doc_terms(text: str) -> list[str]:
+    return [stem_token(t) for t in tokenize(text) if len(t) >= 2]
+
+
+class BM25Index:
+    """
+    Okapi BM25 with precomputed sparse term weights:
+    postings[term] = [(doc_idx, weight)], weight = idf * tf*(k1+1) / (tf + k1*(1-b+b*dl/avgdl)).
+    A query is a sum over the postings of its terms; prefix terms expand via a sorted term list.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._docs: dict[str, dict] = {}  # passage id -> passage (with term freqs)
+        self._order: list[str] = []
+        self._postings: dict[str, list[tuple[int, float]]] = {}
+        self._terms: list[str] = []
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def set_passages(self, passages: list[dict]) -> None:
+        """Replace all passages."""
+        self._docs = {}
+        for p in passages:
+            self._add(p)
+        self._reweight()
+
+    def replace_group(self, group: str, passages: list[dict]) -> None:
+        """Replace passages of one group (e.g. "lesson:5") and recompute weights."""
+        self._docs = {pid: d for pid, d in self._docs.items() if d["group"] != group}
+        for p in passages:
+            self._add(p)
+        self._reweight()
+
+    def _add(self, passage: dict) -> None:
+        tf: dict[str, int] = {}
+        terms = _doc_terms(f"{passage.get('title', '')} {passage['text']}")
+        for t in terms:
+            tf[t] = tf.get(t, 0) + 1
+        self._docs[passage["id"]] = {**passage, "_tf": tf, "_len": len(terms)}
+
+    def _reweight(self) -> None:
+        self._order = list(self._docs)
+        n = len(self._order)
+        if not n:
+            self._postings, self._terms = {}, []
+            return
+        avgdl = sum(self._docs[pid]["_len"] for pid in self._order) / n or 1.0
+        df: dict[str, int] = {}
+        for pid in self._order:
+            for t in self._docs[pid]["_tf"]:
+                df[t] = df.get(t, 0) + 1
+        idf = {t: math.log(1 + (n - c + 0.5) / (c + 0.5)) for t, c in df.items()}
+        postings: dict[str, list[tuple[int, float]]] = {}
+        for idx, pid in enumerate(self._order):
+            doc = self._docs[pid]
+            norm = self.k1 * (1 - self.b + self.b * doc["_len"] / avgdl)
+            for t, f in doc["_tf"].items():
+                w = idf[t] * f * (self.k1 + 1) / (f + norm)
+                postings.setdefault(t, []).append((idx, w))
+        self._postings = postings
+        self._terms = sorted(postings)
+
+    def _expand(self, term: str) -> list[str]:
+        """Index terms starting with `term` (exact term first)."""
+        i = bisect_left(self._terms, term)
+        out = []
+        while i < len(self._terms) and self._terms[i].startswith(term) and len(out) < MAX_PREFIX_EXPANSION:
+            out.append(self._terms[i])
+            i += 1
+        return out
+
+    def search(self, query: str, limit: int = 3) -> list[tuple[dict, float]]:
+        """Top passages for a query as (passage, score), best first."""
+        scores: dict[int, float] = {}
+        for qt in query_terms(query):
+            for word in qt.split():
+                # A prefix may hit several inflections of one word: count the best one per doc
+                best: dict[int, float] = {}
+                for term in self._expand(word):
+                    for idx, w in self._postings[term]:
+                        if w > best.get(idx, 0.0):
+                            best[idx] = w
+                for idx, w in best.items():
+                    scores[idx] = scores.get(idx, 0.0) + w
+        top = sorted(scores.items(), key=lambda x: -x[1])[:limit]
+        out = []
+        for idx, score in top:
+            doc = self._docs[self._order[idx]]
+            out.append(({k: v for k, v in doc.items() if not k.startswith("_")}, score))
+        return out
+
+
+def lesson_passages(lesson: dict) -> list[dict]:
+    """Passages for one lesson: one per content section."""
+    out = []
+    for i, (heading, body) in enumerate(parse_lesson_sections(lesson.get("content") or "")):
+        if any(s in heading for s in SKIP_SECTIONS) or len(body) < 20:
+            continue
+        out.append({
+            "id": f"lesson:{lesson['id']}:{i}",
+            "group": f"lesson:{lesson['id']}",
+            "source": "lesson",
+            "lesson_id": lesson["id"],
+            "title": lesson.get("title", ""),
+            "section": heading,
+            "text": body,
+        })
+    return out
+
+
+def grammar_passages() -> list[dict]:
+    """Passages for GRAMMAR_KB rules."""
+    return [
+        {
+            "id": f"grammar:{key}",
+            "group": "grammar",
+            "source": "grammar_rule",
+            "rule_key": key,
+            "title": key,
+            "section": "",
+            "text": rule["explanation"] + "\n" + "\n".join(rule.get("examples", [])),
+        }
+        for key, rule in GRAMMAR_KB.items()
+    ]
+
+
+_index = BM25Index()
+
+
+def build_retrieval_index(lessons: list[dict]) -> None:
+    """(Re)build the index from all lessons + GRAMMAR_KB."""
+    passages = grammar_passages()
+    for lesson in lessons:
+        passages.extend(lesson_passages(lesson))
+    _index.set_passages(passages)
+
+
+def index_lesson(lesson: dict) -> None:
+    """Replace one lesson's passages."""
+    _index.replace_group(f"lesson:{lesson['id']}", lesson_passages(lesson))
+
+
+def remove_lesson(lesson_id: int) -> None:
+    """Drop one lesson's passages."""
+    _index.replace_group(f"lesson:{lesson_id}", [])
+
+
+def find_passage(query: str) -> dict | None:
+    """Best passage for a free-form question, or None when nothing scores above MIN_SCORE."""
+    hits = _index.search(query, limit=1)
+    if not hits or hits[0][1] < MIN_SCORE:
+        return None
+    passage, score = hits[0]
+    return {**passage, "score": round(score, 3)}
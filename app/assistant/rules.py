@@ -113,6 +113,19 @@ GRAMMAR_KB: dict[str, dict] = {
     },
 }
 
+# Terms that mark a lesson's grammar section as covering a GRAMMAR_KB rule (Kazakh + Russian).
+# Multi-word terms match when all words occur. Used to build the rule -> lessons index.
+GRAMMAR_RULE_TERMS: dict[str, list[str]] = {
+    "word_order": ["сөз тәртібі", "порядок слов", "бастауыш", "баяндауыш", "толықтауыш", "подлежащее", "сказуемое"],
+    "sen_siz": ["сіз", "сен", "сіздің", "формальдылық", "құрмет", "вежливый"],
+    "present_endings": ["осы шақ", "настоящее время", "жіктік", "мын", "мін", "пын", "сың", "сің"],
+    "plural": ["көптік", "множественное", "лар", "лер", "тар", "тер"],
+    "question_particles": ["сұраулық", "шылау", "ма", "ме", "ба", "бе", "вопросительн"],
+    "cases_intro": ["септік", "падеж", "барыс", "жатыс", "табыс", "шығыс", "көмектес", "ілік", "жер-мекен"],
+    "negation_intro": ["болымсыз", "отрицание", "емес", "жоқ"],
+    "affixes": ["жалғау", "жұрнақ", "аффикс", "суффикс", "окончание"],
+}
+
 # Legacy A1_GRAMMAR_RULES for backward compatibility (maps to GRAMMAR_KB)
 A1_GRAMMAR_RULES: dict[str, dict] = {
     "word_order": {"explanation": GRAMMAR_KB["word_order"]["explanation"], "example": GRAMMAR_KB["word_order"]["examples"][0]},
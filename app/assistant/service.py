@@ -16,7 +16,10 @@ from app.assistant.rules import (
     TEST_MODE_RESPONSE,
     FALLBACK,
 )
-from app.lessons.service import get_lesson_for_assistant, get_lesson_by_order_index
+from app.assistant.retrieval import find_passage
+from app.assistant.grammar_index import lessons_for_rule
+from app.vocabulary.lesson_index import lessons_for_word
+from app.lessons.service import get_lesson_for_assistant, get_lesson_by_order_index, find_lesson_by_topic
 from app.vocabulary.service import lookup_word, get_user_vocab_status, get_mentioned_words_in_text
 
 logger = logging.getLogger(__name__)
@@ -57,6 +60,12 @@ def _detect_intent(message: str) -> str:
     ):
         return "lesson_explanation"
 
+    # "Объясни урок про падежи", "урок о числах" — lesson_explanation по теме
+    if parse_lesson_topic(message or "") and not any(
+        kw in msg_lower for kw in INTENT_PATTERNS["lesson_errors"]
+    ):
+        return "lesson_explanation"
+
     for intent in INTENT_PRIORITY:
         keywords = INTENT_PATTERNS.get(intent, [])
         for kw in keywords:
@@ -100,6 +109,27 @@ def parse_lesson_number(message: str) -> int | None:
     return None
 
 
+def parse_lesson_topic(message: str) -> str | None:
+    """
+    Extract lesson topic from message.
+    Supports: "урок про падежи", "объясни урок о числах", "урок на тему семья", "сабақ туралы ...".
+    Returns topic text or None.
+    """
+    msg = message.strip()
+    patterns = [
+        r"урок\w*\s+(?:про|о|об|по|на тему)\s+(.+)",
+        r"(.+?)\s+туралы\s+сабақ",
+        r"сабақ\w*\s+(.+?)\s+туралы",
+    ]
+    for pat in patterns:
+        m = re.search(pat, msg, re.I)
+        if m:
+            topic = m.group(1).strip(" ?!.«»\"")
+            if len(topic) >= 3:
+                return topic
+    return None
+
+
 # Spelling variants: common user typos -> correct Kazakh form
 SPELLING_VARIANTS: dict[str, str] = {
     "рахмет": "рақмет",
@@ -409,8 +439,12 @@ async def _build_vocabulary_response(
         parts.append("Можете добавить в личный словарь в разделе «Словарь».")
         suggestion = ["Добавить в словарь"]
 
-    if lesson:
+    in_lessons = await lessons_for_word(db, vocab["id"], limit=4)
+    if lesson and any(les["id"] == lesson["id"] for les in in_lessons):
         parts.insert(1, f"Урок «{lesson['title']}» также содержит это слово.")
+    other = [les for les in in_lessons if not lesson or les["id"] != lesson["id"]][:3]
+    if other:
+        parts.append("Встречается в уроках: " + ", ".join(f"«{les['title']}»" for les in other) + ".")
 
     return " ".join(parts), suggestion
 
@@ -431,6 +465,15 @@ def _build_general_grammar_summary() -> str:
     return "\n".join(parts)
 
 
+def _rule_lesson_refs(rule_key: str, lesson: dict | None) -> tuple[str, list[str]]:
+    """'См. также: урок N «...»' line + suggestion for lessons that cover the rule."""
+    refs = lessons_for_rule(rule_key, limit=2, exclude_lesson_id=(lesson or {}).get("id"))
+    if not refs:
+        return "", []
+    line = "\n\nСм. также: " + ", ".join(f"урок {r['number']} «{r['title']}»" for r in refs)
+    return line, [f"Объясни {refs[0]['number']} урок"]
+
+
 async def _build_grammar_response(
     db: AsyncSession,
     message: str,
@@ -470,7 +513,8 @@ async def _build_grammar_response(
             from_lesson = lesson_block.strip() + "\n\n**Дополнительно (A1):** " + rule.get("explanation", "")
             if ex_str:
                 from_lesson += "\n\nПримеры:\n" + ex_str
-            return from_lesson, [f"Объясни урок «{lesson['title']}»", "Какие ошибки в этом уроке?"]
+            refs_line, refs_suggestions = _rule_lesson_refs(rule_key, lesson)
+            return from_lesson + refs_line, [f"Объясни урок «{lesson['title']}»", "Какие ошибки в этом уроке?"] + refs_suggestions
 
     # Только урок (грамматика урока)
     if lesson_content and lesson:
@@ -496,7 +540,10 @@ async def _build_grammar_response(
         parts.append(f"\nПримеры:\n{examples_str}")
 
     suggestion = ["Объясни этот урок", "Какие ошибки в этом уроке?"] if lesson else ["Объясни 1 урок", "Объясни грамматику", "Какой порядок слов в казахском?"]
-    return "\n".join(parts), suggestion
+    refs_line, refs_suggestions = _rule_lesson_refs(rule_key, lesson)
+    if refs_suggestions and not lesson:
+        suggestion = refs_suggestions + suggestion[1:]
+    return "\n".join(parts) + refs_line, suggestion
 
 
 async def _build_error_response(
@@ -539,6 +586,18 @@ async def _build_general_help_response(
     )
 
 
+def _build_retrieval_response(passage: dict, max_chars: int = 500) -> tuple[str, list[str]]:
+    """Answer with the best retrieved passage, citing where it comes from."""
+    body = passage["text"]
+    body = body[:max_chars] + ("..." if len(body) > max_chars else "")
+    if passage["source"] == "lesson":
+        section = f" (раздел «{passage['section']}»)" if passage.get("section") else ""
+        text = f"**Из урока «{passage['title']}»**{section}:\n{body}"
+        return text, [f"Объясни урок «{passage['title']}»", "Какие ошибки в этом уроке?", "Объясни грамматику"]
+    text = f"Правило грамматики (A1): {body}"
+    return text, ["Объясни грамматику", "Какой порядок слов в казахском?"]
+
+
 async def process_message(
     db: AsyncSession,
     user_id: int,
@@ -582,8 +641,11 @@ async def process_message(
     lesson = await _get_lesson_data(db, lesson_id) if lesson_id else None
     if not lesson and intent in ("lesson_explanation", "grammar_question", "lesson_errors"):
         lesson_num = parse_lesson_number(msg)
+        lesson_topic = parse_lesson_topic(msg)
         if lesson_num:
             lesson = await get_lesson_by_order_index(db, lesson_num)
+        elif lesson_topic:
+            lesson = await find_lesson_by_topic(db, lesson_topic)
 
     source_knowledge = "grammar_rule"
 
@@ -597,6 +659,8 @@ async def process_message(
                 lesson = await get_lesson_by_order_index(db, lesson_num)
                 used_source = f"order_index({lesson_num})" if lesson else f"order_index({lesson_num}, not_found)"
                 resolved_lesson_id = (lesson or {}).get("id")
+            elif parse_lesson_topic(msg):
+                used_source = "search(not_found)"
             else:
                 used_source = "parse_failed"
         logger.info(
@@ -692,6 +756,14 @@ async def process_message(
         logger.info("assistant: intent=%s source=grammar_rule", intent)
         return _r(text, suggestions, "grammar_rule")
 
-    # unknown — improved fallback
+    # unknown — search lesson sections / GRAMMAR_KB before the static fallback
+    passage = find_passage(msg)
+    if passage:
+        text, suggestions = _build_retrieval_response(passage)
+        logger.info(
+            "assistant: intent=unknown->retrieval source=%s passage=%s score=%s",
+            passage["source"], passage["id"], passage["score"],
+        )
+        return _r(text, suggestions, passage["source"], None, passage.get("rule_key"))
     logger.info("assistant: intent=unknown source=grammar_rule")
     return _r(FALLBACK, FALLBACK_SUGGESTIONS, "grammar_rule")
@@ -1,17 +1,23 @@
 """Auth API routes."""
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
 from app.auth.schemas import UserRegister, UserLogin, Token
 from app.auth.service import register_user, authenticate_user, create_token_for_user
+from app.logging_mod.service import log_action
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
+def _client_ip(request: Request) -> str | None:
+    return request.client.host if request.client else None
+
+
 @router.post("/register", response_model=Token)
 async def register(
     data: UserRegister,
+    request: Request,
     db: AsyncSession = Depends(get_db),
 ):
     """Register new user."""
@@ -22,6 +28,7 @@ async def register(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e),
         )
+    log_action(user.id, "register", "user", user.id, ip_address=_client_ip(request))
     token = create_token_for_user(user)
     return Token(access_token=token)
 
@@ -29,11 +36,13 @@ async def register(
 @router.post("/login", response_model=Token)
 async def login(
     data: UserLogin,
+    request: Request,
     db: AsyncSession = Depends(get_db),
 ):
     """Login and get JWT token."""
     user = await authenticate_user(db, data)
     if not user:
+        log_action(None, "login_failed", details=data.email, ip_address=_client_ip(request))
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password",
@@ -43,5 +52,6 @@ async def login(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="User is inactive",
         )
+    log_action(user.id, "login", "user", user.id, ip_address=_client_ip(request))
     token = create_token_for_user(user)
     return Token(access_token=token)
@@ -0,0 +1 @@
+# Teacher cohort analytics module
@@ -0,0 +1,379 @@
+"""
+Incremental aggregation of student activity into the cohort summary tables.
+Each run reads only source rows past its watermarks (exercise attempts and lesson
+completions by id, completed test attempts by (completed_at, id), progress counters
+by updated_at), adds them to cohort_lesson_students and recomputes the lesson and
+student summaries touched by those rows. Each chunk is committed together with its
+watermark and recomputed summaries, so every source row is counted once and no
+summary is left stale by an interrupted run. Rows younger than SETTLE_SECONDS are
+left for the next run, so transactions still in flight are not skipped.
+"""
+import logging
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, delete, func, case, or_, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import async_session_maker, dialect_insert
+from app.models.cohort import (
+    AggregationWatermark,
+    CohortLessonStudent,
+    CohortLessonStats,
+    CohortStudentStats,
+)
+from app.models.exercise import Exercise, ExerciseAttempt
+from app.models.lesson import LessonCompletion
+from app.models.progress import UserProgressCounters, UserDailyActivity
+from app.models.test import Test, TestAttempt
+from app.models.user import User, UserRole
+
+logger = logging.getLogger(__name__)
+
+CHUNK_ROWS = 10_000
+RECOMPUTE_CHUNK = 500
+SETTLE_SECONDS = 5
+# Struggle score: 100 - mean(exercise accuracy %, average test score)
+MIN_EXERCISE_ATTEMPTS = 5
+STRUGGLING_THRESHOLD = 40.0
+
+_INCREMENT_FIELDS = (
+    "exercise_attempts",
+    "exercise_correct",
+    "test_attempts",
+    "tests_passed",
+    "test_score_sum",
+    "completed",
+)
+
+
+def struggle_score(
+    exercise_attempts: int, exercise_correct: int, test_attempts: int, avg_test_score: float | None
+) -> float | None:
+    """0 (doing well) .. 100 (failing everything); None without enough evidence."""
+    signals = []
+    if exercise_attempts >= MIN_EXERCISE_ATTEMPTS:
+        signals.append(100.0 * exercise_correct / exercise_attempts)
+    if test_attempts and avg_test_score is not None:
+        signals.append(avg_test_score)
+    if not signals:
+        return None
+    return round(100.0 - sum(signals) / len(signals), 1)
+
+
+async def get_watermark(db: AsyncSession, name: str) -> AggregationWatermark:
+    """The named watermark row, added to the session (last_id 0) if missing."""
+    wm = await db.get(AggregationWatermark, name)
+    if wm is None:
+        wm = AggregationWatermark(name=name, last_id=0)
+        db.add(wm)
+    return wm
+
+
+def _greatest(db: AsyncSession, a, b):
+    if db.bind.dialect.name == "postgresql":
+        return func.greatest(a, b)
+    return func.max(a, b)
+
+
+async def _add_increments(db: AsyncSession, increments: dict[tuple[int, int], dict]) -> None:
+    if not increments:
+        return
+    rows = [
+        {"lesson_id": lesson_id, "user_id": user_id, **dict.fromkeys(_INCREMENT_FIELDS, 0), "best_score": None, **inc}
+        for (lesson_id, user_id), inc in sorted(increments.items())
+    ]
+    stmt = dialect_insert(db, CohortLessonStudent)
+    col, new = CohortLessonStudent, stmt.excluded
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["lesson_id", "user_id"],
+        set_={
+            **{name: getattr(col, name) + getattr(new, name) for name in _INCREMENT_FIELDS if name != "completed"},
+            "completed": _greatest(db, col.completed, new.completed),
+            "best_score": _greatest(
+                db, func.coalesce(col.best_score, new.best_score), func.coalesce(new.best_score, col.best_score)
+            ),
+        },
+    )
+    await db.execute(stmt, rows)
+
+
+def _bump(increments: dict, lesson_id: int, user_id: int, **values) -> None:
+    inc = increments.setdefault((lesson_id, user_id), {})
+    for name, value in values.items():
+        if name == "best_score":
+            if value is not None and (inc.get(name) is None or value > inc[name]):
+                inc[name] = value
+        else:
+            inc[name] = inc.get(name, 0) + value
+
+
+_is_student = User.role == UserRole.STUDENT
+
+
+async def _ingest_exercise_attempts(db: AsyncSession, cutoff: datetime, touched: tuple[set, set]) -> int:
+    wm = await get_watermark(db, "cohort.exercise_attempts")
+    rows = (
+        await db.execute(
+            select(ExerciseAttempt.id, ExerciseAttempt.user_id, Exercise.lesson_id, ExerciseAttempt.is_correct, _is_student)
+            .join(Exercise, Exercise.id == ExerciseAttempt.exercise_id)
+            .join(User, User.id == ExerciseAttempt.user_id)
+            .where(ExerciseAttempt.id > wm.last_id, ExerciseAttempt.created_at <= cutoff)
+            .order_by(ExerciseAttempt.id)
+            .limit(CHUNK_ROWS)
+        )
+    ).all()
+    increments: dict = {}
+    for _, user_id, lesson_id, is_correct, is_student in rows:
+        if is_student:
+            _bump(increments, lesson_id, user_id, exercise_attempts=1, exercise_correct=int(bool(is_correct)))
+    await _add_increments(db, increments)
+    if rows:
+        wm.last_id = rows[-1][0]
+    touched[0].update(k[0] for k in increments)
+    touched[1].update(k[1] for k in increments)
+    return len(rows)
+
+
+async def _ingest_test_attempts(db: AsyncSession, cutoff: datetime, touched: tuple[set, set]) -> int:
+    wm = await get_watermark(db, "cohort.test_attempts")
+    q = (
+        select(TestAttempt.id, TestAttempt.completed_at, TestAttempt.user_id, Test.lesson_id, TestAttempt.score, TestAttempt.passed, _is_student)
+        .join(Test, Test.id == TestAttempt.test_id)
+        .join(User, User.id == TestAttempt.user_id)
+        .where(TestAttempt.completed_at.is_not(None), TestAttempt.completed_at <= cutoff)
+        .order_by(TestAttempt.completed_at, TestAttempt.id)
+        .limit(CHUNK_ROWS)
+    )
+    if wm.last_at is not None:
+        q = q.where(
+            or_(
+                TestAttempt.completed_at > wm.last_at,
+                and_(TestAttempt.completed_at == wm.last_at, TestAttempt.id > wm.last_id),
+            )
+        )
+    rows = (await db.execute(q)).all()
+    increments: dict = {}
+    for _, _, user_id, lesson_id, score, passed, is_student in rows:
+        if is_student:
+            _bump(
+                increments, lesson_id, user_id,
+                test_attempts=1, tests_passed=int(bool(passed)), test_score_sum=score or 0.0, best_score=score,
+            )
+    await _add_increments(db, increments)
+    if rows:
+        wm.last_id, wm.last_at = rows[-1][0], rows[-1][1]
+    touched[0].update(k[0] for k in increments)
+    touched[1].update(k[1] for k in increments)
+    return len(rows)
+
+
+async def _ingest_completions(db: AsyncSession, cutoff: datetime, touched: tuple[set, set]) -> int:
+    wm = await get_watermark(db, "cohort.lesson_completions")
+    rows = (
+        await db.execute(
+            select(LessonCompletion.id, LessonCompletion.user_id, LessonCompletion.lesson_id, _is_student)
+            .join(User, User.id == LessonCompletion.user_id)
+            .where(LessonCompletion.id > wm.last_id, LessonCompletion.completed_at <= cutoff)
+            .order_by(LessonCompletion.id)
+            .limit(CHUNK_ROWS)
+        )
+    ).all()
+    increments: dict = {}
+    for _, user_id, lesson_id, is_student in rows:
+        if is_student:
+            _bump(increments, lesson_id, user_id, completed=1)
+    await _add_increments(db, increments)
+    if rows:
+        wm.last_id = rows[-1][0]
+    touched[0].update(k[0] for k in increments)
+    touched[1].update(k[1] for k in increments)
+    return len(rows)
+
+
+async def _counter_updates(db: AsyncSession, cutoff: datetime) -> set[int]:
+    """Students whose progress counters (vocabulary etc.) changed since the last run."""
+    wm = await get_watermark(db, "cohort.progress_counters")
+    q = (
+        select(UserProgressCounters.user_id)
+        .join(User, User.id == UserProgressCounters.user_id)
+        .where(UserProgressCounters.updated_at <= cutoff, _is_student)
+    )
+    if wm.last_at is not None:
+        q = q.where(UserProgressCounters.updated_at > wm.last_at)
+    users = set((await db.execute(q)).scalars().all())
+    wm.last_at = cutoff
+    return users
+
+
+def _chunks(ids: set[int]) -> list[list[int]]:
+    ordered = sorted(ids)
+    return [ordered[i:i + RECOMPUTE_CHUNK] for i in range(0, len(ordered), RECOMPUTE_CHUNK)]
+
+
+async def _recompute_lessons(db: AsyncSession, lesson_ids: set[int]) -> None:
+    cls = CohortLessonStudent
+    for chunk in _chunks(lesson_ids):
+        result = await db.execute(
+            select(
+                cls.lesson_id,
+                func.count(),
+                func.sum(case((cls.test_attempts > 0, 1), else_=0)),
+                func.sum(case((cls.tests_passed > 0, 1), else_=0)),
+                func.sum(cls.completed),
+                func.sum(cls.exercise_attempts),
+                func.sum(cls.exercise_correct),
+                func.sum(cls.test_attempts),
+                func.sum(cls.test_score_sum),
+            )
+            .where(cls.lesson_id.in_(chunk))
+            .group_by(cls.lesson_id)
+        )
+        now = datetime.utcnow()
+        rows = [
+            {
+                "lesson_id": r[0],
+                "students_started": r[1],
+                "students_tested": r[2] or 0,
+                "students_passed": r[3] or 0,
+                "students_completed": r[4] or 0,
+                "exercise_attempts": r[5] or 0,
+                "exercise_correct": r[6] or 0,
+                "test_attempts": r[7] or 0,
+                "test_score_sum": r[8] or 0.0,
+                "updated_at": now,
+            }
+            for r in result.all()
+        ]
+        if rows:
+            stmt = dialect_insert(db, CohortLessonStats)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["lesson_id"],
+                set_={k: getattr(stmt.excluded, k) for k in rows[0] if k != "lesson_id"},
+            )
+            await db.execute(stmt, rows)
+
+
+async def _recompute_students(db: AsyncSession, user_ids: set[int]) -> None:
+    cls = CohortLessonStudent
+    for chunk in _chunks(user_ids):
+        rows = {
+            uid: {
+                "user_id": uid,
+                "lessons_started": 0,
+                "lessons_completed": 0,
+                "exercise_attempts": 0,
+                "exercise_correct": 0,
+                "test_attempts": 0,
+                "tests_passed": 0,
+                "avg_test_score": None,
+                "vocabulary_size": 0,
+                "vocabulary_learned": 0,
+                "last_active_day": None,
+            }
+            for uid in chunk
+        }
+        lessons = await db.execute(
+            select(
+                cls.user_id,
+                func.count(),
+                func.sum(cls.completed),
+                func.sum(cls.exercise_attempts),
+                func.sum(cls.exercise_correct),
+                func.sum(cls.test_attempts),
+                func.sum(cls.tests_passed),
+                func.sum(cls.test_score_sum),
+            )
+            .where(cls.user_id.in_(chunk))
+            .group_by(cls.user_id)
+        )
+        for uid, started, completed, ex_n, ex_ok, t_n, t_ok, score_sum in lessons.all():
+            rows[uid].update(
+                lessons_started=started,
+                lessons_completed=completed or 0,
+                exercise_attempts=ex_n or 0,
+                exercise_correct=ex_ok or 0,
+                test_attempts=t_n or 0,
+                tests_passed=t_ok or 0,
+                avg_test_score=round(score_sum / t_n, 2) if t_n else None,
+            )
+        counters = await db.execute(
+            select(
+                UserProgressCounters.user_id,
+                UserProgressCounters.vocabulary_size,
+                UserProgressCounters.vocabulary_learned,
+            ).where(UserProgressCounters.user_id.in_(chunk))
+        )
+        for uid, size, learned in counters.all():
+            rows[uid].update(vocabulary_size=size, vocabulary_learned=learned)
+        days = await db.execute(
+            select(UserDailyActivity.user_id, func.max(UserDailyActivity.day))
+            .where(UserDailyActivity.user_id.in_(chunk))
+            .group_by(UserDailyActivity.user_id)
+        )
+        for uid, day in days.all():
+            rows[uid]["last_active_day"] = day
+
+        now = datetime.utcnow()
+        values = []
+        for uid in chunk:
+            r = rows[uid]
+            r["struggle_score"] = struggle_score(
+                r["exercise_attempts"], r["exercise_correct"], r["test_attempts"], r["avg_test_score"]
+            )
+            r["updated_at"] = now
+            values.append(r)
+        stmt = dialect_insert(db, CohortStudentStats)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["user_id"],
+            set_={k: getattr(stmt.excluded, k) for k in values[0] if k != "user_id"},
+        )
+        await db.execute(stmt, values)
+
+
+async def aggregate_cohort(db: AsyncSession) -> dict:
+    """
+    Process everything new since the last run, committing chunk by chunk. Each chunk
+    recomputes the summaries it touched in the transaction that moves its watermark,
+    so a run cancelled midway leaves nothing to catch up on.
+    Returns {source_rows, lessons, students} processed.
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=SETTLE_SECONDS)
+    lesson_ids: set[int] = set()
+    user_ids: set[int] = set()
+    processed = 0
+    for ingest in (_ingest_exercise_attempts, _ingest_test_attempts, _ingest_completions):
+        while True:
+            touched: tuple[set, set] = (set(), set())
+            n = await ingest(db, cutoff, touched)
+            await _recompute_lessons(db, touched[0])
+            await _recompute_students(db, touched[1])
+            await db.commit()
+            processed += n
+            lesson_ids |= touched[0]
+            user_ids |= touched[1]
+            if n < CHUNK_ROWS:
+                break
+    changed = await _counter_updates(db, cutoff)
+    await _recompute_students(db, changed)
+    await db.commit()
+    user_ids |= changed
+    return {"source_rows": processed, "lessons": len(lesson_ids), "students": len(user_ids)}
+
+
+async def rebuild_cohort(db: AsyncSession) -> dict:
+    """Drop the summaries and watermarks and aggregate all history again."""
+    for model in (CohortStudentStats, CohortLessonStats, CohortLessonStudent, AggregationWatermark):
+        q = delete(model)
+        if model is AggregationWatermark:
+            q = q.where(AggregationWatermark.name.like("cohort.%"))
+        await db.execute(q)
+    await db.commit()
+    return await aggregate_cohort(db)
+
+
+async def run_cohort_aggregation() -> None:
+    """Periodic task entry point."""
+    async with async_session_maker() as db:
+        stats = await aggregate_cohort(db)
+    if stats["source_rows"] or stats["students"]:
+        logger.debug("cohort aggregation: %s", stats)
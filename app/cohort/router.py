@@ -0,0 +1,48 @@
+"""Teacher cohort analytics API routes."""
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_db
+from app.core.deps import RequireTeacher
+from app.models.user import User
+from app.cohort.schemas import CohortOverview, LessonFunnelPage, CohortStudentPage
+from app.cohort.service import get_cohort_overview, list_lesson_funnel, list_students
+
+router = APIRouter(prefix="/cohort", tags=["cohort"])
+
+
+@router.get("/overview", response_model=CohortOverview)
+async def cohort_overview(
+    current_user: Annotated[User, RequireTeacher],
+    db: Annotated[AsyncSession, Depends(get_db)],
+):
+    """Cohort totals (teacher/admin). Refreshed by the periodic aggregation job."""
+    return await get_cohort_overview(db)
+
+
+@router.get("/lessons", response_model=LessonFunnelPage)
+async def cohort_lessons(
+    current_user: Annotated[User, RequireTeacher],
+    db: Annotated[AsyncSession, Depends(get_db)],
+    offset: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+):
+    """Per-lesson completion funnel and scores, in curriculum order (teacher/admin)."""
+    return await list_lesson_funnel(db, offset, limit)
+
+
+@router.get("/students", response_model=CohortStudentPage)
+async def cohort_students(
+    current_user: Annotated[User, RequireTeacher],
+    db: Annotated[AsyncSession, Depends(get_db)],
+    struggling: bool = False,
+    cursor: str | None = None,
+    limit: int = Query(50, ge=1, le=200),
+):
+    """Students with progress; struggling=true lists those needing attention, worst first (teacher/admin)."""
+    try:
+        return await list_students(db, limit, cursor, struggling)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -0,0 +1,55 @@
+"""Cohort analytics schemas."""
+from datetime import date, datetime
+
+from pydantic import BaseModel
+
+
+class CohortOverview(BaseModel):
+    students: int
+    active_students: int
+    active_last_7_days: int
+    struggling_students: int
+    avg_test_score: float | None = None
+    exercise_accuracy: float | None = None
+    avg_vocabulary_size: float
+    avg_vocabulary_learned: float
+    aggregated_at: datetime | None = None
+
+
+class LessonFunnel(BaseModel):
+    lesson_id: int
+    title: str
+    level: str
+    students_started: int
+    students_tested: int
+    students_passed: int
+    students_completed: int
+    avg_test_score: float | None = None
+    exercise_accuracy: float | None = None
+
+
+class LessonFunnelPage(BaseModel):
+    total: int
+    items: list[LessonFunnel]
+
+
+class CohortStudent(BaseModel):
+    user_id: int
+    full_name: str
+    email: str
+    lessons_started: int
+    lessons_completed: int
+    exercise_attempts: int
+    exercise_accuracy: float | None = None
+    test_attempts: int
+    tests_passed: int
+    avg_test_score: float | None = None
+    vocabulary_size: int
+    vocabulary_learned: int
+    last_active_day: date | None = None
+    struggle_score: float | None = None
+
+
+class CohortStudentPage(BaseModel):
+    items: list[CohortStudent]
+    next_cursor: str | None = None
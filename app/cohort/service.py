@@ -0,0 +1,144 @@
+"""Teacher cohort views: reads of the precomputed summary tables only."""
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, func, case, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.cohort.aggregation import STRUGGLING_THRESHOLD
+from app.models.cohort import AggregationWatermark, CohortLessonStats, CohortStudentStats
+from app.models.lesson import Lesson
+from app.models.user import User, UserRole
+
+
+async def get_cohort_overview(db: AsyncSession) -> dict:
+    """Cohort totals: students, active students, average test score, exercise accuracy, vocabulary."""
+    students = (
+        await db.execute(select(func.count(User.id)).where(User.role == UserRole.STUDENT))
+    ).scalar() or 0
+    week_ago = datetime.utcnow().date() - timedelta(days=6)
+    s = CohortStudentStats
+    row = (
+        await db.execute(
+            select(
+                func.count(),
+                func.count(case((s.last_active_day >= week_ago, 1))),
+                func.count(case((s.struggle_score >= STRUGGLING_THRESHOLD, 1))),
+                func.avg(s.vocabulary_size),
+                func.avg(s.vocabulary_learned),
+            )
+        )
+    ).one()
+    lessons = (
+        await db.execute(
+            select(
+                func.sum(CohortLessonStats.exercise_attempts),
+                func.sum(CohortLessonStats.exercise_correct),
+                func.sum(CohortLessonStats.test_attempts),
+                func.sum(CohortLessonStats.test_score_sum),
+            )
+        )
+    ).one()
+    aggregated_at = (
+        await db.execute(
+            select(func.max(AggregationWatermark.updated_at)).where(AggregationWatermark.name.like("cohort.%"))
+        )
+    ).scalar()
+    ex_n, ex_ok, t_n, score_sum = (v or 0 for v in lessons)
+    return {
+        "students": students,
+        "active_students": row[0],
+        "active_last_7_days": row[1],
+        "struggling_students": row[2],
+        "avg_test_score": round(score_sum / t_n, 2) if t_n else None,
+        "exercise_accuracy": round(ex_ok / ex_n, 4) if ex_n else None,
+        "avg_vocabulary_size": round(row[3] or 0, 1),
+        "avg_vocabulary_learned": round(row[4] or 0, 1),
+        "aggregated_at": aggregated_at,
+    }
+
+
+async def list_lesson_funnel(db: AsyncSession, offset: int, limit: int) -> dict:
+    """Per-lesson funnel in curriculum order: {total, items: [...]}."""
+    total = (await db.execute(select(func.count(Lesson.id)))).scalar() or 0
+    result = await db.execute(
+        select(Lesson.id, Lesson.title, Lesson.level, CohortLessonStats)
+        .outerjoin(CohortLessonStats, CohortLessonStats.lesson_id == Lesson.id)
+        .order_by(func.coalesce(Lesson.order_index, 999999), Lesson.id)
+        .offset(offset)
+        .limit(limit)
+    )
+    items = []
+    for lesson_id, title, level, st in result.all():
+        items.append(
+            {
+                "lesson_id": lesson_id,
+                "title": title,
+                "level": level,
+                "students_started": st.students_started if st else 0,
+                "students_tested": st.students_tested if st else 0,
+                "students_passed": st.students_passed if st else 0,
+                "students_completed": st.students_completed if st else 0,
+                "avg_test_score": round(st.test_score_sum / st.test_attempts, 2) if st and st.test_attempts else None,
+                "exercise_accuracy": (
+                    round(st.exercise_correct / st.exercise_attempts, 4) if st and st.exercise_attempts else None
+                ),
+            }
+        )
+    return {"total": total, "items": items}
+
+
+def _parse_cursor(cursor: str | None) -> tuple[float, int] | None:
+    if not cursor:
+        return None
+    try:
+        score, user_id = cursor.split(":")
+        return float(score), int(user_id)
+    except ValueError:
+        raise ValueError("Invalid cursor")
+
+
+async def list_students(
+    db: AsyncSession, limit: int, cursor: str | None = None, struggling_only: bool = False
+) -> dict:
+    """
+    Student rows, keyset-paginated: {items, next_cursor}.
+    struggling_only lists students at or above the struggling threshold, worst first;
+    otherwise all aggregated students by id.
+    """
+    s = CohortStudentStats
+    q = select(s, User.full_name, User.email).join(User, User.id == s.user_id)
+    after = _parse_cursor(cursor)
+    if struggling_only:
+        q = q.where(s.struggle_score >= STRUGGLING_THRESHOLD).order_by(s.struggle_score.desc(), s.user_id.desc())
+        if after:
+            # Row-value comparison keeps the scan on ix_cohort_student_stats_struggle
+            q = q.where(tuple_(s.struggle_score, s.user_id) < tuple_(after[0], after[1]))
+    else:
+        q = q.order_by(s.user_id)
+        if after:
+            q = q.where(s.user_id > after[1])
+    rows = (await db.execute(q.limit(limit + 1))).all()
+    items = [
+        {
+            "user_id": st.user_id,
+            "full_name": name,
+            "email": email,
+            "lessons_started": st.lessons_started,
+            "lessons_completed": st.lessons_completed,
+            "exercise_attempts": st.exercise_attempts,
+            "exercise_accuracy": round(st.exercise_correct / st.exercise_attempts, 4) if st.exercise_attempts else None,
+            "test_attempts": st.test_attempts,
+            "tests_passed": st.tests_passed,
+            "avg_test_score": st.avg_test_score,
+            "vocabulary_size": st.vocabulary_size,
+            "vocabulary_learned": st.vocabulary_learned,
+            "last_active_day": st.last_active_day,
+            "struggle_score": st.struggle_score,
+        }
+        for st, name, email in rows[:limit]
+    ]
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        next_cursor = f"{last['struggle_score'] or 0}:{last['user_id']}"
+    return {"items": items, "next_cursor": next_cursor}
@@ -0,0 +1,82 @@
+"""
+Process-local caches for read-mostly definitions (tests, catalogs).
+"""
+import hashlib
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable, NamedTuple
+
+from fastapi import Request, Response
+
+
+class VersionedCache:
+    """
+    LRU cache with a version counter per key.
+    invalidate() bumps the version, so a value loaded before the bump is never stored:
+    a reader that raced with a writer just loads again on the next call.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._data: OrderedDict[Hashable, tuple[int, Any]] = OrderedDict()
+        self._versions: dict[Hashable, int] = {}
+
+    def version(self, key: Hashable) -> int:
+        return self._versions.get(key, 0)
+
+    def get(self, key: Hashable) -> Any | None:
+        entry = self._data.get(key)
+        if entry is None or entry[0] != self.version(key):
+            return None
+        self._data.move_to_end(key)
+        return entry[1]
+
+    def set(self, key: Hashable, value: Any, version: int) -> None:
+        """Store value loaded at `version`; dropped if the key was invalidated meanwhile."""
+        if version != self.version(key):
+            return
+        self._data[key] = (version, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        self._versions[key] = self.version(key) + 1
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        for key in list(self._data):
+            self.invalidate(key)
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Cached value, or await loader() and cache its result (None results are not cached)."""
+        value = self.get(key)
+        if value is not None:
+            return value
+        version = self.version(key)
+        value = await loader()
+        if value is not None:
+            self.set(key, value, version)
+        return value
+
+
+class CachedJson(NamedTuple):
+    """Serialized JSON response body with its ETag."""
+
+    body: bytes
+    etag: str
+
+
+def cached_json(body: bytes) -> CachedJson:
+    return CachedJson(body, '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"')
+
+
+def etag_response(request: Request, cached: CachedJson) -> Response:
+    """Send pre-serialized JSON as is, or 304 if the client already has this version."""
+    headers = {"ETag": cached.etag, "Cache-Control": "private, no-cache"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and (
+        if_none_match.strip() == "*"
+        or cached.etag in (tag.strip() for tag in if_none_match.split(","))
+    ):
+        return Response(status_code=304, headers=headers)
+    return Response(content=cached.body, media_type="application/json", headers=headers)
@@ -24,6 +24,25 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24  # 24 hours
 
+    # Test autosave: buffered draft answers are written every N seconds
+    AUTOSAVE_FLUSH_SECONDS: float = 3.0
+    # Teacher cohort summaries are brought up to date every N seconds
+    COHORT_AGGREGATE_SECONDS: float = 60.0
+    # Changed leaderboard standings are saved every N seconds
+    LEADERBOARD_PERSIST_SECONDS: float = 60.0
+    # Recommendations are generated for recently active students every N seconds
+    RECOMMENDATIONS_SECONDS: float = 300.0
+    # Pending recommendation refresh events; more are dropped until the worker catches up
+    RECOMMENDATION_QUEUE_SIZE: int = 1000
+
+    # Audit log: entries are buffered and written every N ms or M entries
+    AUDIT_LOG_FLUSH_MS: int = 500
+    AUDIT_LOG_BATCH: int = 500
+    AUDIT_LOG_BUFFER: int = 10000
+    # When the buffer is full: "spill" to AUDIT_LOG_SPILL_FILE or "drop"
+    AUDIT_LOG_OVERFLOW: str = "spill"
+    AUDIT_LOG_SPILL_FILE: str = "./logs/audit_spill.jsonl"
+
     # Files
     UPLOAD_DIR: str = "./uploads"
     MAX_UPLOAD_SIZE: int = 10 * 1024 * 1024  # 10 MB
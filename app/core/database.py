@@ -1,8 +1,11 @@
 """
 Database configuration and session management.
 """
-from typing import AsyncGenerator
+import asyncio
+from typing import Any, AsyncGenerator, Awaitable, Callable
 
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
 
@@ -45,6 +48,42 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
+def supports_concurrent_sessions() -> bool:
+    """In-memory SQLite lives inside a single connection; other backends can serve parallel sessions."""
+    return ":memory:" not in settings.DATABASE_URL
+
+
+async def gather_in_sessions(
+    db: AsyncSession,
+    *calls: tuple[Callable[..., Awaitable[Any]], ...],
+) -> list[Any]:
+    """
+    Run independent read calls concurrently, each on its own session.
+    Each call is (fn, *args) where fn(session, *args) is a coroutine function.
+    Falls back to running them one by one on `db` when the backend can't do it.
+    """
+    if not supports_concurrent_sessions():
+        return [await fn(db, *args) for fn, *args in calls]
+
+    async def run(fn, *args):
+        async with async_session_maker() as session:
+            return await fn(session, *args)
+
+    return list(await asyncio.gather(*(run(fn, *args) for fn, *args in calls)))
+
+
+def dialect_insert(db: AsyncSession, table: Any):
+    """INSERT for the session's backend, supporting on_conflict_do_nothing / on_conflict_do_update."""
+    if db.bind.dialect.name == "postgresql":
+        return postgresql.insert(table)
+    return sqlite.insert(table)
+
+
+def run_after_commit(db: AsyncSession, fn: Callable[[], None]) -> None:
+    """Call fn() once the session's transaction commits (e.g. to drop cached copies of written rows)."""
+    event.listen(db.sync_session, "after_commit", lambda session: fn(), once=True)
+
+
 async def init_db() -> None:
     """Initialize database tables. Used for SQLite development."""
     async with engine.begin() as conn:
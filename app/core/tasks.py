@@ -0,0 +1,191 @@
+"""
+In-process background jobs started and stopped by the app lifespan (main.py).
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    """
+    Runs `fn` every `interval` seconds; stop() cancels the loop and, with run_on_stop
+    (flushing jobs), runs `fn` one last time.
+    """
+
+    def __init__(
+        self, name: str, interval: float, fn: Callable[[], Awaitable[None]], run_on_stop: bool = True
+    ):
+        self.name = name
+        self.interval = interval
+        self.fn = fn
+        self.run_on_stop = run_on_stop
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop(), name=self.name)
+
+    async def _run_once(self) -> None:
+        try:
+            await self.fn()
+        except Exception:
+            logger.exception("periodic task %s failed", self.name)
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self._run_once()
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.run_on_stop:
+            await self._run_once()
+
+
+class BatchWorker:
+    """
+    Bounded in-process queue drained in batches by one worker task.
+    Producers call offer() (never waits; False when the queue is full) or put() (waits
+    up to `timeout` for space). The worker takes up to `max_batch` items, waiting at
+    most `max_wait` seconds after the first one (less once `max_batch` are queued),
+    and passes them to `handler`.
+    stop() rejects new items and processes everything still queued.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        handler: Callable[[list[Any]], Awaitable[None]],
+        maxsize: int = 1000,
+        max_batch: int = 100,
+        max_wait: float = 1.0,
+    ):
+        self.name = name
+        self.handler = handler
+        self.maxsize = maxsize
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue: asyncio.Queue[tuple[float, Any]] | None = None
+        self._task: asyncio.Task | None = None
+        self._full: asyncio.Event | None = None
+        self._accepting = False
+        self.enqueued = self.dropped = self.processed = self.batches = self.failed_batches = 0
+        self.last_lag = self.max_lag = self.last_batch_seconds = 0.0
+
+    def start(self) -> None:
+        if self._task is None:
+            self._queue = asyncio.Queue(self.maxsize)
+            self._full = asyncio.Event()
+            self._accepting = True
+            self._task = asyncio.create_task(self._loop(), name=self.name)
+
+    def offer(self, item: Any) -> bool:
+        """Enqueue without waiting; the item is dropped (and counted) when full or stopped."""
+        if not self._accepting:
+            self.dropped += 1
+            return False
+        try:
+            self._queue.put_nowait((time.monotonic(), item))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return False
+        self._enqueued()
+        return True
+
+    def _enqueued(self) -> None:
+        self.enqueued += 1
+        if self._queue.qsize() >= self.max_batch:
+            self._full.set()
+
+    @property
+    def running(self) -> bool:
+        return self._accepting
+
+    async def put(self, item: Any, timeout: float | None = None) -> bool:
+        """Enqueue, waiting up to `timeout` seconds for space (backpressure on the producer)."""
+        if not self._accepting:
+            self.dropped += 1
+            return False
+        try:
+            await asyncio.wait_for(self._queue.put((time.monotonic(), item)), timeout)
+        except asyncio.TimeoutError:
+            self.dropped += 1
+            return False
+        self._enqueued()
+        return True
+
+    async def _next_batch(self) -> list[tuple[float, Any]]:
+        batch = [await self._queue.get()]
+        self._full.clear()
+        if self._accepting and self._queue.qsize() < self.max_batch - 1:
+            # Let more items arrive so they share the batch
+            try:
+                await asyncio.wait_for(self._full.wait(), self.max_wait)
+            except asyncio.TimeoutError:
+                pass
+        while len(batch) < self.max_batch and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _process(self, batch: list[tuple[float, Any]]) -> None:
+        started = time.monotonic()
+        self.last_lag = started - batch[0][0]
+        self.max_lag = max(self.max_lag, self.last_lag)
+        try:
+            await self.handler([item for _, item in batch])
+        except Exception:
+            self.failed_batches += 1
+            logger.exception("batch worker %s failed on %d items", self.name, len(batch))
+        finally:
+            self.processed += len(batch)
+            self.batches += 1
+            self.last_batch_seconds = time.monotonic() - started
+            for _ in batch:
+                self._queue.task_done()
+
+    async def _loop(self) -> None:
+        while True:
+            await self._process(await self._next_batch())
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Stop accepting items, wait (up to `timeout`) until the queue is drained, then cancel the worker."""
+        if self._task is None:
+            return
+        self._accepting = False
+        self._full.set()
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("batch worker %s stopped with %d items queued", self.name, self._queue.qsize())
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def stats(self) -> dict:
+        """Queue depth, throughput counters and lag (seconds from enqueue to batch start)."""
+        return {
+            "name": self.name,
+            "running": self._task is not None,
+            "depth": self._queue.qsize() if self._queue else 0,
+            "maxsize": self.maxsize,
+            "enqueued": self.enqueued,
+            "dropped": self.dropped,
+            "processed": self.processed,
+            "batches": self.batches,
+            "failed_batches": self.failed_batches,
+            "last_lag_seconds": round(self.last_lag, 3),
+            "max_lag_seconds": round(self.max_lag, 3),
+            "last_batch_seconds": round(self.last_batch_seconds, 3),
+        }
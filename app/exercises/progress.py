@@ -0,0 +1,139 @@
+"""
+Per-user exercise progress rollup (table user_exercise_progress).
+Every submission upserts one row per (user, exercise) with attempt and correct
+counts, so lesson pages and progress views read a user's results with one
+indexed lookup instead of aggregating the attempt history.
+"""
+from datetime import datetime
+
+from sqlalchemy import select, delete, func, case, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import dialect_insert
+from app.models.exercise import Exercise, ExerciseAttempt, UserExerciseProgress
+
+
+def _progress_rows(user_id: int, results: list[tuple[Exercise, bool]], at: datetime) -> list[dict]:
+    """Increment rows, one per exercise, sorted by exercise id (fixed lock order)."""
+    rows: dict[int, dict] = {}
+    for exercise, is_correct in results:
+        row = rows.setdefault(
+            exercise.id,
+            {
+                "user_id": user_id,
+                "exercise_id": exercise.id,
+                "lesson_id": exercise.lesson_id,
+                "attempts": 0,
+                "correct_count": 0,
+                "first_correct_at": None,
+                "last_attempt_at": at,
+            },
+        )
+        row["attempts"] += 1
+        if is_correct:
+            row["correct_count"] += 1
+            row["first_correct_at"] = at
+    return [rows[eid] for eid in sorted(rows)]
+
+
+async def record_exercise_progress(
+    db: AsyncSession, user_id: int, results: list[tuple[Exercise, bool]]
+) -> int:
+    """
+    Add graded submissions [(exercise, is_correct)] to the user's rollup rows.
+    Returns how many exercises were solved for the first time (first_correct_at set now).
+    """
+    at = datetime.utcnow()
+    rows = _progress_rows(user_id, results, at)
+    if not rows:
+        return 0
+    stmt = dialect_insert(db, UserExerciseProgress)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["user_id", "exercise_id"],
+        set_={
+            "lesson_id": stmt.excluded.lesson_id,
+            "attempts": UserExerciseProgress.attempts + stmt.excluded.attempts,
+            "correct_count": UserExerciseProgress.correct_count + stmt.excluded.correct_count,
+            "first_correct_at": func.coalesce(
+                UserExerciseProgress.first_correct_at, stmt.excluded.first_correct_at
+            ),
+            "last_attempt_at": stmt.excluded.last_attempt_at,
+        },
+    ).returning(UserExerciseProgress.first_correct_at)
+    result = await db.execute(stmt, rows)
+    return sum(1 for (first_correct_at,) in result.all() if first_correct_at == at)
+
+
+async def rebuild_exercise_progress(db: AsyncSession, user_id: int | None = None) -> int:
+    """Recompute the rollup from exercise_attempts. Returns rows written."""
+    q = (
+        select(
+            ExerciseAttempt.user_id,
+            ExerciseAttempt.exercise_id,
+            Exercise.lesson_id,
+            func.count(ExerciseAttempt.id),
+            func.count(case((ExerciseAttempt.is_correct == True, 1))),
+            func.min(case((ExerciseAttempt.is_correct == True, ExerciseAttempt.created_at))),
+            func.max(ExerciseAttempt.created_at),
+        )
+        .join(Exercise, Exercise.id == ExerciseAttempt.exercise_id)
+        .group_by(ExerciseAttempt.user_id, ExerciseAttempt.exercise_id, Exercise.lesson_id)
+    )
+    cleanup = delete(UserExerciseProgress)
+    if user_id is not None:
+        q = q.where(ExerciseAttempt.user_id == user_id)
+        cleanup = cleanup.where(UserExerciseProgress.user_id == user_id)
+    rows = [
+        {
+            "user_id": r[0],
+            "exercise_id": r[1],
+            "lesson_id": r[2],
+            "attempts": r[3],
+            "correct_count": r[4],
+            "first_correct_at": r[5],
+            "last_attempt_at": r[6],
+        }
+        for r in (await db.execute(q)).all()
+    ]
+    await db.execute(cleanup)
+    if rows:
+        await db.execute(insert(UserExerciseProgress), rows)
+    return len(rows)
+
+
+async def get_lesson_exercise_progress(db: AsyncSession, user_id: int, lesson_id: int) -> dict:
+    """Totals for one lesson: exercise_attempts, exercise_correct, exercises_solved, solved_exercise_ids."""
+    result = await db.execute(
+        select(
+            UserExerciseProgress.exercise_id,
+            UserExerciseProgress.attempts,
+            UserExerciseProgress.correct_count,
+        ).where(
+            UserExerciseProgress.user_id == user_id,
+            UserExerciseProgress.lesson_id == lesson_id,
+        )
+    )
+    attempts = correct = 0
+    solved = []
+    for exercise_id, n, c in result.all():
+        attempts += n
+        correct += c
+        if c:
+            solved.append(exercise_id)
+    return {
+        "exercise_attempts": attempts,
+        "exercise_correct": correct,
+        "exercises_solved": len(solved),
+        "solved_exercise_ids": sorted(solved),
+    }
+
+
+async def list_exercise_progress(
+    db: AsyncSession, user_id: int, lesson_id: int | None = None
+) -> list[UserExerciseProgress]:
+    """A user's rollup rows, optionally for one lesson."""
+    q = select(UserExerciseProgress).where(UserExerciseProgress.user_id == user_id)
+    if lesson_id is not None:
+        q = q.where(UserExerciseProgress.lesson_id == lesson_id)
+    result = await db.execute(q.order_by(UserExerciseProgress.lesson_id, UserExerciseProgress.exercise_id))
+    return list(result.scalars().all())
@@ -1,7 +1,7 @@
 """Exercise API routes."""
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -17,24 +17,74 @@ from app.exercises.schemas import (
     ExerciseRead,
     ExerciseAttemptSubmit,
     ExerciseAttemptRead,
+    ExerciseAttemptBatch,
+    ExerciseAttemptBatchResult,
+    ExerciseProgressRead,
+)
+from app.exercises.progress import list_exercise_progress
+from app.core.cache import etag_response
+from app.exercises.service import (
+    submit_attempt,
+    submit_attempts_batch,
+    get_exercises_by_ids,
+    get_exercise_catalog,
+    invalidate_exercise_catalog,
 )
-from app.exercises.service import submit_attempt
 
 router = APIRouter(prefix="/exercises", tags=["exercises"])
 
+BATCH_MAX_ITEMS = 200
+
 
 @router.get("/", response_model=list[ExerciseRead])
 async def list_exercises(
+    request: Request,
+    lesson_id: int | None = None,
+    current_user: Annotated[User, Depends(get_current_user)] = None,
+    db: Annotated[AsyncSession, Depends(get_db)] = None,
+):
+    """List exercises, optionally by lesson. Served from the catalog cache with an ETag."""
+    return etag_response(request, await get_exercise_catalog(db, lesson_id or None))
+
+
+@router.get("/progress", response_model=list[ExerciseProgressRead])
+async def get_exercise_progress(
     lesson_id: int | None = None,
     current_user: Annotated[User, Depends(get_current_user)] = None,
     db: Annotated[AsyncSession, Depends(get_db)] = None,
 ):
-    """List exercises, optionally by lesson."""
-    q = select(Exercise).order_by(Exercise.order_index, Exercise.id)
-    if lesson_id:
-        q = q.where(Exercise.lesson_id == lesson_id)
-    result = await db.execute(q)
-    return list(result.scalars().all())
+    """Current user's result per attempted exercise, optionally for one lesson."""
+    return await list_exercise_progress(db, current_user.id, lesson_id)
+
+
+@router.post("/attempts/batch", response_model=list[ExerciseAttemptBatchResult])
+async def submit_exercise_attempts_batch(
+    data: ExerciseAttemptBatch,
+    current_user: Annotated[User, Depends(get_current_user)],
+    db: Annotated[AsyncSession, Depends(get_db)],
+):
+    """Submit answers to many exercises at once. Returns correctness per item, in order."""
+    if len(data.items) > BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400, detail=f"At most {BATCH_MAX_ITEMS} answers per batch"
+        )
+    exercises = await get_exercises_by_ids(db, [i.exercise_id for i in data.items])
+    if current_user.role.value == "student" and exercises:
+        completed = await get_completed_lesson_ids(db, current_user.id)
+        prereq_map = await get_prerequisites_map(db)
+        for lesson_id in {e.lesson_id for e in exercises.values()}:
+            accessible, _ = lesson_is_accessible(lesson_id, completed, prereq_map)
+            if not accessible:
+                raise HTTPException(
+                    status_code=403,
+                    detail="Complete lesson prerequisites first",
+                )
+    return await submit_attempts_batch(
+        db,
+        current_user.id,
+        [(i.exercise_id, i.user_answer) for i in data.items],
+        exercises,
+    )
 
 
 @router.get("/{exercise_id}", response_model=ExerciseRead)
@@ -105,6 +155,7 @@ async def create_exercise(
     )
     db.add(exercise)
     await db.flush()
+    invalidate_exercise_catalog(db, exercise.lesson_id)
     await db.refresh(exercise)
     return exercise
 
@@ -132,6 +183,7 @@ async def update_exercise(
     if data.retry_allowed is not None:
         exercise.retry_allowed = data.retry_allowed
     await db.flush()
+    invalidate_exercise_catalog(db, exercise.lesson_id)
     await db.refresh(exercise)
     return exercise
 
@@ -148,4 +200,5 @@ async def delete_exercise(
     if not exercise:
         raise HTTPException(status_code=404, detail="Exercise not found")
     await db.delete(exercise)
+    invalidate_exercise_catalog(db, exercise.lesson_id)
     return {"status": "ok"}
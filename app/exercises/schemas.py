@@ -36,6 +36,21 @@ class ExerciseAttemptSubmit(BaseModel):
     user_answer: dict
 
 
+class ExerciseAttemptBatchItem(BaseModel):
+    exercise_id: int
+    user_answer: dict
+
+
+class ExerciseAttemptBatch(BaseModel):
+    items: list[ExerciseAttemptBatchItem]
+
+
+class ExerciseAttemptBatchResult(BaseModel):
+    exercise_id: int
+    is_correct: bool | None = None
+    error: str | None = None
+
+
 class ExerciseAttemptRead(BaseModel):
     id: int
     exercise_id: int
@@ -44,3 +59,15 @@ class ExerciseAttemptRead(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class ExerciseProgressRead(BaseModel):
+    exercise_id: int
+    lesson_id: int
+    attempts: int
+    correct_count: int
+    first_correct_at: datetime | None = None
+    last_attempt_at: datetime | None = None
+
+    class Config:
+        from_attributes = True
@@ -1,8 +1,45 @@
 """Exercise business logic - validation and attempt handling."""
-from sqlalchemy import select
+from pydantic import TypeAdapter
+from sqlalchemy import select, insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import VersionedCache, CachedJson, cached_json
+from app.core.database import run_after_commit
+from app.exercises.progress import record_exercise_progress
+from app.exercises.schemas import ExerciseRead
 from app.models.exercise import Exercise, ExerciseAttempt
+from app.progress.service import bump_progress
+from app.progress.activity import record_activity
+from app.progress.leaderboard import record_xp
+from app.recommendations.events import on_exercise_results
+
+# lesson_id (None = all lessons) -> serialized exercise list
+_catalog = VersionedCache(maxsize=256)
+_catalog_adapter = TypeAdapter(list[ExerciseRead])
+
+
+async def _load_catalog(db: AsyncSession, lesson_id: int | None) -> CachedJson:
+    q = select(Exercise).order_by(Exercise.order_index, Exercise.id)
+    if lesson_id is not None:
+        q = q.where(Exercise.lesson_id == lesson_id)
+    exercises = (await db.execute(q)).scalars().all()
+    return cached_json(
+        _catalog_adapter.dump_json(_catalog_adapter.validate_python(exercises, from_attributes=True))
+    )
+
+
+async def get_exercise_catalog(db: AsyncSession, lesson_id: int | None) -> CachedJson:
+    """Exercise list of a lesson (or of all lessons) as JSON bytes, cached until an exercise is edited."""
+    return await _catalog.get_or_load(lesson_id, lambda: _load_catalog(db, lesson_id))
+
+
+def invalidate_exercise_catalog(db: AsyncSession, lesson_id: int) -> None:
+    """Drop cached lists containing the lesson's exercises once the session commits."""
+    def drop() -> None:
+        _catalog.invalidate(lesson_id)
+        _catalog.invalidate(None)
+
+    run_after_commit(db, drop)
 
 
 def validate_answer(exercise: Exercise, user_answer: dict) -> bool:
@@ -37,4 +74,64 @@ async def submit_attempt(
     db.add(attempt)
     await db.flush()
     await db.refresh(attempt)
+    solved = await record_exercise_progress(db, user_id, [(exercise, is_correct)])
+    await on_exercise_results(db, user_id, [(exercise, is_correct)])
+    await bump_progress(db, user_id, exercise_attempts=1, exercise_correct=int(is_correct))
+    await record_xp(db, user_id, {"exercise_solved": solved})
+    await record_activity(db, user_id, exercises=1)
     return attempt, is_correct
+
+
+async def get_exercises_by_ids(db: AsyncSession, exercise_ids: list[int]) -> dict[int, Exercise]:
+    """Load exercises with one IN query: {exercise_id: exercise}."""
+    if not exercise_ids:
+        return {}
+    result = await db.execute(select(Exercise).where(Exercise.id.in_(set(exercise_ids))))
+    return {e.id: e for e in result.scalars().all()}
+
+
+async def submit_attempts_batch(
+    db: AsyncSession,
+    user_id: int,
+    items: list[tuple[int, dict]],
+    exercises: dict[int, Exercise] | None = None,
+) -> list[dict]:
+    """
+    Submit many (exercise_id, user_answer) pairs with one bulk INSERT.
+    Returns per-item results in request order: {exercise_id, is_correct, error}.
+    Unknown exercises get error="Exercise not found" and no attempt row.
+    """
+    if exercises is None:
+        exercises = await get_exercises_by_ids(db, [eid for eid, _ in items])
+    results = []
+    rows = []
+    graded = []
+    for exercise_id, user_answer in items:
+        exercise = exercises.get(exercise_id)
+        if exercise is None:
+            results.append({"exercise_id": exercise_id, "is_correct": None, "error": "Exercise not found"})
+            continue
+        is_correct = validate_answer(exercise, user_answer)
+        rows.append(
+            {
+                "user_id": user_id,
+                "exercise_id": exercise_id,
+                "user_answer": user_answer,
+                "is_correct": is_correct,
+            }
+        )
+        graded.append((exercise, is_correct))
+        results.append({"exercise_id": exercise_id, "is_correct": is_correct, "error": None})
+    if rows:
+        await db.execute(insert(ExerciseAttempt), rows)
+        solved = await record_exercise_progress(db, user_id, graded)
+        await on_exercise_results(db, user_id, graded)
+        await bump_progress(
+            db,
+            user_id,
+            exercise_attempts=len(rows),
+            exercise_correct=sum(1 for _, ok in graded if ok),
+        )
+        await record_xp(db, user_id, {"exercise_solved": solved})
+        await record_activity(db, user_id, exercises=len(rows))
+    return results
@@ -10,6 +10,8 @@ from app.core.deps import get_current_user, RequireTeacher
 from app.models.user import User
 from app.models.lesson import Lesson
 from app.models.vocabulary import Vocabulary
+from app.lessons.service import refresh_lesson_indexes
+from app.vocabulary.lesson_index import index_vocabulary_words
 from app.files.service import ensure_upload_dir, save_upload, parse_json_lessons, parse_csv_vocabulary
 
 router = APIRouter(prefix="/files", tags=["files"])
@@ -29,7 +31,7 @@ async def import_lessons(
         items = parse_json_lessons(data)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Invalid JSON: {e}")
-    created = 0
+    lessons = []
     for item in items:
         lesson = Lesson(
             title=item.get("title", "Untitled"),
@@ -39,9 +41,11 @@ async def import_lessons(
             order_index=item.get("order_index", 0),
         )
         db.add(lesson)
-        created += 1
+        lessons.append(lesson)
     await db.flush()
-    return {"imported": created}
+    for lesson in lessons:
+        await refresh_lesson_indexes(db, lesson)
+    return {"imported": len(lessons)}
 
 
 @router.post("/import/vocabulary")
@@ -58,7 +62,7 @@ async def import_vocabulary(
         rows = parse_csv_vocabulary(data)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Invalid CSV: {e}")
-    created = 0
+    created = []
     for row in rows:
         word_kz = row.get("word_kz", "").strip()
         trans = row.get("translation_ru", "").strip()
@@ -71,9 +75,10 @@ async def import_vocabulary(
             example_sentence=row.get("example_sentence", "").strip() or None,
         )
         db.add(v)
-        created += 1
+        created.append(v)
     await db.flush()
-    return {"imported": created}
+    await index_vocabulary_words(db, created)
+    return {"imported": len(created)}
 
 
 @router.get("/export/lessons")
@@ -0,0 +1,34 @@
+"""
+Lesson content parsing helpers.
+Lesson content is markdown with "## " section headings, e.g.
+"## Оқу мақсаты (Цель урока)", "## Грамматикалық нүкте", "## 4. Жиі қателер (Частые ошибки)".
+"""
+import re
+
+_HEADING_RE = re.compile(r"^##\s+(.+?)\s*$", re.M)
+_TOKEN_RE = re.compile(r"[а-яёәғқңөұүһіa-z0-9]+", re.I)
+
+
+def parse_lesson_sections(content: str) -> list[tuple[str, str]]:
+    """
+    Split lesson content into (heading, body) pairs in document order.
+    Text before the first heading is returned with an empty heading.
+    """
+    if not content:
+        return []
+    sections = []
+    matches = list(_HEADING_RE.finditer(content))
+    head = content[: matches[0].start()].strip() if matches else content.strip()
+    if head:
+        sections.append(("", head))
+    for i, m in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(content)
+        body = content[m.end():end].strip()
+        if body:
+            sections.append((m.group(1).strip(), body))
+    return sections
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase word tokens (Cyrillic incl. Kazakh letters, Latin, digits)."""
+    return [t.lower() for t in _TOKEN_RE.findall(text or "")]
@@ -0,0 +1,15 @@
+"""
+Language level ordering.
+Lessons below a user's placement level count as completed, both for prerequisite
+checks and for anything else that asks which lessons a user still has to do.
+"""
+from sqlalchemy import case
+
+from app.models.user import LanguageLevel
+
+LEVEL_RANK = {level.value: rank for rank, level in enumerate(LanguageLevel, 1)}
+
+
+def below_placement(lesson_level, placement_level):
+    """SQL condition: lesson_level ranks below placement_level (columns or scalar subqueries)."""
+    return case(LEVEL_RANK, value=lesson_level, else_=99) < case(LEVEL_RANK, value=placement_level, else_=0)
@@ -1,25 +1,42 @@
 """Lesson API routes."""
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.database import get_db, gather_in_sessions
 from app.core.deps import get_current_user, RequireTeacher
 from app.models.user import User
 from app.models.lesson import Lesson, LessonPrerequisite
 from app.models.test import Test, TestAttempt
-from app.lessons.schemas import LessonCreate, LessonUpdate, LessonRead, LessonWithAccess
+from app.lessons.schemas import (
+    LessonCreate,
+    LessonUpdate,
+    LessonRead,
+    LessonWithAccess,
+    LessonBundle,
+    LessonProgress,
+    NextLessonInfo,
+    LessonSearchResult,
+)
+from app.exercises.schemas import ExerciseRead
+from app.tests.schemas import TestRead
 from app.lessons.service import (
     get_completed_lesson_ids,
     get_prerequisites_map,
     lesson_is_accessible,
     get_next_lesson,
+    list_lesson_exercises,
+    list_lesson_tests,
+    get_lesson_progress,
     create_lesson,
     update_lesson,
+    delete_lesson as delete_lesson_service,
     complete_lesson,
 )
+from app.lessons.search_service import search_lessons
+from app.logging_mod.service import log_action
 
 router = APIRouter(prefix="/lessons", tags=["lessons"])
 
@@ -55,6 +72,26 @@ async def list_lessons(
     return out
 
 
+@router.get("/search", response_model=list[LessonSearchResult])
+async def search_lessons_route(
+    current_user: Annotated[User, Depends(get_current_user)],
+    db: Annotated[AsyncSession, Depends(get_db)],
+    q: str = Query(..., min_length=2, max_length=200),
+    limit: int = Query(10, ge=1, le=50),
+):
+    """Full-text search over lesson title, topic and sections. Best match first."""
+    hits = await search_lessons(db, q, limit=limit)
+    completed = await get_completed_lesson_ids(db, current_user.id)
+    prereq_map = await get_prerequisites_map(db)
+    return [
+        LessonSearchResult(
+            **hit,
+            is_locked=not lesson_is_accessible(hit["id"], completed, prereq_map)[0],
+        )
+        for hit in hits
+    ]
+
+
 @router.get("/{lesson_id}/next")
 async def get_next_lesson_route(
     lesson_id: int,
@@ -70,6 +107,58 @@ async def get_next_lesson_route(
     return next_info
 
 
+@router.get("/{lesson_id}/bundle", response_model=LessonBundle)
+async def get_lesson_bundle(
+    lesson_id: int,
+    current_user: Annotated[User, Depends(get_current_user)],
+    db: Annotated[AsyncSession, Depends(get_db)],
+):
+    """
+    Lesson page in one round trip: lesson, exercises, tests, next lesson and
+    the user's progress in this lesson. Access is checked once.
+    """
+    result = await db.execute(select(Lesson).where(Lesson.id == lesson_id))
+    lesson = result.scalar_one_or_none()
+    if not lesson:
+        raise HTTPException(status_code=404, detail="Lesson not found")
+    completed = await get_completed_lesson_ids(db, current_user.id)
+    prereq_map = await get_prerequisites_map(db)
+    accessible, prereqs = lesson_is_accessible(lesson_id, completed, prereq_map)
+    if not accessible:
+        raise HTTPException(
+            status_code=403,
+            detail="Complete prerequisite lessons first",
+        )
+    exercises, tests, next_info, progress = await gather_in_sessions(
+        db,
+        (list_lesson_exercises, lesson_id),
+        (list_lesson_tests, lesson_id),
+        (get_next_lesson, lesson_id, completed, prereq_map),
+        (get_lesson_progress, current_user.id, lesson_id),
+    )
+    return LessonBundle(
+        lesson=LessonWithAccess(
+            id=lesson.id,
+            title=lesson.title,
+            level=lesson.level,
+            topic=lesson.topic,
+            content=lesson.content,
+            order_index=lesson.order_index,
+            created_at=lesson.created_at,
+            is_locked=False,
+            prerequisite_lesson_ids=prereqs,
+        ),
+        exercises=[ExerciseRead.model_validate(e) for e in exercises],
+        tests=[TestRead.model_validate(t) for t in tests],
+        next_lesson=NextLessonInfo(**(next_info or {})),
+        progress=LessonProgress(
+            is_completed=lesson_id in completed,
+            exercises_total=len(exercises),
+            **progress,
+        ),
+    )
+
+
 @router.get("/{lesson_id}", response_model=LessonWithAccess)
 async def get_lesson(
     lesson_id: int,
@@ -151,6 +240,7 @@ async def create_lesson_route(
 ):
     """Create lesson (teacher/admin)."""
     lesson = await create_lesson(db, data)
+    log_action(current_user.id, "lesson_create", "lesson", lesson.id)
     return lesson
 
 
@@ -166,7 +256,9 @@ async def update_lesson_route(
     lesson = result.scalar_one_or_none()
     if not lesson:
         raise HTTPException(status_code=404, detail="Lesson not found")
-    return await update_lesson(db, lesson, data)
+    lesson = await update_lesson(db, lesson, data)
+    log_action(current_user.id, "lesson_update", "lesson", lesson_id)
+    return lesson
 
 
 @router.delete("/{lesson_id}")
@@ -180,5 +272,6 @@ async def delete_lesson(
     lesson = result.scalar_one_or_none()
     if not lesson:
         raise HTTPException(status_code=404, detail="Lesson not found")
-    await db.delete(lesson)
+    await delete_lesson_service(db, lesson)
+    log_action(current_user.id, "lesson_delete", "lesson", lesson_id)
     return {"status": "ok"}
@@ -2,6 +2,9 @@
 from datetime import datetime
 from pydantic import BaseModel
 
+from app.exercises.schemas import ExerciseRead
+from app.tests.schemas import TestRead
+
 
 class LessonBase(BaseModel):
     title: str
@@ -36,3 +39,43 @@ class LessonWithAccess(LessonRead):
     """Lesson with access status for student."""
     is_locked: bool
     prerequisite_lesson_ids: list[int] = []
+
+
+class NextLessonInfo(BaseModel):
+    next_lesson_id: int | None = None
+    title: str | None = None
+    level: str | None = None
+    is_accessible: bool = False
+    locked_reason: str | None = None
+
+
+class LessonProgress(BaseModel):
+    """Current user's progress within one lesson."""
+    is_completed: bool
+    exercises_total: int
+    exercises_solved: int
+    exercise_attempts: int
+    exercise_correct: int
+    solved_exercise_ids: list[int] = []
+    best_test_score: float | None = None
+    final_test_passed: bool = False
+
+
+class LessonBundle(BaseModel):
+    """Everything the lesson page needs, in one response."""
+    lesson: LessonWithAccess
+    exercises: list[ExerciseRead]
+    tests: list[TestRead]
+    next_lesson: NextLessonInfo
+    progress: LessonProgress
+
+
+class LessonSearchResult(BaseModel):
+    id: int
+    title: str
+    topic: str
+    level: str
+    order_index: int | None = None
+    rank: float
+    snippet: str | None = None  # matches marked with **...**
+    is_locked: bool = False
@@ -0,0 +1,234 @@
+"""
+Lesson full-text search.
+SQLite: FTS5 virtual table `lessons_fts` (rowid = lesson id), ranked by bm25().
+PostgreSQL: table `lesson_search` with a weighted tsvector + GIN index, ranked by ts_rank().
+Index rows are written by the application on lesson create/update/delete.
+"""
+from sqlalchemy import text, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.lessons.content import parse_lesson_sections, tokenize
+from app.models.lesson import Lesson
+
+SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS lessons_fts "
+    "USING fts5(title, topic, sections, tokenize='unicode61')",
+]
+POSTGRES_DDL = [
+    "CREATE TABLE IF NOT EXISTS lesson_search ("
+    " lesson_id INTEGER PRIMARY KEY REFERENCES lessons(id) ON DELETE CASCADE,"
+    " title TEXT, topic TEXT, sections TEXT,"
+    " document tsvector GENERATED ALWAYS AS ("
+    "  setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||"
+    "  setweight(to_tsvector('simple', coalesce(topic, '')), 'B') ||"
+    "  setweight(to_tsvector('simple', coalesce(sections, '')), 'C')"
+    " ) STORED)",
+    "CREATE INDEX IF NOT EXISTS ix_lesson_search_document ON lesson_search USING GIN (document)",
+]
+
+# Words that only frame the request ("урок про падежи") and never identify a lesson
+STOP_WORDS = {
+    "урок", "урока", "уроке", "уроки", "уроков", "сабақ", "про", "о", "об", "по", "в", "на",
+    "и", "с", "для", "что", "как", "где", "есть", "это", "объясни", "найди", "покажи",
+    "расскажи", "тема", "теме", "тему", "мне", "хочу", "бар", "туралы", "және",
+}
+
+# Inflection endings stripped before prefix matching (Russian + Kazakh), longest first
+_SUFFIXES = sorted(
+    [
+        "ами", "ями", "ого", "его", "ому", "ему", "ыми", "ими", "ах", "ях", "ов", "ев", "ей",
+        "ам", "ям", "ом", "ем", "ой", "ый", "ий", "ая", "яя", "ые", "ие",
+        "а", "я", "ы", "и", "у", "ю", "е",
+        "лар", "лер", "дар", "дер", "тар", "тер", "ның", "нің", "дың", "дің", "тың", "тің",
+        "ға", "ге", "қа", "ке", "да", "де", "та", "те", "ды", "ді", "ты", "ті", "ны", "ні",
+    ],
+    key=len,
+    reverse=True,
+)
+
+# Russian grammar terms -> Kazakh terms used in lesson content (stems, prefix-matched)
+SYNONYMS: dict[str, list[str]] = {
+    "падеж": ["септік"],
+    "окончан": ["жалғау"],
+    "суффикс": ["жұрнақ"],
+    "аффикс": ["жалғау", "жұрнақ"],
+    "глагол": ["етістік"],
+    "местоимен": ["есімдік"],
+    "прилагательн": ["сын есім"],
+    "существительн": ["зат есім"],
+    "множествен": ["көптік"],
+    "отрицан": ["болымсыз"],
+    "прошедш": ["өткен шақ"],
+    "будущ": ["келер шақ"],
+    "настоящ": ["осы шақ"],
+    "вопрос": ["сұрақ"],
+}
+_MIN_STEM = 4
+SNIPPET_TOKENS = 12
+
+
+def _dialect(db: AsyncSession) -> str:
+    return db.bind.dialect.name
+
+
+def stem_token(token: str) -> str:
+    """Strip one common Russian/Kazakh inflection ending, keeping at least _MIN_STEM letters."""
+    for suf in _SUFFIXES:
+        if token.endswith(suf) and len(token) - len(suf) >= _MIN_STEM:
+            return token[: -len(suf)]
+    return token
+
+
+def query_terms(query: str) -> list[str]:
+    """Search terms for a free-text query: tokens minus stop words, stemmed, deduplicated."""
+    out = []
+    for tok in tokenize(query):
+        if tok in STOP_WORDS or len(tok) < 2:
+            continue
+        stem = stem_token(tok)
+        for term in [stem] + _synonyms(stem):
+            if term not in out:
+                out.append(term)
+    return out
+
+
+def _synonyms(stem: str) -> list[str]:
+    out = []
+    for key, values in SYNONYMS.items():
+        if stem.startswith(key) or (len(stem) >= _MIN_STEM and key.startswith(stem)):
+            out.extend(values)
+    return out
+
+
+def _sections_text(content: str) -> str:
+    return "\n".join(
+        f"{heading}\n{body}" if heading else body
+        for heading, body in parse_lesson_sections(content or "")
+    )
+
+
+async def ensure_search_index(db: AsyncSession) -> None:
+    """Create the search index if missing and backfill it when out of sync with lessons."""
+    dialect = _dialect(db)
+    if dialect == "sqlite":
+        ddl, table = SQLITE_DDL, "lessons_fts"
+    elif dialect == "postgresql":
+        ddl, table = POSTGRES_DDL, "lesson_search"
+    else:
+        return
+    for stmt in ddl:
+        await db.execute(text(stmt))
+    indexed = (await db.execute(text(f"SELECT count(*) FROM {table}"))).scalar() or 0
+    total = (await db.execute(select(func.count(Lesson.id)))).scalar() or 0
+    if indexed != total:
+        await rebuild_search_index(db)
+
+
+async def rebuild_search_index(db: AsyncSession) -> None:
+    """Re-index every lesson."""
+    dialect = _dialect(db)
+    if dialect == "sqlite":
+        await db.execute(text("DELETE FROM lessons_fts"))
+    elif dialect == "postgresql":
+        await db.execute(text("DELETE FROM lesson_search"))
+    else:
+        return
+    lessons = (await db.execute(select(Lesson))).scalars().all()
+    for lesson in lessons:
+        await index_lesson(db, lesson)
+
+
+async def index_lesson(db: AsyncSession, lesson: Lesson) -> None:
+    """Insert or replace the search row of one lesson."""
+    params = {
+        "id": lesson.id,
+        "title": lesson.title or "",
+        "topic": lesson.topic or "",
+        "sections": _sections_text(lesson.content),
+    }
+    dialect = _dialect(db)
+    if dialect == "sqlite":
+        await db.execute(text("DELETE FROM lessons_fts WHERE rowid = :id"), {"id": lesson.id})
+        await db.execute(
+            text(
+                "INSERT INTO lessons_fts (rowid, title, topic, sections) "
+                "VALUES (:id, :title, :topic, :sections)"
+            ),
+            params,
+        )
+    elif dialect == "postgresql":
+        await db.execute(
+            text(
+                "INSERT INTO lesson_search (lesson_id, title, topic, sections) "
+                "VALUES (:id, :title, :topic, :sections) "
+                "ON CONFLICT (lesson_id) DO UPDATE SET "
+                "title = EXCLUDED.title, topic = EXCLUDED.topic, sections = EXCLUDED.sections"
+            ),
+            params,
+        )
+
+
+async def remove_lesson(db: AsyncSession, lesson_id: int) -> None:
+    """Drop the search row of a deleted lesson."""
+    dialect = _dialect(db)
+    if dialect == "sqlite":
+        await db.execute(text("DELETE FROM lessons_fts WHERE rowid = :id"), {"id": lesson_id})
+    elif dialect == "postgresql":
+        await db.execute(text("DELETE FROM lesson_search WHERE lesson_id = :id"), {"id": lesson_id})
+
+
+async def search_lessons(db: AsyncSession, query: str, limit: int = 10) -> list[dict]:
+    """
+    Ranked lesson search over title, topic and sections.
+    Returns [{id, title, topic, level, order_index, rank, snippet}], best match first.
+    Snippets mark matches with **...**.
+    """
+    terms = query_terms(query)
+    if not terms:
+        return []
+    dialect = _dialect(db)
+    if dialect == "sqlite":
+        match = " OR ".join(f'"{t}"*' for t in terms)
+        result = await db.execute(
+            text(
+                "SELECT l.id, l.title, l.topic, l.level, l.order_index, "
+                "bm25(lessons_fts, 10.0, 5.0, 1.0) AS rank, "
+                f"snippet(lessons_fts, -1, '**', '**', '…', {SNIPPET_TOKENS}) AS snippet "
+                "FROM lessons_fts JOIN lessons l ON l.id = lessons_fts.rowid "
+                "WHERE lessons_fts MATCH :match ORDER BY rank LIMIT :limit"
+            ),
+            {"match": match, "limit": limit},
+        )
+        # bm25() is lower-is-better; expose higher-is-better like ts_rank
+        rows = [(*r[:5], -r[5], r[6]) for r in result.all()]
+    elif dialect == "postgresql":
+        tsquery = " | ".join(
+            "(" + " <-> ".join(f"{w}:*" for w in t.split()) + ")" for t in terms
+        )
+        result = await db.execute(
+            text(
+                "SELECT l.id, l.title, l.topic, l.level, l.order_index, "
+                "ts_rank(s.document, q) AS rank, "
+                "ts_headline('simple', s.sections, q, "
+                "'StartSel=**, StopSel=**, MaxFragments=1, MaxWords=20, MinWords=5') AS snippet "
+                "FROM lesson_search s JOIN lessons l ON l.id = s.lesson_id, "
+                "to_tsquery('simple', :tsquery) q "
+                "WHERE s.document @@ q ORDER BY rank DESC LIMIT :limit"
+            ),
+            {"tsquery": tsquery, "limit": limit},
+        )
+        rows = result.all()
+    else:
+        return []
+    return [
+        {
+            "id": r[0],
+            "title": r[1],
+            "topic": r[2],
+            "level": r[3],
+            "order_index": r[4],
+            "rank": float(r[5]),
+            "snippet": r[6],
+        }
+        for r in rows
+    ]
@@ -1,10 +1,22 @@
 """Lesson business logic."""
-from sqlalchemy import select, func
+from sqlalchemy import select, func, case, and_
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.database import run_after_commit
 from app.models.lesson import Lesson, LessonPrerequisite, LessonCompletion
+from app.models.exercise import Exercise
+from app.models.test import Test, TestAttempt
 from app.models.user import User
 from app.lessons.schemas import LessonCreate, LessonUpdate
+from app.lessons import search_service
+from app.lessons.levels import below_placement
+from app.exercises.progress import get_lesson_exercise_progress
+from app.exercises.service import invalidate_exercise_catalog
+from app.tests.service import invalidate_test_catalog
+from app.progress.service import bump_progress, invalidate_total_lessons
+from app.progress.activity import record_activity
+from app.assistant import retrieval, grammar_index
+from app.vocabulary import lesson_index
 
 
 async def get_lesson_for_assistant(
@@ -25,6 +37,7 @@ def _lesson_to_dict(lesson: Lesson) -> dict:
         "title": lesson.title,
         "topic": lesson.topic,
         "content": lesson.content or "",
+        "order_index": lesson.order_index,
     }
 
 
@@ -56,13 +69,23 @@ async def get_lesson_by_order_index(
     return None
 
 
+async def find_lesson_by_topic(db: AsyncSession, query: str) -> dict | None:
+    """Best full-text match for a topic query ("падежи", "числа"). Returns assistant dict or None."""
+    hits = await search_service.search_lessons(db, query, limit=1)
+    if not hits:
+        return None
+    return await get_lesson_for_assistant(db, hits[0]["id"])
+
+
 async def get_completed_lesson_ids(db: AsyncSession, user_id: int) -> set[int]:
-    """Get set of lesson IDs completed by user."""
-    result = await db.execute(
-        select(LessonCompletion.lesson_id).where(
-            LessonCompletion.user_id == user_id
-        )
-    )
+    """
+    Get set of lesson IDs completed by user, for prerequisite checks.
+    Lessons below the user's placement level count as completed (one query, UNION).
+    """
+    placement_level = select(User.placement_level).where(User.id == user_id).scalar_subquery()
+    completed = select(LessonCompletion.lesson_id).where(LessonCompletion.user_id == user_id)
+    skipped = select(Lesson.id).where(below_placement(Lesson.level, placement_level))
+    result = await db.execute(completed.union(skipped))
     return set(row[0] for row in result.all())
 
 
@@ -107,6 +130,7 @@ async def create_lesson(db: AsyncSession, data: LessonCreate) -> Lesson:
         db.add(LessonPrerequisite(lesson_id=lesson.id, prerequisite_lesson_id=pid))
     await db.flush()
     await db.refresh(lesson)
+    await refresh_lesson_indexes(db, lesson)
     return lesson
 
 
@@ -138,9 +162,58 @@ async def update_lesson(
             db.add(LessonPrerequisite(lesson_id=lesson.id, prerequisite_lesson_id=pid))
     await db.flush()
     await db.refresh(lesson)
+    await refresh_lesson_indexes(db, lesson)
     return lesson
 
 
+async def delete_lesson(db: AsyncSession, lesson: Lesson) -> None:
+    """Delete lesson and drop it from lesson indexes."""
+    lesson_id = lesson.id
+    await db.delete(lesson)
+    await db.flush()
+    await drop_lesson_from_indexes(db, lesson_id)
+
+
+async def build_lesson_indexes(db: AsyncSession) -> None:
+    """Create/backfill lesson indexes at startup."""
+    await search_service.ensure_search_index(db)
+    await lesson_index.ensure_lesson_vocabulary(db)
+    lessons = [_lesson_to_dict(les) for les in (await db.execute(select(Lesson))).scalars().all()]
+    retrieval.build_retrieval_index(lessons)
+    grammar_index.build_grammar_index(lessons)
+
+
+async def refresh_lesson_indexes(db: AsyncSession, lesson: Lesson) -> None:
+    """Re-index a lesson after it was created or edited."""
+    await search_service.index_lesson(db, lesson)
+    await lesson_index.index_lesson_vocabulary(db, lesson)
+    lesson_dict = _lesson_to_dict(lesson)
+
+    # The in-memory indexes must not see an edit that is rolled back
+    def index() -> None:
+        retrieval.index_lesson(lesson_dict)
+        grammar_index.index_lesson(lesson_dict)
+
+    run_after_commit(db, index)
+    invalidate_total_lessons(db)
+
+
+async def drop_lesson_from_indexes(db: AsyncSession, lesson_id: int) -> None:
+    """Remove a deleted lesson from lesson indexes."""
+    await search_service.remove_lesson(db, lesson_id)
+    await lesson_index.remove_lesson_vocabulary(db, lesson_id)
+
+    def remove() -> None:
+        retrieval.remove_lesson(lesson_id)
+        grammar_index.remove_lesson(lesson_id)
+
+    run_after_commit(db, remove)
+    # Its exercises and tests are deleted with it
+    invalidate_exercise_catalog(db, lesson_id)
+    invalidate_test_catalog(db, lesson_id)
+    invalidate_total_lessons(db)
+
+
 async def complete_lesson(db: AsyncSession, user_id: int, lesson_id: int) -> None:
     """Mark lesson as completed for user."""
     existing = await db.execute(
@@ -153,6 +226,8 @@ async def complete_lesson(db: AsyncSession, user_id: int, lesson_id: int) -> Non
         return
     db.add(LessonCompletion(user_id=user_id, lesson_id=lesson_id))
     await db.flush()
+    await bump_progress(db, user_id, lessons_completed=1)
+    await record_activity(db, user_id, lessons=1)
 
 
 async def get_next_lesson(
@@ -212,3 +287,47 @@ async def get_next_lesson(
             }
 
     return None
+
+
+async def list_lesson_exercises(db: AsyncSession, lesson_id: int) -> list[Exercise]:
+    """Exercises of a lesson in display order."""
+    result = await db.execute(
+        select(Exercise)
+        .where(Exercise.lesson_id == lesson_id)
+        .order_by(Exercise.order_index, Exercise.id)
+    )
+    return list(result.scalars().all())
+
+
+async def list_lesson_tests(db: AsyncSession, lesson_id: int) -> list[Test]:
+    """Tests of a lesson."""
+    result = await db.execute(
+        select(Test).where(Test.lesson_id == lesson_id).order_by(Test.id)
+    )
+    return list(result.scalars().all())
+
+
+async def get_lesson_progress(db: AsyncSession, user_id: int, lesson_id: int) -> dict:
+    """
+    Per-lesson progress for user: exercise attempts/correct/solved (from the
+    user_exercise_progress rollup), best test score, whether the final test is passed.
+    """
+    exercises = await get_lesson_exercise_progress(db, user_id, lesson_id)
+    test_row = (
+        await db.execute(
+            select(
+                func.max(TestAttempt.score),
+                func.max(case((and_(Test.is_final == True, TestAttempt.passed == True), 1), else_=0)),
+            )
+            .join(Test, Test.id == TestAttempt.test_id)
+            .where(
+                Test.lesson_id == lesson_id,
+                TestAttempt.user_id == user_id,
+            )
+        )
+    ).one()
+    return {
+        **exercises,
+        "best_test_score": test_row[0],
+        "final_test_passed": bool(test_row[1]),
+    }
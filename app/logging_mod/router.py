@@ -1,39 +1,41 @@
 """Logs API routes (admin only)."""
+from datetime import datetime
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
-from app.core.deps import get_current_user, RequireAdmin
+from app.core.deps import RequireAdmin
 from app.models.user import User
-from app.models.log import Log
+from app.logging_mod.schemas import LogPage
+from app.logging_mod.service import audit_log_stats, get_log_page
 
 router = APIRouter(prefix="/logs", tags=["logs"])
 
 
-@router.get("/")
+@router.get("/", response_model=LogPage)
 async def list_logs(
     current_user: Annotated[User, RequireAdmin],
     db: Annotated[AsyncSession, Depends(get_db)],
-    limit: int = Query(100, le=500),
-    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+    cursor: str | None = None,
+    user_id: int | None = None,
+    action: str | None = None,
+    entity_type: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
 ):
-    """List action logs (admin only)."""
-    result = await db.execute(
-        select(Log).order_by(Log.created_at.desc()).limit(limit).offset(offset)
-    )
-    logs = result.scalars().all()
-    return [
-        {
-            "id": l.id,
-            "user_id": l.user_id,
-            "action": l.action,
-            "entity_type": l.entity_type,
-            "entity_id": l.entity_id,
-            "details": l.details,
-            "created_at": l.created_at.isoformat(),
-        }
-        for l in logs
-    ]
+    """Action logs, newest first (admin only); pass next_cursor to get the next page."""
+    try:
+        return await get_log_page(db, limit, cursor, user_id, action, entity_type, since, until)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/buffer")
+async def log_buffer_stats(
+    current_user: Annotated[User, RequireAdmin],
+):
+    """Audit log buffer depth, write counters and spill count (admin only)."""
+    return audit_log_stats()
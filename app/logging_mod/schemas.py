@@ -0,0 +1,23 @@
+"""Log schemas."""
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class LogRead(BaseModel):
+    id: int
+    user_id: int | None
+    action: str
+    entity_type: str | None
+    entity_id: int | None
+    details: str | None
+    ip_address: str | None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class LogPage(BaseModel):
+    items: list[LogRead]
+    next_cursor: str | None = None
@@ -1,11 +1,107 @@
-"""Action logging service."""
+"""
+Action logging service.
+log_action() does not touch the caller's session: entries go to a bounded in-memory
+buffer that a background worker bulk-inserts on its own session every
+AUDIT_LOG_FLUSH_MS or AUDIT_LOG_BATCH entries, so a rolled-back request keeps its
+audit trail. When the buffer is full, the worker is not running or entries cannot be
+written, they are appended to AUDIT_LOG_SPILL_FILE (AUDIT_LOG_OVERFLOW = "spill") on a
+background thread, or counted and dropped ("drop"). A batch the database rejects is
+split so only the offending entries spill. Spilled entries are loaded back with
+python -m scripts.load_spilled_logs; lines that still cannot be inserted are moved to
+AUDIT_LOG_SPILL_FILE + ".rejected".
+"""
+import asyncio
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+from sqlalchemy import select, insert, tuple_
+from sqlalchemy.exc import InterfaceError, OperationalError, StatementError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import get_settings
+from app.core.database import async_session_maker
+from app.core.tasks import BatchWorker
 from app.models.log import Log
 
+logger = logging.getLogger(__name__)
 
-async def log_action(
-    db: AsyncSession,
+_settings = get_settings()
+spilled = 0
+# One thread keeps spill writes off the event loop and in order
+_spill_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="audit-spill")
+
+
+def _append_lines(path: Path, lines: list[str]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("a", encoding="utf-8") as f:
+        f.writelines(line + "\n" for line in lines)
+
+
+def _spill(entries: list[dict]) -> None:
+    """Append entries to the spill file (blocking; runs on the spill thread)."""
+    global spilled
+    if _settings.AUDIT_LOG_OVERFLOW != "spill":
+        return
+    try:
+        _append_lines(
+            Path(_settings.AUDIT_LOG_SPILL_FILE),
+            [json.dumps({**e, "created_at": e["created_at"].isoformat()}, ensure_ascii=False) for e in entries],
+        )
+        spilled += len(entries)
+    except OSError:
+        logger.exception("could not spill %d audit log entries", len(entries))
+
+
+def _spill_later(entries: list[dict]) -> None:
+    _spill_executor.submit(_spill, entries)
+
+
+async def _insert_entries(db: AsyncSession, entries: list[dict]) -> list[dict]:
+    """
+    Insert and commit entries. A batch rejected by the database is split in halves, so
+    only the offending entries are returned. Connection errors are raised.
+    """
+    try:
+        await db.execute(insert(Log), entries)
+        await db.commit()
+        return []
+    except (OperationalError, InterfaceError):
+        raise
+    except StatementError:
+        await db.rollback()
+        if len(entries) == 1:
+            return entries
+    mid = len(entries) // 2
+    return await _insert_entries(db, entries[:mid]) + await _insert_entries(db, entries[mid:])
+
+
+async def _write(entries: list[dict]) -> None:
+    try:
+        async with async_session_maker() as db:
+            failed = await _insert_entries(db, entries)
+    except Exception:
+        logger.exception("audit log batch of %d entries failed", len(entries))
+        failed = entries
+    else:
+        if failed:
+            logger.warning("%d of %d audit log entries rejected", len(failed), len(entries))
+    if failed:
+        await asyncio.get_running_loop().run_in_executor(_spill_executor, _spill, failed)
+
+
+audit_log_worker = BatchWorker(
+    "audit-log",
+    _write,
+    maxsize=_settings.AUDIT_LOG_BUFFER,
+    max_batch=_settings.AUDIT_LOG_BATCH,
+    max_wait=_settings.AUDIT_LOG_FLUSH_MS / 1000,
+)
+
+
+def log_action(
     user_id: int | None,
     action: str,
     entity_type: str | None = None,
@@ -13,14 +109,122 @@ async def log_action(
     details: str | None = None,
     ip_address: str | None = None,
 ) -> None:
-    """Log user action to database."""
-    log = Log(
-        user_id=user_id,
-        action=action,
-        entity_type=entity_type,
-        entity_id=entity_id,
-        details=details,
-        ip_address=ip_address,
-    )
-    db.add(log)
-    await db.flush()
+    """Record a user action; never waits for the database."""
+    entry = {
+        "user_id": user_id,
+        "action": action,
+        "entity_type": entity_type,
+        "entity_id": entity_id,
+        "details": details,
+        "ip_address": ip_address,
+        "created_at": datetime.utcnow(),
+    }
+    if not audit_log_worker.offer(entry):
+        _spill_later([entry])
+
+
+def audit_log_stats() -> dict:
+    return {**audit_log_worker.stats(), "spilled": spilled}
+
+
+async def load_spilled_logs(db: AsyncSession, path: str | None = None) -> tuple[int, int]:
+    """
+    Insert entries from the spill file, then remove it. Lines that cannot be parsed or
+    inserted are appended to <path>.rejected. Returns (loaded, rejected).
+    """
+    spill = Path(path or _settings.AUDIT_LOG_SPILL_FILE)
+    # Entries spilled while loading go to a fresh file. A .loading file left by a load
+    # that failed midway is kept and loaded together with the new entries.
+    loading = spill.with_name(spill.name + ".loading")
+    if spill.exists():
+        if loading.exists():
+            moved = spill.with_name(f"{spill.name}.{datetime.utcnow():%Y%m%d%H%M%S%f}")
+            spill.replace(moved)
+            _append_lines(loading, moved.read_text(encoding="utf-8").splitlines())
+            moved.unlink()
+        else:
+            spill.replace(loading)
+    if not loading.exists():
+        return 0, 0
+    lines, entries, rejected = [], [], []
+    for line in loading.read_text(encoding="utf-8").splitlines():
+        if not line.strip():
+            continue
+        try:
+            entry = json.loads(line)
+            entry["created_at"] = datetime.fromisoformat(entry["created_at"])
+        except (ValueError, TypeError, KeyError):
+            rejected.append(line)
+            continue
+        lines.append(line)
+        entries.append(entry)
+    loaded = 0
+    batch = _settings.AUDIT_LOG_BATCH
+    for i in range(0, len(entries), batch):
+        chunk = entries[i:i + batch]
+        try:
+            failed = {id(e) for e in await _insert_entries(db, chunk)}
+        except Exception:
+            # Keep what was not loaded yet for the next run
+            loading.write_text("".join(line + "\n" for line in rejected + lines[i:]), encoding="utf-8")
+            raise
+        loaded += len(chunk) - len(failed)
+        rejected += [line for line, e in zip(lines[i:i + batch], chunk) if id(e) in failed]
+    if rejected:
+        _append_lines(spill.with_name(spill.name + ".rejected"), rejected)
+    loading.unlink()
+    return loaded, len(rejected)
+
+
+def _naive_utc(value: datetime | None) -> datetime | None:
+    """created_at is naive UTC: convert aware values, take naive ones as UTC."""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _parse_cursor(cursor: str | None) -> tuple[datetime, int] | None:
+    if not cursor:
+        return None
+    try:
+        created_at, log_id = cursor.rsplit(":", 1)
+        return datetime.fromisoformat(created_at), int(log_id)
+    except ValueError:
+        raise ValueError("Invalid cursor")
+
+
+async def get_log_page(
+    db: AsyncSession,
+    limit: int,
+    cursor: str | None = None,
+    user_id: int | None = None,
+    action: str | None = None,
+    entity_type: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+) -> dict:
+    """
+    Log entries newest first, keyset-paginated on (created_at, id): {items, next_cursor}.
+    Filters are ANDed; since is inclusive, until exclusive (naive values are UTC).
+    """
+    since, until = _naive_utc(since), _naive_utc(until)
+    q = select(Log).order_by(Log.created_at.desc(), Log.id.desc())
+    if user_id is not None:
+        q = q.where(Log.user_id == user_id)
+    if action:
+        q = q.where(Log.action == action)
+    if entity_type:
+        q = q.where(Log.entity_type == entity_type)
+    if since is not None:
+        q = q.where(Log.created_at >= since)
+    if until is not None:
+        q = q.where(Log.created_at < until)
+    after = _parse_cursor(cursor)
+    if after:
+        q = q.where(tuple_(Log.created_at, Log.id) < tuple_(after[0], after[1]))
+    rows = list((await db.execute(q.limit(limit + 1))).scalars().all())
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_cursor = f"{last.created_at.isoformat()}:{last.id}"
+    return {"items": rows[:limit], "next_cursor": next_cursor}
@@ -3,9 +3,24 @@ Database models - centralized export.
 """
 from app.models.user import User
 from app.models.lesson import Lesson, LessonPrerequisite, LessonCompletion
-from app.models.exercise import Exercise, ExerciseAttempt
-from app.models.test import Test, TestQuestion, TestAttempt, TestAttemptAnswer
-from app.models.vocabulary import Vocabulary, UserVocabulary
+from app.models.exercise import Exercise, ExerciseAttempt, UserExerciseProgress
+from app.models.test import (
+    Test,
+    TestQuestion,
+    TestAttempt,
+    TestAttemptAnswer,
+    TestQuestionStats,
+    TestQuestionOptionStats,
+    PlacementAttempt,
+)
+from app.models.vocabulary import Vocabulary, UserVocabulary, LessonVocabulary
+from app.models.progress import UserProgressCounters, UserDailyActivity, LeaderboardSnapshot
+from app.models.cohort import (
+    AggregationWatermark,
+    CohortLessonStudent,
+    CohortLessonStats,
+    CohortStudentStats,
+)
 from app.models.recommendation import Recommendation
 from app.models.log import Log
 from app.models.file import File
@@ -17,12 +32,24 @@ __all__ = [
     "LessonCompletion",
     "Exercise",
     "ExerciseAttempt",
+    "UserExerciseProgress",
     "Test",
     "TestQuestion",
     "TestAttempt",
     "TestAttemptAnswer",
+    "TestQuestionStats",
+    "TestQuestionOptionStats",
+    "PlacementAttempt",
     "Vocabulary",
     "UserVocabulary",
+    "LessonVocabulary",
+    "UserProgressCounters",
+    "UserDailyActivity",
+    "LeaderboardSnapshot",
+    "AggregationWatermark",
+    "CohortLessonStudent",
+    "CohortLessonStats",
+    "CohortStudentStats",
     "Recommendation",
     "Log",
     "File",
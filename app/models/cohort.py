@@ -0,0 +1,94 @@
+"""
+Teacher cohort analytics: summary tables filled by the periodic aggregation job
+(app/cohort/aggregation.py) and its source watermarks.
+"""
+from datetime import date, datetime
+
+from sqlalchemy import String, Integer, Float, Date, DateTime, ForeignKey, Index
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+class AggregationWatermark(Base):
+    """Position of an incremental job in one source table (last processed id / time)."""
+
+    __tablename__ = "aggregation_watermarks"
+
+    name: Mapped[str] = mapped_column(String(100), primary_key=True)
+    last_id: Mapped[int] = mapped_column(Integer, default=0)
+    last_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
+    )
+
+
+class CohortLessonStudent(Base):
+    """One student's work in one lesson."""
+
+    __tablename__ = "cohort_lesson_students"
+    __table_args__ = (
+        Index("ix_cohort_lesson_students_user_id", "user_id"),
+    )
+
+    lesson_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("lessons.id", ondelete="CASCADE"), primary_key=True
+    )
+    user_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    exercise_attempts: Mapped[int] = mapped_column(Integer, default=0)
+    exercise_correct: Mapped[int] = mapped_column(Integer, default=0)
+    test_attempts: Mapped[int] = mapped_column(Integer, default=0)
+    tests_passed: Mapped[int] = mapped_column(Integer, default=0)
+    test_score_sum: Mapped[float] = mapped_column(Float, default=0.0)
+    best_score: Mapped[float | None] = mapped_column(Float, nullable=True)
+    completed: Mapped[int] = mapped_column(Integer, default=0)
+
+
+class CohortLessonStats(Base):
+    """Completion funnel and scores of one lesson over all students."""
+
+    __tablename__ = "cohort_lesson_stats"
+
+    lesson_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("lessons.id", ondelete="CASCADE"), primary_key=True
+    )
+    students_started: Mapped[int] = mapped_column(Integer, default=0)
+    students_tested: Mapped[int] = mapped_column(Integer, default=0)
+    students_passed: Mapped[int] = mapped_column(Integer, default=0)
+    students_completed: Mapped[int] = mapped_column(Integer, default=0)
+    exercise_attempts: Mapped[int] = mapped_column(Integer, default=0)
+    exercise_correct: Mapped[int] = mapped_column(Integer, default=0)
+    test_attempts: Mapped[int] = mapped_column(Integer, default=0)
+    test_score_sum: Mapped[float] = mapped_column(Float, default=0.0)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
+    )
+
+
+class CohortStudentStats(Base):
+    """Per-student totals with a struggle score (higher = needs attention)."""
+
+    __tablename__ = "cohort_student_stats"
+    __table_args__ = (
+        Index("ix_cohort_student_stats_struggle", "struggle_score", "user_id"),
+    )
+
+    user_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    lessons_started: Mapped[int] = mapped_column(Integer, default=0)
+    lessons_completed: Mapped[int] = mapped_column(Integer, default=0)
+    exercise_attempts: Mapped[int] = mapped_column(Integer, default=0)
+    exercise_correct: Mapped[int] = mapped_column(Integer, default=0)
+    test_attempts: Mapped[int] = mapped_column(Integer, default=0)
+    tests_passed: Mapped[int] = mapped_column(Integer, default=0)
+    avg_test_score: Mapped[float | None] = mapped_column(Float, nullable=True)
+    vocabulary_size: Mapped[int] = mapped_column(Integer, default=0)
+    vocabulary_learned: Mapped[int] = mapped_column(Integer, default=0)
+    last_active_day: Mapped[date | None] = mapped_column(Date, nullable=True)
+    struggle_score: Mapped[float | None] = mapped_column(Float, nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
+    )
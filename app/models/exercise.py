@@ -4,7 +4,7 @@ Exercise and exercise attempts models.
 from datetime import datetime
 from enum import Enum
 
-from sqlalchemy import String, Integer, Text, DateTime, ForeignKey, Boolean, JSON
+from sqlalchemy import String, Integer, Text, DateTime, ForeignKey, Boolean, JSON, Index
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.core.database import Base
@@ -56,3 +56,28 @@ class ExerciseAttempt(Base):
     created_at: Mapped[datetime] = mapped_column(
         DateTime, default=datetime.utcnow
     )
+
+
+class UserExerciseProgress(Base):
+    """Per-user, per-exercise rollup of exercise_attempts, upserted on each submission."""
+
+    __tablename__ = "user_exercise_progress"
+    __table_args__ = (
+        Index("ix_user_exercise_progress_user_lesson", "user_id", "lesson_id"),
+    )
+
+    user_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    exercise_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("exercises.id", ondelete="CASCADE"), primary_key=True
+    )
+    lesson_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("lessons.id", ondelete="CASCADE")
+    )
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    correct_count: Mapped[int] = mapped_column(Integer, default=0)
+    first_correct_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    last_attempt_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow
+    )
@@ -3,7 +3,7 @@ Action logging model.
 """
 from datetime import datetime
 
-from sqlalchemy import String, Integer, Text, DateTime, ForeignKey
+from sqlalchemy import String, Integer, Text, DateTime, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.core.database import Base
@@ -13,6 +13,13 @@ class Log(Base):
     """User action log for admin review."""
 
     __tablename__ = "logs"
+    # Newest-first keyset pages, unfiltered or by one equality filter
+    __table_args__ = (
+        Index("ix_logs_created_at_id", "created_at", "id"),
+        Index("ix_logs_user_created", "user_id", "created_at", "id"),
+        Index("ix_logs_action_created", "action", "created_at", "id"),
+        Index("ix_logs_entity_created", "entity_type", "created_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     user_id: Mapped[int | None] = mapped_column(
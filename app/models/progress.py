@@ -0,0 +1,65 @@
+"""
+Materialized per-user progress counters, daily activity and leaderboard snapshots.
+"""
+from datetime import date, datetime
+
+from sqlalchemy import String, Integer, Float, Date, DateTime, ForeignKey, Index
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+class UserProgressCounters(Base):
+    """Dashboard totals for one user, kept in step with the source tables by their writers."""
+
+    __tablename__ = "user_progress_counters"
+
+    user_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    lessons_completed: Mapped[int] = mapped_column(Integer, default=0)
+    exercise_attempts: Mapped[int] = mapped_column(Integer, default=0)
+    exercise_correct: Mapped[int] = mapped_column(Integer, default=0)
+    test_attempts: Mapped[int] = mapped_column(Integer, default=0)
+    test_passed: Mapped[int] = mapped_column(Integer, default=0)
+    vocabulary_size: Mapped[int] = mapped_column(Integer, default=0)
+    vocabulary_learned: Mapped[int] = mapped_column(Integer, default=0)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True
+    )
+
+
+class UserDailyActivity(Base):
+    """One user's activity on one (UTC) day, incremented by the write paths."""
+
+    __tablename__ = "user_daily_activity"
+
+    user_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    lessons: Mapped[int] = mapped_column(Integer, default=0)
+    exercises: Mapped[int] = mapped_column(Integer, default=0)
+    tests: Mapped[int] = mapped_column(Integer, default=0)
+    reviews: Mapped[int] = mapped_column(Integer, default=0)
+    # Estimated study time: gaps between consecutive events, see app/progress/activity.py
+    minutes: Mapped[float] = mapped_column(Float, default=0.0)
+    # Leaderboard XP gained this day (losses only reduce the all-time total)
+    xp: Mapped[int] = mapped_column(Integer, default=0)
+    last_activity_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+
+class LeaderboardSnapshot(Base):
+    """Persisted standing of one user on one board ("all" or "week:<monday>")."""
+
+    __tablename__ = "leaderboard_snapshots"
+    __table_args__ = (
+        Index("ix_leaderboard_snapshots_board_xp", "board", "xp"),
+    )
+
+    board: Mapped[str] = mapped_column(String(20), primary_key=True)
+    user_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    xp: Mapped[int] = mapped_column(Integer, default=0)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
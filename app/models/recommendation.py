@@ -3,7 +3,7 @@ Recommendation model - adaptive suggestions.
 """
 from datetime import datetime
 
-from sqlalchemy import String, Integer, Text, DateTime, ForeignKey, Boolean
+from sqlalchemy import String, Integer, Text, DateTime, ForeignKey, Boolean, Index
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.core.database import Base
@@ -13,6 +13,13 @@ class Recommendation(Base):
     """Rule-based recommendation for user."""
 
     __tablename__ = "recommendations"
+    __table_args__ = (
+        # Dedupe lookups of the recommendation generator
+        Index("ix_recommendations_user_type_lesson", "user_id", "recommendation_type", "target_lesson_id"),
+        # Keyset pages (newest first) and the unread counter
+        Index("ix_recommendations_user_created", "user_id", "created_at", "id"),
+        Index("ix_recommendations_user_is_read", "user_id", "is_read"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     user_id: Mapped[int] = mapped_column(
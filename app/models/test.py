@@ -3,7 +3,7 @@ Test, questions, and attempts models.
 """
 from datetime import datetime
 
-from sqlalchemy import String, Integer, Text, DateTime, ForeignKey, Float, JSON
+from sqlalchemy import String, Integer, Text, DateTime, ForeignKey, Float, JSON, Index
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.core.database import Base
@@ -22,6 +22,8 @@ class Test(Base):
     description: Mapped[str | None] = mapped_column(Text, nullable=True)
     passing_score: Mapped[float] = mapped_column(Float, default=70.0)
     is_final: Mapped[bool] = mapped_column(default=False)
+    # Random subset size per attempt; None = all questions
+    questions_per_attempt: Mapped[int | None] = mapped_column(Integer, nullable=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime, default=datetime.utcnow
     )
@@ -49,6 +51,10 @@ class TestAttempt(Base):
     """Student attempt on a test."""
 
     __tablename__ = "test_attempts"
+    __table_args__ = (
+        # Incremental readers of completed attempts (cohort aggregation)
+        Index("ix_test_attempts_completed_at", "completed_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     user_id: Mapped[int] = mapped_column(
@@ -59,6 +65,10 @@ class TestAttempt(Base):
     )
     score: Mapped[float | None] = mapped_column(Float, nullable=True)
     passed: Mapped[bool | None] = mapped_column(nullable=True)  # None = incomplete
+    # Ability estimate (Rasch theta) for adaptive attempts, None for fixed-form tests
+    ability: Mapped[float | None] = mapped_column(Float, nullable=True)
+    # Item served to an unfinished adaptive attempt; only this question may be answered
+    current_question_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
     started_at: Mapped[datetime] = mapped_column(
         DateTime, default=datetime.utcnow
     )
@@ -80,5 +90,66 @@ class TestAttemptAnswer(Base):
         Integer, ForeignKey("test_questions.id", ondelete="CASCADE")
     )
     user_answer: Mapped[dict] = mapped_column(JSON)
-    is_correct: Mapped[bool | None] = mapped_column(nullable=True)
+    is_correct: Mapped[bool | None] = mapped_column(nullable=True)  # None = autosaved draft
     points_earned: Mapped[float | None] = mapped_column(Float, nullable=True)
+
+    __table_args__ = (
+        Index("uq_test_attempt_answer", "test_attempt_id", "question_id", unique=True),
+    )
+
+
+class TestQuestionStats(Base):
+    """Per-question rollup updated on each test submission (item analysis)."""
+
+    __tablename__ = "test_question_stats"
+
+    question_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("test_questions.id", ondelete="CASCADE"), primary_key=True
+    )
+    test_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("tests.id", ondelete="CASCADE"), index=True
+    )
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    correct: Mapped[int] = mapped_column(Integer, default=0)
+    # Sums of attempt scores (0-100) for point-biserial discrimination
+    score_sum: Mapped[float] = mapped_column(Float, default=0.0)
+    score_sq_sum: Mapped[float] = mapped_column(Float, default=0.0)
+    correct_score_sum: Mapped[float] = mapped_column(Float, default=0.0)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
+    )
+
+
+class TestQuestionOptionStats(Base):
+    """How many times each answer value was given to a question."""
+
+    __tablename__ = "test_question_option_stats"
+
+    question_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("test_questions.id", ondelete="CASCADE"), primary_key=True
+    )
+    option: Mapped[str] = mapped_column(String(255), primary_key=True)
+    count: Mapped[int] = mapped_column(Integer, default=0)
+
+
+class PlacementAttempt(Base):
+    """Placement test session: items drawn level by level from all test questions."""
+
+    __tablename__ = "placement_attempts"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    user_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), index=True
+    )
+    current_level: Mapped[str] = mapped_column(String(10), default="A1")
+    current_question_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    # {"A1": [asked, correct], ...} and question ids already asked
+    level_stats: Mapped[dict] = mapped_column(JSON, default=dict)
+    asked: Mapped[list] = mapped_column(JSON, default=list)
+    result_level: Mapped[str | None] = mapped_column(String(10), nullable=True)
+    started_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow
+    )
+    completed_at: Mapped[datetime | None] = mapped_column(
+        DateTime, nullable=True
+    )
@@ -43,6 +43,10 @@ class User(Base):
     language_level: Mapped[LanguageLevel | None] = mapped_column(
         SQLEnum(LanguageLevel), nullable=True
     )
+    # Level assigned by the placement test; lessons below it count as done for prerequisites
+    placement_level: Mapped[LanguageLevel | None] = mapped_column(
+        SQLEnum(LanguageLevel), nullable=True
+    )
     interface_language: Mapped[InterfaceLanguage] = mapped_column(
         SQLEnum(InterfaceLanguage), default=InterfaceLanguage.RUSSIAN
     )
@@ -4,7 +4,7 @@ Vocabulary and user vocabulary models.
 from datetime import datetime
 from enum import Enum
 
-from sqlalchemy import String, Integer, Text, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy import String, Integer, Text, DateTime, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.core.database import Base
@@ -57,3 +57,21 @@ class UserVocabulary(Base):
     __table_args__ = (
         UniqueConstraint("user_id", "vocabulary_id", name="uq_user_vocab"),
     )
+
+
+class LessonVocabulary(Base):
+    """Inverted index: which dictionary words occur in which lesson (built from lesson content)."""
+
+    __tablename__ = "lesson_vocabulary"
+
+    lesson_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("lessons.id", ondelete="CASCADE"), primary_key=True
+    )
+    vocabulary_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("vocabulary.id", ondelete="CASCADE"), primary_key=True
+    )
+    occurrences: Mapped[int] = mapped_column(Integer, default=1)
+
+    __table_args__ = (
+        Index("ix_lesson_vocabulary_vocabulary_id", "vocabulary_id", "lesson_id"),
+    )
@@ -0,0 +1,235 @@
+"""
+Daily activity rollup (table user_daily_activity) and streaks.
+Write paths call record_activity() with what the user just did; each call upserts the
+row of the current UTC day. Study time is estimated from the gaps between consecutive
+events of a day: gaps up to IDLE_MINUTES count fully, a longer pause starts a new
+session worth NEW_SESSION_MINUTES. Reads cost O(days) per user.
+The row also sums the XP gained that day, which the weekly leaderboard is rebuilt from.
+"""
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import select, delete, func, case, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import dialect_insert
+from app.models.exercise import ExerciseAttempt
+from app.models.lesson import LessonCompletion
+from app.models.progress import UserDailyActivity
+from app.models.test import TestAttempt
+from app.models.vocabulary import UserVocabulary
+
+ACTIVITIES = ("lessons", "exercises", "tests", "reviews")
+IDLE_MINUTES = 10.0
+NEW_SESSION_MINUTES = 1.0
+STREAK_LOOKBACK_DAYS = 366
+
+# Leaderboard XP per event: an exercise solved for the first time, a test passed for
+# the first time, a word learned (the vocabulary_learned counter, which can go down)
+XP_RULES = {"exercise_solved": 10, "test_first_passed": 50, "vocabulary_learned": 20}
+
+
+def xp_for(counts: dict[str, int]) -> int:
+    """XP worth of event counts or deltas (XP_RULES name -> count)."""
+    return sum(points * (counts.get(name) or 0) for name, points in XP_RULES.items())
+
+
+def _gap_minutes(db: AsyncSession, later, earlier):
+    if db.bind.dialect.name == "postgresql":
+        return func.extract("epoch", later - earlier) / 60.0
+    return (func.julianday(later) - func.julianday(earlier)) * 1440.0
+
+
+async def record_activity(db: AsyncSession, user_id: int, **counts: int) -> None:
+    """Add activity counts (lessons, exercises, tests, reviews) to today's row."""
+    counts = {k: v for k, v in counts.items() if v}
+    if not counts:
+        return
+    now = datetime.utcnow()
+    stmt = dialect_insert(db, UserDailyActivity).values(
+        user_id=user_id,
+        day=now.date(),
+        minutes=NEW_SESSION_MINUTES,
+        last_activity_at=now,
+        **{name: counts.get(name, 0) for name in ACTIVITIES},
+    )
+    gap = _gap_minutes(db, stmt.excluded.last_activity_at, UserDailyActivity.last_activity_at)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["user_id", "day"],
+        set_={
+            **{name: getattr(UserDailyActivity, name) + getattr(stmt.excluded, name) for name in counts},
+            "minutes": UserDailyActivity.minutes
+            + case((gap.between(0, IDLE_MINUTES), gap), else_=NEW_SESSION_MINUTES),
+            "last_activity_at": stmt.excluded.last_activity_at,
+        },
+    )
+    await db.execute(stmt)
+
+
+async def add_daily_xp(db: AsyncSession, user_id: int, xp: int) -> None:
+    """Add XP gained now to today's row (a new row counts as the start of a session)."""
+    now = datetime.utcnow()
+    stmt = dialect_insert(db, UserDailyActivity).values(
+        user_id=user_id,
+        day=now.date(),
+        minutes=NEW_SESSION_MINUTES,
+        last_activity_at=now,
+        xp=xp,
+        **dict.fromkeys(ACTIVITIES, 0),
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["user_id", "day"],
+        set_={"xp": UserDailyActivity.xp + stmt.excluded.xp},
+    )
+    await db.execute(stmt)
+
+
+def session_minutes(times: list[datetime]) -> float:
+    """Study time for one day's sorted event times (same rule as record_activity)."""
+    if not times:
+        return 0.0
+    total = NEW_SESSION_MINUTES
+    for earlier, later in zip(times, times[1:]):
+        gap = (later - earlier).total_seconds() / 60.0
+        total += gap if 0 <= gap <= IDLE_MINUTES else NEW_SESSION_MINUTES
+    return total
+
+
+async def rebuild_daily_activity(db: AsyncSession, user_id: int | None = None) -> int:
+    """
+    Recompute the rollup from lesson completions, exercise attempts and completed tests.
+    Word reviews are not stored per event, so only each word's last review is counted
+    (and a learned word's XP is credited to that day). Exercise and test XP go to the day
+    of the first correct answer / first pass. Returns rows written.
+    """
+    sources = (
+        ("lessons", LessonCompletion.user_id, LessonCompletion.completed_at),
+        ("exercises", ExerciseAttempt.user_id, ExerciseAttempt.created_at),
+        ("tests", TestAttempt.user_id, TestAttempt.completed_at),
+        ("reviews", UserVocabulary.user_id, UserVocabulary.last_reviewed_at),
+    )
+    events: dict[tuple[int, date], list[tuple[datetime, str]]] = {}
+    for name, user_col, time_col in sources:
+        q = select(user_col, time_col).where(time_col.is_not(None))
+        if user_id is not None:
+            q = q.where(user_col == user_id)
+        for uid, at in (await db.execute(q)).all():
+            events.setdefault((uid, at.date()), []).append((at, name))
+    gains = (
+        (
+            "exercise_solved",
+            ExerciseAttempt.user_id,
+            select(ExerciseAttempt.user_id, func.min(ExerciseAttempt.created_at))
+            .where(ExerciseAttempt.is_correct == True)
+            .group_by(ExerciseAttempt.user_id, ExerciseAttempt.exercise_id),
+        ),
+        (
+            "test_first_passed",
+            TestAttempt.user_id,
+            select(TestAttempt.user_id, func.min(TestAttempt.completed_at))
+            .where(TestAttempt.passed == True, TestAttempt.completed_at.is_not(None))
+            .group_by(TestAttempt.user_id, TestAttempt.test_id),
+        ),
+        (
+            "vocabulary_learned",
+            UserVocabulary.user_id,
+            select(UserVocabulary.user_id, UserVocabulary.last_reviewed_at)
+            .where(UserVocabulary.last_reviewed_at.is_not(None), UserVocabulary.status == "learned"),
+        ),
+    )
+    xp: dict[tuple[int, date], int] = {}
+    for name, user_col, q in gains:
+        if user_id is not None:
+            q = q.where(user_col == user_id)
+        for uid, at in (await db.execute(q)).all():
+            key = (uid, at.date())
+            xp[key] = xp.get(key, 0) + XP_RULES[name]
+
+    cleanup = delete(UserDailyActivity)
+    if user_id is not None:
+        cleanup = cleanup.where(UserDailyActivity.user_id == user_id)
+    await db.execute(cleanup)
+    rows = []
+    for (uid, day), day_events in sorted(events.items()):
+        day_events.sort()
+        row = {"user_id": uid, "day": day, **dict.fromkeys(ACTIVITIES, 0)}
+        for _, name in day_events:
+            row[name] += 1
+        row["minutes"] = round(session_minutes([at for at, _ in day_events]), 2)
+        row["last_activity_at"] = day_events[-1][0]
+        row["xp"] = xp.get((uid, day), 0)
+        rows.append(row)
+    if rows:
+        await db.execute(insert(UserDailyActivity), rows)
+    return len(rows)
+
+
+def _longest_run(active: list[bool]) -> int:
+    best = run = 0
+    for is_active in active:
+        run = run + 1 if is_active else 0
+        best = max(best, run)
+    return best
+
+
+async def current_streak(db: AsyncSession, user_id: int, today: date | None = None) -> int:
+    """
+    Consecutive active days up to today. A streak that reached yesterday is still
+    current until today ends.
+    """
+    today = today or datetime.utcnow().date()
+    result = await db.execute(
+        select(UserDailyActivity.day)
+        .where(
+            UserDailyActivity.user_id == user_id,
+            UserDailyActivity.day <= today,
+            UserDailyActivity.day > today - timedelta(days=STREAK_LOOKBACK_DAYS),
+        )
+        .order_by(UserDailyActivity.day.desc())
+    )
+    expected = today
+    streak = 0
+    for (day,) in result.all():
+        if day == expected:
+            streak += 1
+        elif streak == 0 and day == today - timedelta(days=1):
+            streak = 1
+            expected = day
+        else:
+            break
+        expected -= timedelta(days=1)
+    return streak
+
+
+async def get_activity_timeseries(db: AsyncSession, user_id: int, days: int) -> dict:
+    """
+    Last `days` days, oldest first, zero-filled:
+    {days: [{day, lessons, exercises, tests, reviews, minutes}], current_streak, longest_streak, active_days}.
+    longest_streak is within the returned window.
+    """
+    today = datetime.utcnow().date()
+    start = today - timedelta(days=days - 1)
+    result = await db.execute(
+        select(UserDailyActivity).where(
+            UserDailyActivity.user_id == user_id,
+            UserDailyActivity.day >= start,
+            UserDailyActivity.day <= today,
+        )
+    )
+    by_day = {r.day: r for r in result.scalars().all()}
+    series = []
+    for i in range(days):
+        day = start + timedelta(days=i)
+        r = by_day.get(day)
+        series.append(
+            {
+                "day": day,
+                **{name: getattr(r, name) if r else 0 for name in ACTIVITIES},
+                "minutes": round(r.minutes, 1) if r else 0.0,
+            }
+        )
+    return {
+        "days": series,
+        "current_streak": await current_streak(db, user_id, today),
+        "longest_streak": _longest_run([day in by_day for day in (s["day"] for s in series)]),
+        "active_days": len(by_day),
+    }
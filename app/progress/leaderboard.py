@@ -0,0 +1,216 @@
+"""
+Weekly and all-time XP leaderboards.
+XP is earned once per exercise solved and per test passed, plus per learned word (see
+XP_RULES); the write paths report these through record_xp() (words via bump_progress()).
+The boards live in memory as sorted lists: rank lookup is a binary search, top-K a
+slice, and no request sorts all users.
+At startup load_leaderboards() rebuilds them from solved exercises, passed tests and the
+vocabulary_learned counter (all time) and the XP column of user_daily_activity (current
+week); persist_leaderboards() runs
+periodically and writes changed standings to leaderboard_snapshots, which keeps the
+final standings of past weeks.
+Boards are per process: with several workers each one only sees its own events
+until the next restart.
+"""
+from bisect import bisect_left, insort
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import select, func, distinct
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import async_session_maker, dialect_insert, run_after_commit
+from app.models.exercise import UserExerciseProgress
+from app.models.progress import LeaderboardSnapshot, UserDailyActivity, UserProgressCounters
+from app.models.test import TestAttempt
+from app.models.user import User
+from app.progress.activity import XP_RULES, add_daily_xp, xp_for
+
+ALL_TIME = "all"
+PERIODS = ("weekly", "all_time")
+
+
+class Leaderboard:
+    """Positive scores by user, with (-score, user_id) keys kept sorted for ranking."""
+
+    def __init__(self, scores: dict[int, int] | None = None):
+        self._scores = {uid: s for uid, s in (scores or {}).items() if s > 0}
+        self._keys = sorted((-s, uid) for uid, s in self._scores.items())
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def score(self, user_id: int) -> int:
+        return self._scores.get(user_id, 0)
+
+    def add(self, user_id: int, delta: int) -> int:
+        """Change a user's score (floored at 0); returns the new score."""
+        old = self._scores.get(user_id, 0)
+        new = max(0, old + delta)
+        if new == old:
+            return new
+        if old:
+            del self._keys[bisect_left(self._keys, (-old, user_id))]
+        if new:
+            insort(self._keys, (-new, user_id))
+            self._scores[user_id] = new
+        else:
+            del self._scores[user_id]
+        return new
+
+    def rank(self, user_id: int) -> int | None:
+        """1 + number of users with a higher score; None without a score."""
+        s = self._scores.get(user_id)
+        if not s:
+            return None
+        return bisect_left(self._keys, (-s,)) + 1
+
+    def top(self, limit: int, offset: int = 0) -> list[tuple[int, int, int]]:
+        """[(rank, user_id, score)] by score descending, ties by user id."""
+        return [
+            (bisect_left(self._keys, (neg,)) + 1, uid, -neg)
+            for neg, uid in self._keys[offset:offset + limit]
+        ]
+
+
+_boards: dict[str, Leaderboard] = {}
+_dirty: dict[str, set[int]] = {}
+_loaded = False
+
+
+def week_start(day: date) -> date:
+    """Monday of the (UTC) week containing day."""
+    return day - timedelta(days=day.weekday())
+
+
+def weekly_board_name(day: date | None = None) -> str:
+    return f"week:{week_start(day or datetime.utcnow().date()).isoformat()}"
+
+
+def _board(name: str) -> Leaderboard:
+    board = _boards.get(name)
+    if board is None:
+        board = _boards[name] = Leaderboard()
+    return board
+
+
+def _apply(user_id: int, xp: int) -> None:
+    if not _loaded:
+        return
+    names = [ALL_TIME] + ([weekly_board_name()] if xp > 0 else [])
+    for name in names:
+        _board(name).add(user_id, xp)
+        _dirty.setdefault(name, set()).add(user_id)
+
+
+async def record_xp(db: AsyncSession, user_id: int, deltas: dict[str, int]) -> None:
+    """
+    XP_RULES event counts -> XP change. Gains are added to today's activity row; the boards
+    are updated once the transaction commits. Losses (a word no longer learned) only
+    lower the all-time score.
+    """
+    xp = xp_for(deltas)
+    if not xp:
+        return
+    if xp > 0:
+        await add_daily_xp(db, user_id, xp)
+    run_after_commit(db, lambda: _apply(user_id, xp))
+
+
+async def load_leaderboards(db: AsyncSession) -> None:
+    """Cold rebuild of the all-time and current weekly boards."""
+    global _loaded
+    sources = (
+        (
+            "exercise_solved",
+            select(UserExerciseProgress.user_id, func.count())
+            .where(UserExerciseProgress.first_correct_at.is_not(None))
+            .group_by(UserExerciseProgress.user_id),
+        ),
+        (
+            "test_first_passed",
+            select(TestAttempt.user_id, func.count(distinct(TestAttempt.test_id)))
+            .where(TestAttempt.passed == True)
+            .group_by(TestAttempt.user_id),
+        ),
+        (
+            "vocabulary_learned",
+            select(UserProgressCounters.user_id, UserProgressCounters.vocabulary_learned),
+        ),
+    )
+    all_time: dict[int, int] = {}
+    for name, q in sources:
+        for uid, n in (await db.execute(q)).all():
+            all_time[uid] = all_time.get(uid, 0) + XP_RULES[name] * (n or 0)
+    weekly_name = weekly_board_name()
+    weekly = await db.execute(
+        select(UserDailyActivity.user_id, func.sum(UserDailyActivity.xp))
+        .where(UserDailyActivity.day >= date.fromisoformat(weekly_name.split(":", 1)[1]))
+        .group_by(UserDailyActivity.user_id)
+    )
+    _boards.clear()
+    _boards[ALL_TIME] = Leaderboard(all_time)
+    _boards[weekly_name] = Leaderboard({uid: int(xp or 0) for uid, xp in weekly.all()})
+    _dirty.clear()
+    _loaded = True
+
+
+async def persist_leaderboards() -> None:
+    """Periodic task: write changed standings; boards of past weeks are then dropped."""
+    if not _loaded:
+        return
+    dirty = {name: users for name, users in _dirty.items() if users}
+    _dirty.clear()
+    now = datetime.utcnow()
+    rows = [
+        {"board": name, "user_id": uid, "xp": _boards[name].score(uid), "updated_at": now}
+        for name, users in sorted(dirty.items())
+        for uid in sorted(users)
+    ]
+    if rows:
+        try:
+            async with async_session_maker() as db:
+                stmt = dialect_insert(db, LeaderboardSnapshot)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=["board", "user_id"],
+                    set_={"xp": stmt.excluded.xp, "updated_at": stmt.excluded.updated_at},
+                )
+                await db.execute(stmt, rows)
+                await db.commit()
+        except Exception:
+            for name, users in dirty.items():
+                _dirty.setdefault(name, set()).update(users)
+            raise
+    current = weekly_board_name()
+    for name in [n for n in _boards if n not in (ALL_TIME, current) and not _dirty.get(n)]:
+        del _boards[name]
+
+
+async def get_leaderboard(
+    db: AsyncSession, user_id: int, period: str, limit: int, offset: int = 0
+) -> dict:
+    """
+    One page of a board plus the caller's standing:
+    {period, week_start, total, entries: [{rank, user_id, full_name, xp}], my_rank, my_xp}.
+    """
+    if not _loaded:
+        await load_leaderboards(db)
+    name = ALL_TIME if period == "all_time" else weekly_board_name()
+    board = _board(name)
+    page = board.top(limit, offset)
+    names = {}
+    if page:
+        result = await db.execute(
+            select(User.id, User.full_name).where(User.id.in_([uid for _, uid, _ in page]))
+        )
+        names = dict(result.all())
+    return {
+        "period": period,
+        "week_start": date.fromisoformat(name.split(":", 1)[1]) if name != ALL_TIME else None,
+        "total": len(board),
+        "entries": [
+            {"rank": rank, "user_id": uid, "full_name": names.get(uid), "xp": xp}
+            for rank, uid, xp in page
+        ],
+        "my_rank": board.rank(user_id),
+        "my_xp": board.score(user_id),
+    }
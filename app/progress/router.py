@@ -1,18 +1,16 @@
 """Progress and statistics API routes."""
 from typing import Annotated
 
-from fastapi import APIRouter, Depends
-from sqlalchemy import select, func
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
 from app.core.deps import get_current_user
 from app.models.user import User
-from app.models.lesson import Lesson, LessonCompletion
-from app.models.exercise import Exercise, ExerciseAttempt
-from app.models.test import Test, TestAttempt
-from app.models.vocabulary import UserVocabulary
-from app.progress.schemas import ProgressSummary
+from app.progress.schemas import ProgressSummary, ActivityTimeseries, LeaderboardPage
+from app.progress.service import get_progress_counters, get_total_lessons
+from app.progress.activity import get_activity_timeseries
+from app.progress.leaderboard import PERIODS, get_leaderboard
 
 router = APIRouter(prefix="/progress", tags=["progress"])
 
@@ -22,71 +20,42 @@ async def get_progress_summary(
     current_user: Annotated[User, Depends(get_current_user)],
     db: Annotated[AsyncSession, Depends(get_db)],
 ):
-    """Get progress summary for current user."""
-    total_lessons = (await db.execute(select(func.count(Lesson.id)))).scalar() or 0
-    completed = (
-        await db.execute(
-            select(func.count(LessonCompletion.id)).where(
-                LessonCompletion.user_id == current_user.id
-            )
-        )
-    ).scalar() or 0
+    """Get progress summary for current user (one read of the user's counter row)."""
+    counters = await get_progress_counters(db, current_user.id)
+    return ProgressSummary(
+        completed_lessons=counters["lessons_completed"],
+        total_lessons=await get_total_lessons(db),
+        exercise_attempts=counters["exercise_attempts"],
+        exercise_correct=counters["exercise_correct"],
+        test_attempts=counters["test_attempts"],
+        test_passed=counters["test_passed"],
+        vocabulary_size=counters["vocabulary_size"],
+        vocabulary_learned=counters["vocabulary_learned"],
+    )
 
-    ex_total = (
-        await db.execute(
-            select(func.count(ExerciseAttempt.id)).where(
-                ExerciseAttempt.user_id == current_user.id
-            )
-        )
-    ).scalar() or 0
-    ex_correct = (
-        await db.execute(
-            select(func.count(ExerciseAttempt.id)).where(
-                ExerciseAttempt.user_id == current_user.id,
-                ExerciseAttempt.is_correct == True,
-            )
-        )
-    ).scalar() or 0
 
-    test_total = (
-        await db.execute(
-            select(func.count(TestAttempt.id)).where(
-                TestAttempt.user_id == current_user.id
-            )
-        )
-    ).scalar() or 0
-    test_passed = (
-        await db.execute(
-            select(func.count(TestAttempt.id)).where(
-                TestAttempt.user_id == current_user.id,
-                TestAttempt.passed == True,
-            )
-        )
-    ).scalar() or 0
+@router.get("/timeseries", response_model=ActivityTimeseries)
+async def get_progress_timeseries(
+    days: int = Query(30, ge=1, le=365),
+    current_user: Annotated[User, Depends(get_current_user)] = None,
+    db: Annotated[AsyncSession, Depends(get_db)] = None,
+):
+    """Daily activity for the last `days` days with the current and longest streak."""
+    return await get_activity_timeseries(db, current_user.id, days)
 
-    vocab_total = (
-        await db.execute(
-            select(func.count(UserVocabulary.id)).where(
-                UserVocabulary.user_id == current_user.id
-            )
-        )
-    ).scalar() or 0
-    vocab_learned = (
-        await db.execute(
-            select(func.count(UserVocabulary.id)).where(
-                UserVocabulary.user_id == current_user.id,
-                UserVocabulary.status == "learned",
-            )
-        )
-    ).scalar() or 0
 
-    return ProgressSummary(
-        completed_lessons=completed,
-        total_lessons=total_lessons,
-        exercise_attempts=ex_total,
-        exercise_correct=ex_correct,
-        test_attempts=test_total,
-        test_passed=test_passed,
-        vocabulary_size=vocab_total,
-        vocabulary_learned=vocab_learned,
-    )
+@router.get("/leaderboard", response_model=LeaderboardPage)
+async def get_progress_leaderboard(
+    period: str = Query("weekly"),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    current_user: Annotated[User, Depends(get_current_user)] = None,
+    db: Annotated[AsyncSession, Depends(get_db)] = None,
+):
+    """XP leaderboard (weekly or all_time) with the current user's rank."""
+    if period not in PERIODS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"period must be one of: {', '.join(PERIODS)}",
+        )
+    return await get_leaderboard(db, current_user.id, period, limit, offset)
@@ -1,4 +1,6 @@
 """Progress schemas."""
+from datetime import date
+
 from pydantic import BaseModel
 
 
@@ -11,3 +13,35 @@ class ProgressSummary(BaseModel):
     test_passed: int
     vocabulary_size: int
     vocabulary_learned: int
+
+
+class ActivityDay(BaseModel):
+    day: date
+    lessons: int
+    exercises: int
+    tests: int
+    reviews: int
+    minutes: float
+
+
+class ActivityTimeseries(BaseModel):
+    days: list[ActivityDay]
+    current_streak: int
+    longest_streak: int
+    active_days: int
+
+
+class LeaderboardEntry(BaseModel):
+    rank: int
+    user_id: int
+    full_name: str | None = None
+    xp: int
+
+
+class LeaderboardPage(BaseModel):
+    period: str
+    week_start: date | None = None
+    total: int
+    entries: list[LeaderboardEntry]
+    my_rank: int | None = None
+    my_xp: int
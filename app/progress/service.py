@@ -0,0 +1,140 @@
+"""
+Per-user progress counters (table user_progress_counters).
+Writers of the counted tables call bump_progress() in their own transaction, so the
+dashboard summary is a primary-key read. reconcile_progress() recomputes the rows
+from the source tables (scripts/reconcile_progress.py) to repair drift, e.g. after
+lessons or exercises were deleted together with their completions and attempts.
+Counter changes worth XP are also passed on to the leaderboards (app/progress/leaderboard.py).
+"""
+from datetime import datetime
+
+from sqlalchemy import select, update, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import VersionedCache
+from app.core.database import dialect_insert, run_after_commit
+from app.models.exercise import ExerciseAttempt
+from app.models.lesson import Lesson, LessonCompletion
+from app.models.progress import UserProgressCounters
+from app.models.test import TestAttempt
+from app.models.user import User
+from app.models.vocabulary import UserVocabulary
+from app.progress.leaderboard import record_xp
+
+COUNTERS = (
+    "lessons_completed",
+    "exercise_attempts",
+    "exercise_correct",
+    "test_attempts",
+    "test_passed",
+    "vocabulary_size",
+    "vocabulary_learned",
+)
+
+# (table column, extra filter) per counter; user_id filter is added by the queries
+_SOURCES = {
+    "lessons_completed": (LessonCompletion.user_id, None),
+    "exercise_attempts": (ExerciseAttempt.user_id, None),
+    "exercise_correct": (ExerciseAttempt.user_id, ExerciseAttempt.is_correct == True),
+    "test_attempts": (TestAttempt.user_id, None),
+    "test_passed": (TestAttempt.user_id, TestAttempt.passed == True),
+    "vocabulary_size": (UserVocabulary.user_id, None),
+    "vocabulary_learned": (UserVocabulary.user_id, UserVocabulary.status == "learned"),
+}
+
+_totals = VersionedCache(maxsize=4)
+
+
+async def count_progress(db: AsyncSession, user_id: int) -> dict[str, int]:
+    """Counters of one user computed from the source tables (one statement)."""
+    columns = []
+    for name in COUNTERS:
+        user_col, extra = _SOURCES[name]
+        q = select(func.count()).select_from(user_col.table).where(user_col == user_id)
+        if extra is not None:
+            q = q.where(extra)
+        columns.append(q.scalar_subquery().label(name))
+    row = (await db.execute(select(*columns))).one()
+    return {name: row[i] or 0 for i, name in enumerate(COUNTERS)}
+
+
+async def bump_progress(db: AsyncSession, user_id: int, **deltas: int) -> None:
+    """
+    Add deltas (counter name -> change) to the user's row. Call after flushing the
+    source write. A missing row is created from the source tables, which already
+    include the caller's write.
+    """
+    deltas = {k: v for k, v in deltas.items() if v}
+    if not deltas:
+        return
+    await record_xp(db, user_id, deltas)
+    stmt = (
+        update(UserProgressCounters)
+        .where(UserProgressCounters.user_id == user_id)
+        .values(
+            {
+                **{getattr(UserProgressCounters, k): getattr(UserProgressCounters, k) + v for k, v in deltas.items()},
+                UserProgressCounters.updated_at: datetime.utcnow(),
+            }
+        )
+        .execution_options(synchronize_session=False)
+    )
+    if (await db.execute(stmt)).rowcount:
+        return
+    counts = await count_progress(db, user_id)
+    created = await db.execute(
+        dialect_insert(db, UserProgressCounters)
+        .values(user_id=user_id, updated_at=datetime.utcnow(), **counts)
+        .on_conflict_do_nothing(index_elements=["user_id"])
+    )
+    if not created.rowcount:
+        # A concurrent transaction created the row from a snapshot without our write
+        await db.execute(stmt)
+
+
+async def reconcile_progress(db: AsyncSession, user_id: int | None = None) -> int:
+    """Rewrite counter rows from the source tables (all users or one). Returns rows written."""
+    user_ids = select(User.id)
+    if user_id is not None:
+        user_ids = user_ids.where(User.id == user_id)
+    rows = {uid: {"user_id": uid, **dict.fromkeys(COUNTERS, 0)} for uid in (await db.execute(user_ids)).scalars()}
+    if not rows:
+        return 0
+    for name in COUNTERS:
+        user_col, extra = _SOURCES[name]
+        q = select(user_col, func.count()).where(user_col.in_(rows)).group_by(user_col)
+        if extra is not None:
+            q = q.where(extra)
+        for uid, n in (await db.execute(q)).all():
+            rows[uid][name] = n
+    now = datetime.utcnow()
+    values = [{**r, "updated_at": now} for _, r in sorted(rows.items())]
+    stmt = dialect_insert(db, UserProgressCounters)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["user_id"],
+        set_={name: getattr(stmt.excluded, name) for name in (*COUNTERS, "updated_at")},
+    )
+    await db.execute(stmt, values)
+    return len(values)
+
+
+async def get_progress_counters(db: AsyncSession, user_id: int) -> dict[str, int]:
+    """The user's counters by primary key; created from the source tables on first use."""
+    row = await db.get(UserProgressCounters, user_id)
+    if row is None:
+        await reconcile_progress(db, user_id)
+        row = await db.get(UserProgressCounters, user_id)
+    return {name: getattr(row, name) for name in COUNTERS}
+
+
+async def _count_lessons(db: AsyncSession) -> int:
+    return (await db.execute(select(func.count(Lesson.id)))).scalar() or 0
+
+
+async def get_total_lessons(db: AsyncSession) -> int:
+    """Number of lessons, cached until a lesson is created or deleted."""
+    return await _totals.get_or_load("lessons", lambda: _count_lessons(db))
+
+
+def invalidate_total_lessons(db: AsyncSession) -> None:
+    run_after_commit(db, lambda: _totals.invalidate("lessons"))
@@ -0,0 +1,72 @@
+"""
+Event-driven recommendation refresh.
+Write paths emit small domain events (a failed test, an exercise answered wrong
+WRONG_ANSWERS_TRIGGER times); once their transaction commits the event is offered to
+a bounded queue, and the worker refreshes recommendations for all users in a batch
+at once (several events of one user cost one evaluation). A full queue drops the
+event instead of slowing the request: the periodic batch job picks the user up from
+the progress counters watermark anyway.
+"""
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.core.database import async_session_maker, run_after_commit
+from app.core.tasks import BatchWorker
+from app.models.exercise import Exercise, UserExerciseProgress
+from app.recommendations.service import recommend_and_commit
+
+TEST_FAILED = "test_failed"
+EXERCISE_WRONG = "exercise_wrong"
+WRONG_ANSWERS_TRIGGER = 3
+
+_coalesced = 0
+
+
+async def _refresh(events: list[tuple[int, str]]) -> None:
+    global _coalesced
+    user_ids = sorted({user_id for user_id, _ in events})
+    _coalesced += len(events) - len(user_ids)
+    async with async_session_maker() as db:
+        await recommend_and_commit(db, user_ids)
+
+
+recommendation_worker = BatchWorker(
+    "recommendation-events",
+    _refresh,
+    maxsize=get_settings().RECOMMENDATION_QUEUE_SIZE,
+    max_batch=200,
+    max_wait=1.0,
+)
+
+
+def emit_event(db: AsyncSession, user_id: int, kind: str) -> None:
+    """Queue a recommendation refresh for the user once the session commits."""
+    run_after_commit(db, lambda: recommendation_worker.offer((user_id, kind)))
+
+
+async def on_exercise_results(db: AsyncSession, user_id: int, results: list[tuple[Exercise, bool]]) -> None:
+    """
+    Emit EXERCISE_WRONG when an unsolved exercise's wrong answers reach a multiple of
+    WRONG_ANSWERS_TRIGGER. Call after record_exercise_progress().
+    """
+    wrong_now: dict[int, int] = {}
+    for exercise, is_correct in results:
+        if not is_correct:
+            wrong_now[exercise.id] = wrong_now.get(exercise.id, 0) + 1
+    if not wrong_now:
+        return
+    p = UserExerciseProgress
+    rows = await db.execute(
+        select(p.exercise_id, p.attempts - p.correct_count).where(
+            p.user_id == user_id, p.exercise_id.in_(wrong_now), p.correct_count == 0
+        )
+    )
+    for exercise_id, wrong in rows.all():
+        if wrong // WRONG_ANSWERS_TRIGGER > (wrong - wrong_now[exercise_id]) // WRONG_ANSWERS_TRIGGER:
+            emit_event(db, user_id, EXERCISE_WRONG)
+            return
+
+
+def queue_stats() -> dict:
+    return {**recommendation_worker.stats(), "coalesced": _coalesced}
@@ -1,31 +1,67 @@
 """Recommendations API routes."""
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
-from app.core.deps import get_current_user
+from app.core.deps import get_current_user, RequireAdmin
 from app.models.user import User
 from app.models.recommendation import Recommendation
-from app.recommendations.schemas import RecommendationRead
+from app.recommendations.schemas import (
+    RecommendationPage,
+    UnreadCount,
+    RecommendationMarkRead,
+    RecommendationQueueStats,
+)
+from app.recommendations.events import queue_stats
+from app.recommendations.service import get_recommendation_page, count_unread, mark_recommendations_read
 
 router = APIRouter(prefix="/recommendations", tags=["recommendations"])
 
 
-@router.get("/", response_model=list[RecommendationRead])
+@router.get("/", response_model=RecommendationPage)
 async def list_recommendations(
     current_user: Annotated[User, Depends(get_current_user)],
     db: Annotated[AsyncSession, Depends(get_db)],
+    cursor: str | None = None,
+    limit: int = Query(20, ge=1, le=100),
+    unread: bool = False,
 ):
-    """List recommendations for current user."""
-    result = await db.execute(
-        select(Recommendation)
-        .where(Recommendation.user_id == current_user.id)
-        .order_by(Recommendation.created_at.desc())
-    )
-    return list(result.scalars().all())
+    """Recommendations for current user, newest first; pass next_cursor to get the next page."""
+    try:
+        return await get_recommendation_page(db, current_user.id, limit, cursor, unread)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/unread-count", response_model=UnreadCount)
+async def unread_count(
+    current_user: Annotated[User, Depends(get_current_user)],
+    db: Annotated[AsyncSession, Depends(get_db)],
+):
+    """Number of unread recommendations (for the dashboard badge)."""
+    return UnreadCount(unread=await count_unread(db, current_user.id))
+
+
+@router.post("/read")
+async def mark_many_read(
+    data: RecommendationMarkRead,
+    current_user: Annotated[User, Depends(get_current_user)],
+    db: Annotated[AsyncSession, Depends(get_db)],
+):
+    """Mark the listed recommendations as read, or all of them when ids is omitted."""
+    updated = await mark_recommendations_read(db, current_user.id, data.ids)
+    return {"status": "ok", "updated": updated}
+
+
+@router.get("/queue", response_model=RecommendationQueueStats)
+async def recommendation_queue_stats(
+    current_user: Annotated[User, RequireAdmin],
+):
+    """Depth, throughput and lag of the recommendation event queue (admin)."""
+    return queue_stats()
 
 
 @router.patch("/{rec_id}/read")
@@ -15,3 +15,32 @@ class RecommendationRead(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class RecommendationPage(BaseModel):
+    items: list[RecommendationRead]
+    next_cursor: str | None = None
+
+
+class UnreadCount(BaseModel):
+    unread: int
+
+
+class RecommendationMarkRead(BaseModel):
+    ids: list[int] | None = None  # None = all unread
+
+
+class RecommendationQueueStats(BaseModel):
+    name: str
+    running: bool
+    depth: int
+    maxsize: int
+    enqueued: int
+    dropped: int
+    coalesced: int
+    processed: int
+    batches: int
+    failed_batches: int
+    last_lag_seconds: float
+    max_lag_seconds: float
+    last_batch_seconds: float
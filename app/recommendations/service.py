@@ -1,8 +1,292 @@
-"""Rule-based recommendation engine."""
-from sqlalchemy import select
+"""
+Rule-based recommendation engine.
+Each rule is one set-based query over a chunk of users; generate_recommendations()
+runs them for the students whose progress counters changed since the last run
+(watermark "recommendations.progress_counters"), drops candidates that repeat an
+unread or recent recommendation and bulk-inserts the rest. Rules:
+
+- extra_practice: exercise accuracy in a lesson below LOW_ACCURACY_PCT
+- retake_test: a final test attempted but never passed
+- review_words: at least STUCK_MIN_WORDS words stuck at low mastery for STUCK_DAYS
+- targeted_lesson: the first unlocked lesson the student has not started
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, insert, update, func, case, exists, or_, true, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 
+from app.cohort.aggregation import get_watermark
+from app.core.database import async_session_maker
+from app.lessons.levels import below_placement
+from app.models.exercise import UserExerciseProgress
+from app.models.lesson import Lesson, LessonCompletion, LessonPrerequisite
+from app.models.progress import UserProgressCounters
 from app.models.recommendation import Recommendation
+from app.models.test import Test, TestAttempt
+from app.models.user import User, UserRole
+from app.models.vocabulary import UserVocabulary
+
+logger = logging.getLogger(__name__)
+
+CHUNK_USERS = 500
+SETTLE_SECONDS = 5
+# A read recommendation may be repeated after this long if the rule still holds
+REPEAT_AFTER_DAYS = 7
+LOW_ACCURACY_PCT = 60
+MIN_EXERCISE_ATTEMPTS = 5
+STUCK_MASTERY = 1
+STUCK_DAYS = 7
+STUCK_MIN_WORDS = 5
+
+
+def _candidate(user_id: int, rec_type: str, title: str, description: str, lesson_id: int | None = None) -> dict:
+    return {
+        "user_id": user_id,
+        "recommendation_type": rec_type,
+        "title": title[:255],
+        "description": description,
+        "target_lesson_id": lesson_id,
+        "target_exercise_id": None,
+    }
+
+
+async def _low_accuracy(db: AsyncSession, user_ids: list[int]) -> list[dict]:
+    p = UserExerciseProgress
+    attempts, correct = func.sum(p.attempts), func.sum(p.correct_count)
+    result = await db.execute(
+        select(p.user_id, p.lesson_id, Lesson.title, attempts, correct)
+        .join(Lesson, Lesson.id == p.lesson_id)
+        .where(p.user_id.in_(user_ids))
+        .group_by(p.user_id, p.lesson_id, Lesson.title)
+        .having(attempts >= MIN_EXERCISE_ATTEMPTS, correct * 100 < attempts * LOW_ACCURACY_PCT)
+    )
+    return [
+        _candidate(
+            uid, "extra_practice", f"Потренируйтесь ещё: {title}",
+            f"Правильных ответов в упражнениях урока: {round(100 * c / a)}%.", lesson_id,
+        )
+        for uid, lesson_id, title, a, c in result.all()
+    ]
+
+
+async def _failed_final_tests(db: AsyncSession, user_ids: list[int]) -> list[dict]:
+    best = func.max(TestAttempt.score)
+    result = await db.execute(
+        select(TestAttempt.user_id, Test.lesson_id, Lesson.title, best, Test.passing_score)
+        .join(Test, Test.id == TestAttempt.test_id)
+        .join(Lesson, Lesson.id == Test.lesson_id)
+        .where(
+            TestAttempt.user_id.in_(user_ids),
+            TestAttempt.completed_at.is_not(None),
+            Test.is_final == True,
+        )
+        .group_by(TestAttempt.user_id, Test.id, Test.lesson_id, Lesson.title, Test.passing_score)
+        .having(func.max(case((TestAttempt.passed == True, 1), else_=0)) == 0)
+    )
+    return [
+        _candidate(
+            uid, "retake_test", f"Повторите урок и пересдайте тест: {title}",
+            f"Лучший результат: {round(score or 0)}%, нужно {round(passing)}%.", lesson_id,
+        )
+        for uid, lesson_id, title, score, passing in result.all()
+    ]
+
+
+async def _stuck_words(db: AsyncSession, user_ids: list[int]) -> list[dict]:
+    uv = UserVocabulary
+    result = await db.execute(
+        select(uv.user_id, func.count())
+        .where(
+            uv.user_id.in_(user_ids),
+            uv.status != "learned",
+            uv.mastery <= STUCK_MASTERY,
+            uv.created_at <= datetime.utcnow() - timedelta(days=STUCK_DAYS),
+        )
+        .group_by(uv.user_id)
+        .having(func.count() >= STUCK_MIN_WORDS)
+    )
+    return [
+        _candidate(
+            uid, "review_words", "Повторите слова из словаря",
+            f"Слов без прогресса больше недели: {n}. Сыграйте в словарную игру.",
+        )
+        for uid, n in result.all()
+    ]
+
+
+async def _next_lessons(db: AsyncSession, user_ids: list[int]) -> list[dict]:
+    # Same rule as get_completed_lesson_ids(): lessons below the placement level count as done
+    done = or_(
+        exists().where(LessonCompletion.user_id == User.id, LessonCompletion.lesson_id == Lesson.id),
+        below_placement(Lesson.level, User.placement_level),
+    )
+    started = exists().where(UserExerciseProgress.user_id == User.id, UserExerciseProgress.lesson_id == Lesson.id)
+    prerequisite = aliased(Lesson)
+    locked = exists().where(
+        LessonPrerequisite.lesson_id == Lesson.id,
+        prerequisite.id == LessonPrerequisite.prerequisite_lesson_id,
+        ~exists().where(
+            LessonCompletion.user_id == User.id,
+            LessonCompletion.lesson_id == LessonPrerequisite.prerequisite_lesson_id,
+        ),
+        ~below_placement(prerequisite.level, User.placement_level),
+    )
+    ranked = (
+        select(
+            User.id.label("user_id"),
+            Lesson.id.label("lesson_id"),
+            Lesson.title,
+            func.row_number().over(partition_by=User.id, order_by=(Lesson.order_index, Lesson.id)).label("n"),
+        )
+        .join(Lesson, true())
+        .where(User.id.in_(user_ids), ~done, ~started, ~locked)
+        .subquery()
+    )
+    result = await db.execute(
+        select(ranked.c.user_id, ranked.c.lesson_id, ranked.c.title).where(ranked.c.n == 1)
+    )
+    return [
+        _candidate(uid, "targeted_lesson", f"Следующий урок: {title}", "Урок открыт, но вы ещё не начинали его.", lesson_id)
+        for uid, lesson_id, title in result.all()
+    ]
+
+
+RULES = (_low_accuracy, _failed_final_tests, _stuck_words, _next_lessons)
+
+
+# Serializes dedupe-and-insert between the event worker and the periodic job
+_write_lock = asyncio.Lock()
+
+
+async def recommend_for_users(db: AsyncSession, user_ids: list[int]) -> int:
+    """Run all rules for these users and insert new recommendations. Returns rows inserted."""
+    if not user_ids:
+        return 0
+    candidates = []
+    for rule in RULES:
+        candidates += await rule(db, user_ids)
+    if not candidates:
+        return 0
+    now = datetime.utcnow()
+    R = Recommendation
+    existing = await db.execute(
+        select(R.user_id, R.recommendation_type, R.target_lesson_id).where(
+            R.user_id.in_({c["user_id"] for c in candidates}),
+            or_(R.is_read.is_not(True), R.created_at > now - timedelta(days=REPEAT_AFTER_DAYS)),
+        )
+    )
+    seen = set(existing.all())
+    rows = []
+    for c in candidates:
+        key = (c["user_id"], c["recommendation_type"], c["target_lesson_id"])
+        if key not in seen:
+            seen.add(key)
+            rows.append({**c, "is_read": False, "created_at": now})
+    if rows:
+        await db.execute(insert(Recommendation), rows)
+    return len(rows)
+
+
+async def recommend_and_commit(db: AsyncSession, user_ids: list[int]) -> int:
+    """
+    recommend_for_users() and commit under a process-wide lock, so concurrent callers
+    see each other's rows when deduplicating. Returns rows inserted.
+    """
+    async with _write_lock:
+        created = await recommend_for_users(db, user_ids)
+        await db.commit()
+    return created
+
+
+async def generate_recommendations(db: AsyncSession, all_students: bool = False) -> dict:
+    """
+    Batch run over students changed since the last run (or all students), committing
+    per chunk of CHUNK_USERS; the watermark moves once every chunk is done, and a
+    repeated chunk only re-finds duplicates. Returns {users, created}.
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=SETTLE_SECONDS)
+    wm = await get_watermark(db, "recommendations.progress_counters")
+    if all_students:
+        q = select(User.id).where(User.role == UserRole.STUDENT)
+    else:
+        q = (
+            select(UserProgressCounters.user_id)
+            .join(User, User.id == UserProgressCounters.user_id)
+            .where(UserProgressCounters.updated_at <= cutoff, User.role == UserRole.STUDENT)
+        )
+        if wm.last_at is not None:
+            q = q.where(UserProgressCounters.updated_at > wm.last_at)
+    user_ids = sorted((await db.execute(q)).scalars().all())
+    created = 0
+    for i in range(0, len(user_ids), CHUNK_USERS):
+        created += await recommend_and_commit(db, user_ids[i:i + CHUNK_USERS])
+    wm.last_at = cutoff
+    await db.commit()
+    return {"users": len(user_ids), "created": created}
+
+
+async def run_recommendations() -> None:
+    """Periodic task entry point."""
+    async with async_session_maker() as db:
+        stats = await generate_recommendations(db)
+    if stats["created"]:
+        logger.debug("recommendations: %s", stats)
+
+
+def _parse_cursor(cursor: str | None) -> tuple[datetime, int] | None:
+    if not cursor:
+        return None
+    try:
+        created_at, rec_id = cursor.rsplit(":", 1)
+        return datetime.fromisoformat(created_at), int(rec_id)
+    except ValueError:
+        raise ValueError("Invalid cursor")
+
+
+async def get_recommendation_page(
+    db: AsyncSession, user_id: int, limit: int, cursor: str | None = None, unread_only: bool = False
+) -> dict:
+    """User's recommendations, newest first, keyset-paginated on (created_at, id): {items, next_cursor}."""
+    R = Recommendation
+    q = select(R).where(R.user_id == user_id).order_by(R.created_at.desc(), R.id.desc())
+    if unread_only:
+        q = q.where(R.is_read == False)
+    after = _parse_cursor(cursor)
+    if after:
+        q = q.where(tuple_(R.created_at, R.id) < tuple_(after[0], after[1]))
+    rows = list((await db.execute(q.limit(limit + 1))).scalars().all())
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_cursor = f"{last.created_at.isoformat()}:{last.id}"
+    return {"items": rows[:limit], "next_cursor": next_cursor}
+
+
+async def count_unread(db: AsyncSession, user_id: int) -> int:
+    result = await db.execute(
+        select(func.count())
+        .select_from(Recommendation)
+        .where(Recommendation.user_id == user_id, Recommendation.is_read == False)
+    )
+    return result.scalar() or 0
+
+
+async def mark_recommendations_read(db: AsyncSession, user_id: int, ids: list[int] | None = None) -> int:
+    """Mark the given (or all) unread recommendations of the user as read in one UPDATE. Returns rows changed."""
+    stmt = (
+        update(Recommendation)
+        .where(Recommendation.user_id == user_id, Recommendation.is_read == False)
+        .values(is_read=True)
+        .execution_options(synchronize_session=False)
+    )
+    if ids is not None:
+        if not ids:
+            return 0
+        stmt = stmt.where(Recommendation.id.in_(set(ids)))
+    return (await db.execute(stmt)).rowcount
 
 
 async def create_recommendation(
@@ -0,0 +1,250 @@
+"""
+Adaptive test mode (computerized adaptive testing, Rasch / 1PL model).
+Item difficulty b = logit of the smoothed error rate from test_question_stats. It is
+cached per test as lists sorted by difficulty (pure Python, no NumPy dependency).
+Ability theta is a MAP estimate (N(0, 1) prior) recomputed from the attempt's stored
+answers after every response. The next item maximizes Fisher information
+P(1 - P), i.e. is the unanswered item whose difficulty is closest to theta.
+Adaptive attempts are not added to item statistics: targeted items would bias difficulty.
+"""
+import math
+import time
+from bisect import bisect_left
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import VersionedCache
+from app.core.database import dialect_insert
+from app.models.test import TestAttempt, TestAttemptAnswer, TestQuestionStats
+from app.progress.service import bump_progress
+from app.progress.activity import record_activity
+from app.tests.grading import public_content
+from app.recommendations.events import emit_event, TEST_FAILED
+from app.tests.service import (
+    get_test_definition,
+    definition_version,
+    start_attempt,
+    award_test_xp,
+    complete_final_test_lesson,
+)
+
+MIN_ITEMS = 5
+MAX_ITEMS = 15
+TARGET_SE = 0.5
+BANK_TTL_SECONDS = 600  # difficulties drift slowly as statistics accumulate
+
+_banks = VersionedCache(maxsize=256)
+
+
+def item_difficulty(attempts: int, correct: int) -> float:
+    """Rasch difficulty from answer history; unseen items start at 0 (average)."""
+    p = (correct + 1) / (attempts + 2)
+    return math.log((1 - p) / p)
+
+
+def probability(theta: float, b: float) -> float:
+    return 1.0 / (1.0 + math.exp(b - theta))
+
+
+def estimate_ability(responses: list[tuple[float, bool]]) -> tuple[float, float]:
+    """MAP ability for [(difficulty, is_correct)] by Newton-Raphson. Returns (theta, standard error)."""
+    theta = 0.0
+    info = 1.0
+    for _ in range(20):
+        grad = -theta
+        info = 1.0
+        for b, correct in responses:
+            p = probability(theta, b)
+            grad += (1.0 if correct else 0.0) - p
+            info += p * (1 - p)
+        step = grad / info
+        theta += step
+        if abs(step) < 1e-4:
+            break
+    return theta, 1.0 / math.sqrt(info)
+
+
+async def get_item_bank(db: AsyncSession, test_id: int) -> dict | None:
+    """{"ids": [question_id], "b": [difficulty]} sorted by difficulty, cached per test version."""
+    key = (test_id, definition_version(test_id))
+    bank = _banks.get(key)
+    if bank and time.monotonic() - bank["loaded_at"] < BANK_TTL_SECONDS:
+        return bank
+    version = _banks.version(key)
+    test = await get_test_definition(db, test_id)
+    if not test or not test["questions"]:
+        return None
+    stats = {
+        row[0]: (row[1], row[2])
+        for row in (
+            await db.execute(
+                select(TestQuestionStats.question_id, TestQuestionStats.attempts, TestQuestionStats.correct)
+                .where(TestQuestionStats.test_id == test_id)
+            )
+        ).all()
+    }
+    items = sorted(
+        (item_difficulty(*stats.get(qid, (0, 0))), qid) for qid in test["questions"]
+    )
+    bank = {
+        "ids": [qid for _, qid in items],
+        "b": [b for b, _ in items],
+        "by_id": {qid: b for b, qid in items},
+        "loaded_at": time.monotonic(),
+    }
+    _banks.set(key, bank, version)
+    return bank
+
+
+def select_next_item(bank: dict, theta: float, answered: set[int]) -> int | None:
+    """Unanswered item with difficulty closest to theta (max information under Rasch)."""
+    b, ids = bank["b"], bank["ids"]
+    hi = bisect_left(b, theta)
+    lo = hi - 1
+    while lo >= 0 or hi < len(b):
+        while lo >= 0 and ids[lo] in answered:
+            lo -= 1
+        while hi < len(b) and ids[hi] in answered:
+            hi += 1
+        if lo < 0 and hi >= len(b):
+            return None
+        if hi >= len(b) or (lo >= 0 and theta - b[lo] <= b[hi] - theta):
+            return ids[lo]
+        return ids[hi]
+    return None
+
+
+def expected_score(bank: dict, theta: float) -> float:
+    """Expected percent correct on the whole bank at ability theta."""
+    return sum(probability(theta, b) for b in bank["b"]) / len(bank["b"]) * 100
+
+
+def _question_payload(test: dict, test_id: int, question_id: int) -> dict:
+    q = test["questions"][question_id]
+    return {
+        "id": question_id,
+        "test_id": test_id,
+        "question_text": q["question_text"],
+        "content": public_content(q["content"]),
+        "order_index": q["order_index"],
+    }
+
+
+async def start_adaptive_attempt(db: AsyncSession, user_id: int, test_id: int) -> dict:
+    """Create an attempt and return the first (average difficulty) question."""
+    bank = await get_item_bank(db, test_id)
+    if not bank:
+        raise ValueError("Test has no questions")
+    test = await get_test_definition(db, test_id)
+    attempt = await start_attempt(db, user_id, test_id)
+    first = select_next_item(bank, 0.0, set())
+    attempt.current_question_id = first
+    await db.flush()
+    return {
+        "attempt_id": attempt.id,
+        "question": _question_payload(test, test_id, first),
+        "ability": 0.0,
+        "standard_error": 1.0,
+        "answered": 0,
+        "finished": False,
+    }
+
+
+async def answer_adaptive_question(
+    db: AsyncSession,
+    attempt_id: int,
+    user_id: int,
+    question_id: int,
+    user_answer: dict,
+) -> dict:
+    """
+    Grade the answer to the served question, update the ability estimate and return
+    the next question or the result. Any other question_id is rejected.
+    """
+    result = await db.execute(
+        select(TestAttempt).where(TestAttempt.id == attempt_id, TestAttempt.user_id == user_id)
+    )
+    attempt = result.scalar_one_or_none()
+    if not attempt:
+        raise ValueError("Attempt not found")
+    if attempt.completed_at:
+        raise ValueError("Attempt already completed")
+    if attempt.current_question_id is None:
+        raise ValueError("Not an adaptive attempt")
+    if question_id != attempt.current_question_id:
+        raise ValueError("Answer the current question")
+    test = await get_test_definition(db, attempt.test_id)
+    bank = await get_item_bank(db, attempt.test_id)
+    if not test or not bank or question_id not in test["questions"]:
+        raise ValueError("Question not in this test")
+
+    stored = await db.execute(
+        select(TestAttemptAnswer.question_id, TestAttemptAnswer.is_correct).where(
+            TestAttemptAnswer.test_attempt_id == attempt_id,
+            TestAttemptAnswer.is_correct.is_not(None),
+        )
+    )
+    history = {qid: bool(ok) for qid, ok in stored.all()}
+    if question_id in history:
+        raise ValueError("Question already answered")
+
+    q = test["questions"][question_id]
+    credit = q["grade"](user_answer.get("answer"))
+    is_correct = credit >= 1.0
+    # Upsert: an autosaved draft for this question may already exist
+    stmt = dialect_insert(db, TestAttemptAnswer).values(
+        test_attempt_id=attempt_id,
+        question_id=question_id,
+        user_answer=user_answer,
+        is_correct=is_correct,
+        points_earned=q["points"] * credit,
+    )
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["test_attempt_id", "question_id"],
+            set_={
+                "user_answer": stmt.excluded.user_answer,
+                "is_correct": stmt.excluded.is_correct,
+                "points_earned": stmt.excluded.points_earned,
+            },
+        )
+    )
+    history[question_id] = is_correct
+
+    by_id = bank["by_id"]
+    theta, se = estimate_ability(
+        [(by_id.get(qid, 0.0), ok) for qid, ok in history.items()]
+    )
+    attempt.ability = round(theta, 4)
+    answered = len(history)
+    next_id = None
+    if answered < MAX_ITEMS and not (answered >= MIN_ITEMS and se <= TARGET_SE):
+        next_id = select_next_item(bank, theta, set(history))
+    attempt.current_question_id = next_id
+
+    out = {
+        "attempt_id": attempt_id,
+        "is_correct": is_correct,
+        "ability": round(theta, 4),
+        "standard_error": round(se, 4),
+        "answered": answered,
+        "finished": next_id is None,
+        "question": _question_payload(test, attempt.test_id, next_id) if next_id else None,
+    }
+    if next_id is None:
+        score = round(expected_score(bank, theta), 2)
+        attempt.score = score
+        attempt.passed = score >= test["passing_score"]
+        attempt.completed_at = datetime.utcnow()
+        await bump_progress(db, user_id, test_passed=int(attempt.passed))
+        await award_test_xp(db, user_id, attempt)
+        await record_activity(db, user_id, tests=1)
+        if not attempt.passed:
+            emit_event(db, user_id, TEST_FAILED)
+        if attempt.passed and test["is_final"]:
+            await complete_final_test_lesson(db, user_id, test["lesson_id"])
+        out.update(score=score, passed=attempt.passed)
+    await db.flush()
+    return out
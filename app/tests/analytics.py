@@ -0,0 +1,189 @@
+"""
+Item analytics for test questions.
+Each submission adds its answers to per-question rollups (attempts, correct, score sums)
+and to per-answer-value counters, so the report costs O(questions) whatever the number
+of attempts. Discrimination is the point-biserial correlation between answering the
+question correctly and the attempt score.
+"""
+import json
+import math
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import select, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import dialect_insert
+from app.models.test import (
+    TestQuestion,
+    TestAttempt,
+    TestAttemptAnswer,
+    TestQuestionStats,
+    TestQuestionOptionStats,
+)
+
+OPTION_MAX_LEN = 255
+
+
+def option_key(value: Any) -> str:
+    """Answer value as stored in the option distribution ("" for no answer)."""
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        value = json.dumps(value, ensure_ascii=False, sort_keys=True)
+    return str(value).strip()[:OPTION_MAX_LEN]
+
+
+def _stat_rows(test_id: int, answers: list[dict], score: float) -> tuple[list[dict], list[dict]]:
+    """Increment rows for one attempt: (question stats, option counts), sorted by key."""
+    stats: dict[int, dict] = {}
+    options: dict[tuple[int, str], int] = {}
+    for row in answers:
+        qid = row["question_id"]
+        correct = 1 if row["is_correct"] else 0
+        stats[qid] = {
+            "question_id": qid,
+            "test_id": test_id,
+            "attempts": 1,
+            "correct": correct,
+            "score_sum": score,
+            "score_sq_sum": score * score,
+            "correct_score_sum": score * correct,
+            "updated_at": datetime.utcnow(),
+        }
+        key = (qid, option_key((row.get("user_answer") or {}).get("answer")))
+        options[key] = options.get(key, 0) + 1
+    # Fixed lock order for concurrent submissions
+    stat_rows = [stats[qid] for qid in sorted(stats)]
+    option_rows = [
+        {"question_id": qid, "option": opt, "count": n}
+        for (qid, opt), n in sorted(options.items())
+    ]
+    return stat_rows, option_rows
+
+
+async def _upsert_increments(db: AsyncSession, stat_rows: list[dict], option_rows: list[dict]) -> None:
+    if stat_rows:
+        stmt = dialect_insert(db, TestQuestionStats)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["question_id"],
+            set_={
+                "attempts": TestQuestionStats.attempts + stmt.excluded.attempts,
+                "correct": TestQuestionStats.correct + stmt.excluded.correct,
+                "score_sum": TestQuestionStats.score_sum + stmt.excluded.score_sum,
+                "score_sq_sum": TestQuestionStats.score_sq_sum + stmt.excluded.score_sq_sum,
+                "correct_score_sum": TestQuestionStats.correct_score_sum + stmt.excluded.correct_score_sum,
+                "updated_at": stmt.excluded.updated_at,
+            },
+        )
+        await db.execute(stmt, stat_rows)
+    if option_rows:
+        stmt = dialect_insert(db, TestQuestionOptionStats)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["question_id", "option"],
+            set_={"count": TestQuestionOptionStats.count + stmt.excluded.count},
+        )
+        await db.execute(stmt, option_rows)
+
+
+async def record_attempt_stats(
+    db: AsyncSession, test_id: int, answers: list[dict], score: float
+) -> None:
+    """Add one graded attempt (answer rows from grade_answers, score 0-100) to the rollups."""
+    stat_rows, option_rows = _stat_rows(test_id, answers, score)
+    await _upsert_increments(db, stat_rows, option_rows)
+
+
+async def rebuild_test_analytics(db: AsyncSession, test_id: int | None = None) -> int:
+    """Recompute the rollups from stored answers of completed attempts. Returns attempts counted."""
+    question_ids = select(TestQuestion.id)
+    if test_id is not None:
+        question_ids = question_ids.where(TestQuestion.test_id == test_id)
+    await db.execute(delete(TestQuestionOptionStats).where(TestQuestionOptionStats.question_id.in_(question_ids)))
+    await db.execute(delete(TestQuestionStats).where(TestQuestionStats.question_id.in_(question_ids)))
+
+    q = (
+        select(
+            TestAttempt.id,
+            TestAttempt.test_id,
+            TestAttempt.score,
+            TestAttemptAnswer.question_id,
+            TestAttemptAnswer.user_answer,
+            TestAttemptAnswer.is_correct,
+        )
+        .join(TestAttemptAnswer, TestAttemptAnswer.test_attempt_id == TestAttempt.id)
+        .where(TestAttempt.completed_at.is_not(None))
+        .order_by(TestAttempt.id)
+    )
+    if test_id is not None:
+        q = q.where(TestAttempt.test_id == test_id)
+    attempts: dict[int, tuple[int, float, list[dict]]] = {}
+    for attempt_id, t_id, score, qid, user_answer, is_correct in (await db.execute(q)).all():
+        entry = attempts.setdefault(attempt_id, (t_id, score or 0.0, []))
+        entry[2].append({"question_id": qid, "user_answer": user_answer, "is_correct": is_correct})
+    for t_id, score, answers in attempts.values():
+        await record_attempt_stats(db, t_id, answers, score)
+    return len(attempts)
+
+
+def point_biserial(attempts: int, correct: int, score_sum: float, score_sq_sum: float, correct_score_sum: float) -> float | None:
+    """r_pb = (M1 - M0) / s * sqrt(p * q); None when undefined (no variance or all/none correct)."""
+    if attempts < 2 or correct in (0, attempts):
+        return None
+    mean = score_sum / attempts
+    variance = score_sq_sum / attempts - mean * mean
+    if variance <= 1e-9:
+        return None
+    m1 = correct_score_sum / correct
+    m0 = (score_sum - correct_score_sum) / (attempts - correct)
+    p = correct / attempts
+    return (m1 - m0) / math.sqrt(variance) * math.sqrt(p * (1 - p))
+
+
+async def get_test_analytics(db: AsyncSession, test_id: int) -> list[dict]:
+    """
+    Per-question report in question order:
+    [{question_id, question_text, attempts, correct_rate, discrimination, options: [{option, count}]}].
+    """
+    questions = (
+        await db.execute(
+            select(TestQuestion.id, TestQuestion.question_text)
+            .where(TestQuestion.test_id == test_id)
+            .order_by(TestQuestion.order_index, TestQuestion.id)
+        )
+    ).all()
+    stats = {
+        s.question_id: s
+        for s in (
+            await db.execute(select(TestQuestionStats).where(TestQuestionStats.test_id == test_id))
+        ).scalars().all()
+    }
+    options: dict[int, list[dict]] = {}
+    option_rows = await db.execute(
+        select(TestQuestionOptionStats)
+        .join(TestQuestion, TestQuestion.id == TestQuestionOptionStats.question_id)
+        .where(TestQuestion.test_id == test_id)
+        .order_by(TestQuestionOptionStats.question_id, TestQuestionOptionStats.count.desc())
+    )
+    for o in option_rows.scalars().all():
+        options.setdefault(o.question_id, []).append({"option": o.option, "count": o.count})
+
+    out = []
+    for qid, text in questions:
+        s = stats.get(qid)
+        attempts = s.attempts if s else 0
+        discrimination = (
+            point_biserial(s.attempts, s.correct, s.score_sum, s.score_sq_sum, s.correct_score_sum)
+            if s else None
+        )
+        out.append(
+            {
+                "question_id": qid,
+                "question_text": text,
+                "attempts": attempts,
+                "correct_rate": round(s.correct / attempts, 4) if attempts else None,
+                "discrimination": round(discrimination, 4) if discrimination is not None else None,
+                "options": options.get(qid, []),
+            }
+        )
+    return out
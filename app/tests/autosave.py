@@ -0,0 +1,103 @@
+"""
+Autosave of in-progress test attempts.
+Draft answers are coalesced in memory per attempt (last write per question wins) and
+written in batches by a periodic task (main.py lifespan) as test_attempt_answers rows
+with is_correct = NULL. submit_test merges stored drafts with what is still pending here.
+"""
+import logging
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import async_session_maker, dialect_insert
+from app.models.test import TestAttemptAnswer
+
+logger = logging.getLogger(__name__)
+
+# attempt_id -> {question_id: user_answer}
+_buffer: dict[int, dict[int, dict]] = {}
+# Batch taken by the running flush, still visible to submit until written
+_in_flight: dict[int, dict[int, dict]] = {}
+# Open attempts already checked: attempt_id -> (user_id, test_id)
+_open_attempts: dict[int, tuple[int, int]] = {}
+MAX_OPEN_ATTEMPTS = 10_000
+
+
+def get_open_attempt(attempt_id: int) -> tuple[int, int] | None:
+    """(user_id, test_id) of an attempt known to be in progress, if cached."""
+    return _open_attempts.get(attempt_id)
+
+
+def remember_open_attempt(attempt_id: int, user_id: int, test_id: int) -> None:
+    if len(_open_attempts) >= MAX_OPEN_ATTEMPTS:
+        _open_attempts.clear()
+    _open_attempts[attempt_id] = (user_id, test_id)
+
+
+def buffer_answers(attempt_id: int, answers: dict[int, dict]) -> None:
+    """Queue draft answers {question_id: user_answer} for the next flush."""
+    if answers:
+        _buffer.setdefault(attempt_id, {}).update(answers)
+
+
+def pending_answers(attempt_id: int) -> dict[int, dict]:
+    """Draft answers not yet written to the database (in-flight first, newer buffered on top)."""
+    out = dict(_in_flight.get(attempt_id, {}))
+    out.update(_buffer.get(attempt_id, {}))
+    return out
+
+
+def discard_attempt(attempt_id: int) -> None:
+    """Forget a submitted attempt: its pending drafts were graded by submit_test."""
+    _buffer.pop(attempt_id, None)
+    _in_flight.pop(attempt_id, None)
+    _open_attempts.pop(attempt_id, None)
+
+
+def buffered_count() -> int:
+    return sum(len(a) for a in _buffer.values())
+
+
+async def write_drafts(db: AsyncSession, batch: dict[int, dict[int, dict]]) -> int:
+    """Upsert draft rows; answers already graded (is_correct set) are left untouched."""
+    rows = [
+        {
+            "test_attempt_id": attempt_id,
+            "question_id": qid,
+            "user_answer": user_answer,
+            "is_correct": None,
+            "points_earned": None,
+        }
+        for attempt_id in sorted(batch)
+        for qid, user_answer in sorted(batch[attempt_id].items())
+    ]
+    if not rows:
+        return 0
+    stmt = dialect_insert(db, TestAttemptAnswer)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["test_attempt_id", "question_id"],
+        set_={"user_answer": stmt.excluded.user_answer},
+        where=TestAttemptAnswer.is_correct.is_(None),
+    )
+    await db.execute(stmt, rows)
+    return len(rows)
+
+
+async def flush_buffered_answers() -> None:
+    """Write everything buffered so far in one transaction (periodic task and shutdown)."""
+    global _buffer, _in_flight
+    if not _buffer:
+        return
+    batch, _buffer = _buffer, {}
+    _in_flight = batch
+    try:
+        async with async_session_maker() as db:
+            written = await write_drafts(db, batch)
+            await db.commit()
+        logger.debug("autosave: wrote %s draft answers", written)
+    except Exception:
+        # Keep the drafts for the next run; newer answers buffered meanwhile win
+        for attempt_id, answers in _in_flight.items():
+            _buffer[attempt_id] = {**answers, **_buffer.get(attempt_id, {})}
+        raise
+    finally:
+        _in_flight = {}
@@ -0,0 +1,181 @@
+"""
+Test question grading.
+Each question is compiled once into a grader closure, chosen by content["type"]:
+
+- multiple_choice (default): answer equals correct_answer (or one of them, if a list)
+- fill_blank: normalized answer in {correct_answer} + accepted_answers
+- matching: answer {left: right} against pairs; partial credit per correct pair
+- ordering: answer list against correct_answer list; partial credit per item in place
+
+A grader maps the raw answer value to a credit in [0, 1]; points = credit * question points.
+Set content["partial_credit"] = false to make matching/ordering all-or-nothing.
+public_content() is what students get to see: the content without the answer key.
+"""
+import re
+from typing import Any, Callable
+
+from app.core.cache import VersionedCache
+
+Grader = Callable[[Any], float]
+
+GRADERS: dict[str, Callable[[dict], Grader]] = {}
+DEFAULT_TYPE = "multiple_choice"
+
+# Content keys that give the answer away
+ANSWER_KEYS = ("correct_answer", "accepted_answers", "pairs")
+
+_SPACES_RE = re.compile(r"\s+")
+_EDGE_PUNCT = " .,!?;:«»\"'()"
+
+# (question_id, test definition version) -> grader
+_compiled = VersionedCache(maxsize=4096)
+
+
+def register(question_type: str):
+    """Register a grader factory: factory(content) -> grader(answer_value) -> credit."""
+    def wrap(factory: Callable[[dict], Grader]) -> Callable[[dict], Grader]:
+        GRADERS[question_type] = factory
+        return factory
+    return wrap
+
+
+def normalize(value: Any) -> str:
+    """Case-, whitespace- and edge-punctuation-insensitive form of a text answer."""
+    text = _SPACES_RE.sub(" ", str(value)).strip(_EDGE_PUNCT).lower()
+    return text.replace("ё", "е")
+
+
+def _never(_: Any) -> float:
+    return 0.0
+
+
+@register("multiple_choice")
+def _multiple_choice(content: dict) -> Grader:
+    correct = content.get("correct_answer")
+    if correct is None:
+        return _never
+    if isinstance(correct, list):
+        accepted = frozenset(str(c) for c in correct)
+        return lambda value: 1.0 if value is not None and str(value) in accepted else 0.0
+    return lambda value: 1.0 if value == correct else 0.0
+
+
+@register("fill_blank")
+def _fill_blank(content: dict) -> Grader:
+    correct = content.get("correct_answer")
+    variants = list(correct) if isinstance(correct, list) else [correct]
+    variants += content.get("accepted_answers") or []
+    accepted = frozenset(normalize(v) for v in variants if v is not None)
+    if not accepted:
+        return _never
+    return lambda value: 1.0 if value is not None and normalize(value) in accepted else 0.0
+
+
+def _credit(hits: int, total: int, partial: bool) -> float:
+    if hits == total:
+        return 1.0
+    return hits / total if partial else 0.0
+
+
+@register("matching")
+def _matching(content: dict) -> Grader:
+    pairs = content.get("pairs") or content.get("correct_answer") or {}
+    if isinstance(pairs, list):
+        pairs = {left: right for left, right in pairs}
+    expected = {normalize(k): normalize(v) for k, v in pairs.items()}
+    if not expected:
+        return _never
+    total = len(expected)
+    partial = content.get("partial_credit", True)
+
+    def grade(value: Any) -> float:
+        if isinstance(value, list):
+            value = {p[0]: p[1] for p in value if isinstance(p, (list, tuple)) and len(p) == 2}
+        if not isinstance(value, dict):
+            return 0.0
+        # Keys that normalize alike count once
+        given = {normalize(k): normalize(v) for k, v in value.items()}
+        hits = sum(1 for left, right in expected.items() if given.get(left) == right)
+        return min(1.0, _credit(hits, total, partial))
+
+    return grade
+
+
+@register("ordering")
+def _ordering(content: dict) -> Grader:
+    expected = tuple(normalize(v) for v in content.get("correct_answer") or [])
+    if not expected:
+        return _never
+    total = len(expected)
+    partial = content.get("partial_credit", True)
+
+    def grade(value: Any) -> float:
+        if not isinstance(value, (list, tuple)):
+            return 0.0
+        hits = sum(1 for got, want in zip(value, expected) if normalize(got) == want)
+        return _credit(hits, total, partial)
+
+    return grade
+
+
+def public_content(content: dict) -> dict:
+    """
+    Question content without ANSWER_KEYS. Matching questions get "left" and sorted
+    "right" items instead of pairs; ordering questions without options get the items sorted.
+    """
+    out = {k: v for k, v in content.items() if k not in ANSWER_KEYS}
+    question_type = content.get("type") or DEFAULT_TYPE
+    if question_type == "matching" and "left" not in out:
+        pairs = content.get("pairs") or content.get("correct_answer") or {}
+        if isinstance(pairs, list):
+            pairs = {left: right for left, right in pairs}
+        out["left"] = list(pairs)
+        out["right"] = sorted(pairs.values(), key=str)
+    elif question_type == "ordering" and "options" not in out:
+        out["options"] = sorted(content.get("correct_answer") or [], key=str)
+    return out
+
+
+def compile_grader(content: dict) -> Grader:
+    """Build the grader for one question's content (no caching)."""
+    factory = GRADERS.get(content.get("type") or DEFAULT_TYPE, GRADERS[DEFAULT_TYPE])
+    return factory(content)
+
+
+def get_grader(question_id: int, version: int, content: dict) -> Grader:
+    """Compiled grader for a question, reused until the test definition version changes."""
+    key = (question_id, version)
+    grader = _compiled.get(key)
+    if grader is None:
+        grader = compile_grader(content)
+        _compiled.set(key, grader, _compiled.version(key))
+    return grader
+
+
+def grade_answers(questions: dict[int, dict], answers: list[dict]) -> tuple[list[dict], float, float]:
+    """
+    Score an attempt in one pass.
+    questions: {question_id: {"grade": grader, "points": float}} (see get_test_definition).
+    Returns (answer rows, earned points, total points); unknown question ids are skipped.
+    """
+    rows = []
+    earned = total = 0.0
+    for ans in answers:
+        qid = ans.get("question_id")
+        q = questions.get(qid)
+        if not q:
+            continue
+        user_ans = ans.get("user_answer") or {}
+        credit = q["grade"](user_ans.get("answer"))
+        pts = q["points"] * credit
+        total += q["points"]
+        earned += pts
+        rows.append(
+            {
+                "question_id": qid,
+                "user_answer": user_ans,
+                "is_correct": credit >= 1.0,
+                "points_earned": pts,
+            }
+        )
+    return rows, earned, total
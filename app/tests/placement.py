@@ -0,0 +1,170 @@
+"""
+Placement test: sets User.language_level (and placement_level) from the existing question pool.
+Items are grouped into per-level pools by their lesson's level; the pools are precomputed
+and cached. The test climbs levels: each level is a block of ITEMS_PER_LEVEL questions,
+passed with PASS_CORRECT correct answers. A block stops as soon as its outcome is
+decided. Progress is scored incrementally in one placement_attempts row.
+"""
+import random
+import time
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import VersionedCache
+from app.models.lesson import Lesson
+from app.models.test import Test, TestQuestion, PlacementAttempt
+from app.models.user import User, LanguageLevel
+from app.tests.grading import compile_grader, public_content
+
+LEVELS = [level.value for level in LanguageLevel]
+ITEMS_PER_LEVEL = 4
+PASS_CORRECT = 3
+POOL_TTL_SECONDS = 600
+
+_pools = VersionedCache(maxsize=1)
+
+
+async def _load_pools(db: AsyncSession) -> dict:
+    result = await db.execute(
+        select(TestQuestion.id, TestQuestion.test_id, TestQuestion.question_text, TestQuestion.content, Lesson.level)
+        .join(Test, Test.id == TestQuestion.test_id)
+        .join(Lesson, Lesson.id == Test.lesson_id)
+    )
+    pools: dict[str, list[int]] = {level: [] for level in LEVELS}
+    items: dict[int, dict] = {}
+    for qid, test_id, text, content, level in result.all():
+        content = content or {}
+        if level not in pools or content.get("correct_answer") is None:
+            continue
+        pools[level].append(qid)
+        items[qid] = {
+            "test_id": test_id,
+            "question_text": text,
+            "content": content,
+            "grade": compile_grader(content),
+        }
+    return {"pools": pools, "items": items, "loaded_at": time.monotonic()}
+
+
+async def get_item_pools(db: AsyncSession) -> dict:
+    """{"pools": {level: [question_id]}, "items": {question_id: {...}}}, cached with a TTL."""
+    pools = _pools.get("pools")
+    if pools and time.monotonic() - pools["loaded_at"] < POOL_TTL_SECONDS:
+        return pools
+    version = _pools.version("pools")
+    pools = await _load_pools(db)
+    _pools.set("pools", pools, version)
+    return pools
+
+
+def _draw(pools: dict, level: str, asked: set[int]) -> int | None:
+    candidates = [qid for qid in pools["pools"].get(level, []) if qid not in asked]
+    return random.choice(candidates) if candidates else None
+
+
+def _question_payload(pools: dict, question_id: int) -> dict:
+    item = pools["items"][question_id]
+    return {
+        "id": question_id,
+        "test_id": item["test_id"],
+        "question_text": item["question_text"],
+        "content": public_content(item["content"]),
+        "order_index": 0,
+    }
+
+
+def _step(placement: PlacementAttempt, pools: dict, **extra) -> dict:
+    finished = placement.completed_at is not None
+    return {
+        "placement_id": placement.id,
+        "level": placement.current_level,
+        "answered": len(placement.asked or []),
+        "finished": finished,
+        "result_level": placement.result_level,
+        "question": None if finished else _question_payload(pools, placement.current_question_id),
+        **extra,
+    }
+
+
+async def start_placement(db: AsyncSession, user_id: int) -> dict:
+    pools = await get_item_pools(db)
+    first = _draw(pools, LEVELS[0], set())
+    if first is None:
+        raise ValueError("No placement questions available")
+    placement = PlacementAttempt(
+        user_id=user_id,
+        current_level=LEVELS[0],
+        current_question_id=first,
+        level_stats={},
+        asked=[],
+    )
+    db.add(placement)
+    await db.flush()
+    return _step(placement, pools)
+
+
+async def _finish(db: AsyncSession, placement: PlacementAttempt, level: str) -> None:
+    placement.result_level = level
+    placement.current_question_id = None
+    placement.completed_at = datetime.utcnow()
+    user = (await db.execute(select(User).where(User.id == placement.user_id))).scalar_one()
+    user.language_level = LanguageLevel(level)
+    user.placement_level = LanguageLevel(level)
+
+
+async def answer_placement(
+    db: AsyncSession,
+    placement_id: int,
+    user_id: int,
+    question_id: int,
+    user_answer: dict,
+) -> dict:
+    """Score one answer and move within / between level blocks; sets the user's level when done."""
+    result = await db.execute(
+        select(PlacementAttempt).where(
+            PlacementAttempt.id == placement_id,
+            PlacementAttempt.user_id == user_id,
+        )
+    )
+    placement = result.scalar_one_or_none()
+    if not placement:
+        raise ValueError("Placement test not found")
+    if placement.completed_at:
+        raise ValueError("Placement test already completed")
+    if question_id != placement.current_question_id:
+        raise ValueError("Answer the current question")
+
+    pools = await get_item_pools(db)
+    item = pools["items"].get(question_id)
+    is_correct = bool(item) and item["grade"](user_answer.get("answer")) >= 1.0
+
+    level = placement.current_level
+    stats = dict(placement.level_stats or {})
+    asked_n, correct_n = stats.get(level, [0, 0])
+    asked_n, correct_n = asked_n + 1, correct_n + (1 if is_correct else 0)
+    stats[level] = [asked_n, correct_n]
+    placement.level_stats = stats
+    placement.asked = [*(placement.asked or []), question_id]
+    asked = set(placement.asked)
+
+    next_level = level
+    if correct_n >= PASS_CORRECT:
+        idx = LEVELS.index(level)
+        if idx + 1 >= len(LEVELS):
+            await _finish(db, placement, level)
+        else:
+            next_level = LEVELS[idx + 1]
+    elif correct_n + (ITEMS_PER_LEVEL - asked_n) < PASS_CORRECT:
+        await _finish(db, placement, level)
+
+    if not placement.completed_at:
+        next_q = _draw(pools, next_level, asked)
+        if next_q is None:
+            await _finish(db, placement, next_level)
+        else:
+            placement.current_level = next_level
+            placement.current_question_id = next_q
+    await db.flush()
+    return _step(placement, pools, is_correct=is_correct)
@@ -1,14 +1,15 @@
 """Test API routes."""
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import etag_response
 from app.core.database import get_db
 from app.core.deps import get_current_user, RequireTeacher
 from app.models.user import User
-from app.models.test import Test, TestQuestion, TestAttempt, TestAttemptAnswer
+from app.models.test import Test, TestQuestion
 from app.models.lesson import Lesson
 from app.lessons.service import get_completed_lesson_ids, get_prerequisites_map, lesson_is_accessible
 from app.tests.schemas import (
@@ -16,10 +17,27 @@ from app.tests.schemas import (
     TestUpdate,
     TestRead,
     TestQuestionRead,
-    TestAttemptRead,
+    TestAttemptReview,
     TestAttemptSubmit,
+    TestAttemptAnswersSave,
+    TestAnalytics,
+    AdaptiveAnswer,
+    AdaptiveStep,
+    PlacementStep,
 )
-from app.tests.service import start_attempt, submit_test
+from app.tests.service import (
+    start_attempt,
+    get_attempt_questions,
+    get_attempt_review,
+    save_answers,
+    submit_test,
+    invalidate_test_definition,
+    get_test_catalog,
+    invalidate_test_catalog,
+)
+from app.tests.analytics import get_test_analytics
+from app.tests.adaptive import start_adaptive_attempt, answer_adaptive_question
+from app.tests.placement import start_placement, answer_placement
 
 router = APIRouter(prefix="/tests", tags=["tests"])
 
@@ -34,16 +52,41 @@ async def _check_lesson_access(db, user, lesson_id):
 
 @router.get("/", response_model=list[TestRead])
 async def list_tests(
+    request: Request,
     lesson_id: int | None = None,
     current_user: Annotated[User, Depends(get_current_user)] = None,
     db: Annotated[AsyncSession, Depends(get_db)] = None,
 ):
-    """List tests, optionally by lesson."""
-    q = select(Test).order_by(Test.id)
-    if lesson_id:
-        q = q.where(Test.lesson_id == lesson_id)
-    result = await db.execute(q)
-    return list(result.scalars().all())
+    """List tests, optionally by lesson. Served from the catalog cache with an ETag."""
+    return etag_response(request, await get_test_catalog(db, lesson_id or None))
+
+
+@router.post("/placement", response_model=PlacementStep)
+async def start_placement_test(
+    current_user: Annotated[User, Depends(get_current_user)],
+    db: Annotated[AsyncSession, Depends(get_db)],
+):
+    """Start a placement test; its result sets the user's language level."""
+    try:
+        return await start_placement(db, current_user.id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/placement/{placement_id}/answer", response_model=PlacementStep)
+async def answer_placement_test(
+    placement_id: int,
+    data: AdaptiveAnswer,
+    current_user: Annotated[User, Depends(get_current_user)],
+    db: Annotated[AsyncSession, Depends(get_db)],
+):
+    """Answer the current placement question; returns the next one or the assigned level."""
+    try:
+        return await answer_placement(
+            db, placement_id, current_user.id, data.question_id, data.user_answer
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.get("/{test_id}", response_model=TestRead)
@@ -70,24 +113,35 @@ async def get_test(
 @router.get("/{test_id}/questions", response_model=list[TestQuestionRead])
 async def get_test_questions(
     test_id: int,
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[User, RequireTeacher],
     db: Annotated[AsyncSession, Depends(get_db)],
 ):
-    """Get test questions."""
+    """All test questions with answers (staff). Students get theirs from /attempts/{id}/questions."""
     result = await db.execute(select(Test).where(Test.id == test_id))
     test = result.scalar_one_or_none()
     if not test:
         raise HTTPException(status_code=404, detail="Test not found")
-    if current_user.role.value == "student":
-        ok = await _check_lesson_access(db, current_user, test.lesson_id)
-        if not ok:
-            raise HTTPException(status_code=403, detail="Complete lesson first")
     q_res = await db.execute(
         select(TestQuestion).where(TestQuestion.test_id == test_id).order_by(TestQuestion.order_index)
     )
     return list(q_res.scalars().all())
 
 
+@router.get("/{test_id}/analytics", response_model=TestAnalytics)
+async def test_analytics(
+    test_id: int,
+    current_user: Annotated[User, RequireTeacher],
+    db: Annotated[AsyncSession, Depends(get_db)],
+):
+    """Per-question statistics: correct rate, discrimination, answer distribution (teacher/admin)."""
+    result = await db.execute(select(Test).where(Test.id == test_id))
+    test = result.scalar_one_or_none()
+    if not test:
+        raise HTTPException(status_code=404, detail="Test not found")
+    questions = await get_test_analytics(db, test_id)
+    return TestAnalytics(test_id=test.id, title=test.title, questions=questions)
+
+
 @router.post("/{test_id}/attempt")
 async def start_test_attempt(
     test_id: int,
@@ -106,6 +160,74 @@ async def start_test_attempt(
     return {"attempt_id": attempt.id}
 
 
+@router.post("/{test_id}/adaptive", response_model=AdaptiveStep)
+async def start_adaptive_test(
+    test_id: int,
+    current_user: Annotated[User, Depends(get_current_user)],
+    db: Annotated[AsyncSession, Depends(get_db)],
+):
+    """Start an adaptive attempt: questions are picked one by one to match the student's level."""
+    result = await db.execute(select(Test).where(Test.id == test_id))
+    test = result.scalar_one_or_none()
+    if not test:
+        raise HTTPException(status_code=404, detail="Test not found")
+    ok = await _check_lesson_access(db, current_user, test.lesson_id)
+    if not ok:
+        raise HTTPException(status_code=403, detail="Complete lesson first")
+    try:
+        return await start_adaptive_attempt(db, current_user.id, test_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/attempts/{attempt_id}/adaptive/answer", response_model=AdaptiveStep)
+async def answer_adaptive_test(
+    attempt_id: int,
+    data: AdaptiveAnswer,
+    current_user: Annotated[User, Depends(get_current_user)],
+    db: Annotated[AsyncSession, Depends(get_db)],
+):
+    """Answer the current adaptive question; returns the next one or the final result."""
+    try:
+        return await answer_adaptive_question(
+            db, attempt_id, current_user.id, data.question_id, data.user_answer
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/attempts/{attempt_id}/questions", response_model=list[TestQuestionRead])
+async def get_attempt_questions_route(
+    attempt_id: int,
+    current_user: Annotated[User, Depends(get_current_user)],
+    db: Annotated[AsyncSession, Depends(get_db)],
+):
+    """Questions of this attempt: randomized subset, order and options (stable per attempt)."""
+    try:
+        return await get_attempt_questions(db, attempt_id, current_user.id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.put("/attempts/{attempt_id}/answers")
+async def save_attempt_answers(
+    attempt_id: int,
+    data: TestAttemptAnswersSave,
+    current_user: Annotated[User, Depends(get_current_user)],
+    db: Annotated[AsyncSession, Depends(get_db)],
+):
+    """Autosave answers of an in-progress attempt (only changed answers need to be sent)."""
+    answers = [
+        {"question_id": a.question_id, "user_answer": a.user_answer}
+        for a in data.answers
+    ]
+    try:
+        saved = await save_answers(db, attempt_id, current_user.id, answers)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"saved": saved}
+
+
 @router.post("/attempts/{attempt_id}/submit")
 async def submit_test_attempt(
     attempt_id: int,
@@ -128,32 +250,19 @@ async def submit_test_attempt(
     }
 
 
-@router.get("/attempts/{attempt_id}")
+@router.get("/attempts/{attempt_id}", response_model=TestAttemptReview)
 async def get_attempt(
     attempt_id: int,
     current_user: Annotated[User, Depends(get_current_user)],
     db: Annotated[AsyncSession, Depends(get_db)],
 ):
-    """Get attempt details (for review)."""
-    result = await db.execute(
-        select(TestAttempt).where(
-            TestAttempt.id == attempt_id,
-            TestAttempt.user_id == current_user.id,
-        )
+    """Get attempt details for review: question text, user answer, correctness, correct answer when allowed."""
+    review = await get_attempt_review(
+        db, attempt_id, current_user.id, is_staff=current_user.role.value != "student"
     )
-    attempt = result.scalar_one_or_none()
-    if not attempt:
+    if not review:
         raise HTTPException(status_code=404, detail="Attempt not found")
-    answers_result = await db.execute(
-        select(TestAttemptAnswer).where(
-            TestAttemptAnswer.test_attempt_id == attempt_id
-        )
-    )
-    answers = list(answers_result.scalars().all())
-    return {
-        "attempt": TestAttemptRead.model_validate(attempt),
-        "answers": [{"question_id": a.question_id, "is_correct": a.is_correct} for a in answers],
-    }
+    return review
 
 
 # Teacher only
@@ -169,9 +278,11 @@ async def create_test(
         title=data.title,
         description=data.description,
         passing_score=data.passing_score,
+        questions_per_attempt=data.questions_per_attempt,
     )
     db.add(test)
     await db.flush()
+    invalidate_test_catalog(db, test.lesson_id)
     await db.refresh(test)
     return test
 
@@ -194,7 +305,12 @@ async def update_test(
         test.description = data.description
     if data.passing_score is not None:
         test.passing_score = data.passing_score
+    if data.questions_per_attempt is not None:
+        # 0 switches back to all questions
+        test.questions_per_attempt = data.questions_per_attempt or None
     await db.flush()
+    invalidate_test_definition(db, test_id)
+    invalidate_test_catalog(db, test.lesson_id)
     await db.refresh(test)
     return test
 
@@ -211,4 +327,6 @@ async def delete_test(
     if not test:
         raise HTTPException(status_code=404, detail="Test not found")
     await db.delete(test)
+    invalidate_test_definition(db, test_id)
+    invalidate_test_catalog(db, test.lesson_id)
     return {"status": "ok"}
@@ -1,5 +1,7 @@
 """Test schemas."""
 from datetime import datetime
+from typing import Any
+
 from pydantic import BaseModel
 
 
@@ -7,6 +9,7 @@ class TestBase(BaseModel):
     title: str
     description: str | None = None
     passing_score: float = 70.0
+    questions_per_attempt: int | None = None  # random subset per attempt; None = all
 
 
 class TestCreate(TestBase):
@@ -17,6 +20,7 @@ class TestUpdate(BaseModel):
     title: str | None = None
     description: str | None = None
     passing_score: float | None = None
+    questions_per_attempt: int | None = None
 
 
 class TestRead(TestBase):
@@ -50,6 +54,10 @@ class TestAttemptAnswerSubmit(BaseModel):
 
 
 class TestAttemptSubmit(BaseModel):
+    answers: list[TestAttemptAnswerSubmit] = []  # may be empty when answers were autosaved
+
+
+class TestAttemptAnswersSave(BaseModel):
     answers: list[TestAttemptAnswerSubmit]
 
 
@@ -58,8 +66,71 @@ class TestAttemptRead(BaseModel):
     test_id: int
     score: float | None
     passed: bool | None
+    ability: float | None = None
     started_at: datetime
     completed_at: datetime | None
 
     class Config:
         from_attributes = True
+
+
+class AttemptAnswerReview(BaseModel):
+    question_id: int
+    question_text: str
+    user_answer: dict | None = None
+    is_correct: bool | None = None  # None = autosaved, not graded yet
+    points_earned: float | None = None
+    correct_answer: Any = None  # only when correct_answers_shown
+
+
+class TestAttemptReview(BaseModel):
+    attempt: TestAttemptRead
+    answers: list[AttemptAnswerReview]
+    correct_answers_shown: bool = False
+
+
+class OptionCount(BaseModel):
+    option: str
+    count: int
+
+
+class QuestionAnalytics(BaseModel):
+    question_id: int
+    question_text: str
+    attempts: int
+    correct_rate: float | None = None
+    discrimination: float | None = None  # point-biserial, None until defined
+    options: list[OptionCount] = []
+
+
+class TestAnalytics(BaseModel):
+    test_id: int
+    title: str
+    questions: list[QuestionAnalytics]
+
+
+class AdaptiveAnswer(BaseModel):
+    question_id: int
+    user_answer: dict
+
+
+class AdaptiveStep(BaseModel):
+    attempt_id: int
+    question: TestQuestionRead | None = None  # None when finished
+    ability: float
+    standard_error: float
+    answered: int
+    finished: bool
+    is_correct: bool | None = None
+    score: float | None = None
+    passed: bool | None = None
+
+
+class PlacementStep(BaseModel):
+    placement_id: int
+    level: str
+    answered: int
+    finished: bool
+    result_level: str | None = None
+    question: TestQuestionRead | None = None
+    is_correct: bool | None = None
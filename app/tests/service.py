@@ -1,10 +1,22 @@
 """Test business logic - evaluation and attempt handling."""
 from datetime import datetime
-from sqlalchemy import select
+from pydantic import TypeAdapter
+from sqlalchemy import select, exists
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import VersionedCache, CachedJson, cached_json
+from app.core.database import dialect_insert, run_after_commit
+from app.tests.grading import compile_grader, get_grader, grade_answers
+from app.tests.analytics import record_attempt_stats
+from app.tests import autosave
+from app.tests.variants import get_variant, variant_questions
+from app.tests.schemas import TestRead
 from app.models.test import Test, TestQuestion, TestAttempt, TestAttemptAnswer
 from app.models.lesson import LessonCompletion
+from app.progress.service import bump_progress
+from app.progress.activity import record_activity
+from app.progress.leaderboard import record_xp
+from app.recommendations.events import emit_event, TEST_FAILED
 
 
 async def start_attempt(db: AsyncSession, user_id: int, test_id: int) -> TestAttempt:
@@ -13,19 +25,197 @@ async def start_attempt(db: AsyncSession, user_id: int, test_id: int) -> TestAtt
     db.add(attempt)
     await db.flush()
     await db.refresh(attempt)
+    await bump_progress(db, user_id, test_attempts=1)
     return attempt
 
 
+_definitions = VersionedCache(maxsize=512)
+
+
+async def _load_test_definition(db: AsyncSession, test_id: int) -> dict | None:
+    test = (await db.execute(select(Test).where(Test.id == test_id))).scalar_one_or_none()
+    if not test:
+        return None
+    questions = (
+        await db.execute(select(TestQuestion).where(TestQuestion.test_id == test_id))
+    ).scalars().all()
+    version = _definitions.version(test_id)
+    return {
+        "id": test.id,
+        "lesson_id": test.lesson_id,
+        "passing_score": test.passing_score if test.passing_score is not None else 70.0,
+        "is_final": bool(test.is_final),
+        "questions_per_attempt": test.questions_per_attempt,
+        "questions": {
+            q.id: {
+                "question_text": q.question_text,
+                "order_index": q.order_index,
+                "content": q.content or {},
+                "points": (q.content or {}).get("points", 1.0),
+                "grade": get_grader(q.id, version, q.content or {}),
+            }
+            for q in questions
+        },
+    }
+
+
+async def get_test_definition(db: AsyncSession, test_id: int) -> dict | None:
+    """
+    Grading view of a test: {id, lesson_id, passing_score, is_final, questions_per_attempt,
+    questions: {id: {question_text, order_index, content, points, grade}}}.
+    Served from the in-process cache; call invalidate_test_definition() after editing a test.
+    """
+    return await _definitions.get_or_load(test_id, lambda: _load_test_definition(db, test_id))
+
+
+def definition_version(test_id: int) -> int:
+    """Changes whenever the test is edited; lets derived caches key on it."""
+    return _definitions.version(test_id)
+
+
+def invalidate_test_definition(db: AsyncSession, test_id: int) -> None:
+    """Drop the cached definition once the edit of this test commits."""
+    run_after_commit(db, lambda: _definitions.invalidate(test_id))
+
+
+# lesson_id (None = all lessons) -> serialized test list
+_catalog = VersionedCache(maxsize=256)
+_catalog_adapter = TypeAdapter(list[TestRead])
+
+
+async def _load_catalog(db: AsyncSession, lesson_id: int | None) -> CachedJson:
+    q = select(Test).order_by(Test.id)
+    if lesson_id is not None:
+        q = q.where(Test.lesson_id == lesson_id)
+    tests = (await db.execute(q)).scalars().all()
+    return cached_json(
+        _catalog_adapter.dump_json(_catalog_adapter.validate_python(tests, from_attributes=True))
+    )
+
+
+async def get_test_catalog(db: AsyncSession, lesson_id: int | None) -> CachedJson:
+    """Test list of a lesson (or of all lessons) as JSON bytes, cached until a test is edited."""
+    return await _catalog.get_or_load(lesson_id, lambda: _load_catalog(db, lesson_id))
+
+
+def invalidate_test_catalog(db: AsyncSession, lesson_id: int) -> None:
+    """Drop cached lists containing the lesson's tests once the session commits."""
+    def drop() -> None:
+        _catalog.invalidate(lesson_id)
+        _catalog.invalidate(None)
+
+    run_after_commit(db, drop)
+
+
 def evaluate_question(question: TestQuestion, user_answer: dict) -> tuple[bool, float]:
     """Evaluate single question. Returns (is_correct, points_earned)."""
     content = question.content or {}
-    correct = content.get("correct_answer")
-    points = content.get("points", 1.0)
-    user_val = user_answer.get("answer")
-    if correct is None:
-        return False, 0.0
-    is_correct = user_val == correct
-    return is_correct, points if is_correct else 0.0
+    credit = compile_grader(content)(user_answer.get("answer"))
+    return credit >= 1.0, content.get("points", 1.0) * credit
+
+
+async def get_attempt_questions(db: AsyncSession, attempt_id: int, user_id: int) -> list[dict]:
+    """Questions of this attempt's variant: random subset and order, shuffled options."""
+    result = await db.execute(
+        select(TestAttempt.test_id).where(
+            TestAttempt.id == attempt_id,
+            TestAttempt.user_id == user_id,
+        )
+    )
+    test_id = result.scalar_one_or_none()
+    if test_id is None:
+        raise ValueError("Attempt not found")
+    test = await get_test_definition(db, test_id)
+    if not test:
+        return []
+    return variant_questions(test, get_variant(test, definition_version(test_id), attempt_id))
+
+
+def _attempt_questions(test: dict | None, attempt_id: int) -> dict[int, dict]:
+    """Gradable questions of an attempt: only those in its variant."""
+    if not test:
+        return {}
+    return get_variant(test, definition_version(test["id"]), attempt_id)["questions"]
+
+
+async def get_attempt_review(
+    db: AsyncSession, attempt_id: int, user_id: int, is_staff: bool = False
+) -> dict | None:
+    """
+    Attempt with its answers, question text and correctness from one joined query.
+    Students see only their own attempts, with correct answers once completed and passed;
+    staff see any attempt with correct answers.
+    """
+    q = (
+        select(
+            TestAttempt,
+            TestAttemptAnswer.question_id,
+            TestAttemptAnswer.user_answer,
+            TestAttemptAnswer.is_correct,
+            TestAttemptAnswer.points_earned,
+            TestQuestion.question_text,
+            TestQuestion.content,
+        )
+        .outerjoin(TestAttemptAnswer, TestAttemptAnswer.test_attempt_id == TestAttempt.id)
+        .outerjoin(TestQuestion, TestQuestion.id == TestAttemptAnswer.question_id)
+        .where(TestAttempt.id == attempt_id)
+        .order_by(TestQuestion.order_index, TestAttemptAnswer.question_id)
+    )
+    if not is_staff:
+        q = q.where(TestAttempt.user_id == user_id)
+    rows = (await db.execute(q)).all()
+    if not rows:
+        return None
+    attempt = rows[0][0]
+    reveal = is_staff or (attempt.completed_at is not None and bool(attempt.passed))
+    answers = [
+        {
+            "question_id": qid,
+            "question_text": text or "",
+            "user_answer": user_answer,
+            "is_correct": is_correct,
+            "points_earned": points,
+            "correct_answer": (content or {}).get("correct_answer") if reveal else None,
+        }
+        for _, qid, user_answer, is_correct, points, text, content in rows
+        if qid is not None
+    ]
+    return {"attempt": attempt, "answers": answers, "correct_answers_shown": reveal}
+
+
+async def save_answers(
+    db: AsyncSession,
+    attempt_id: int,
+    user_id: int,
+    answers: list[dict],
+) -> int:
+    """
+    Autosave draft answers of an in-progress attempt. Answers are buffered in memory
+    and written in batches (app/tests/autosave.py). Returns the number accepted.
+    """
+    open_attempt = autosave.get_open_attempt(attempt_id)
+    if open_attempt is None:
+        result = await db.execute(select(TestAttempt).where(TestAttempt.id == attempt_id))
+        attempt = result.scalar_one_or_none()
+        if not attempt or attempt.user_id != user_id:
+            raise ValueError("Attempt not found")
+        if attempt.completed_at:
+            raise ValueError("Attempt already completed")
+        open_attempt = (attempt.user_id, attempt.test_id)
+        autosave.remember_open_attempt(attempt_id, *open_attempt)
+    owner_id, test_id = open_attempt
+    if owner_id != user_id:
+        raise ValueError("Attempt not found")
+
+    test = await get_test_definition(db, test_id)
+    questions = _attempt_questions(test, attempt_id)
+    accepted = {
+        ans["question_id"]: ans.get("user_answer") or {}
+        for ans in answers
+        if ans.get("question_id") in questions
+    }
+    autosave.buffer_answers(attempt_id, accepted)
+    return len(accepted)
 
 
 async def submit_test(
@@ -34,7 +224,13 @@ async def submit_test(
     user_id: int,
     answers: list[dict],
 ) -> TestAttempt:
-    """Submit test with answers, compute score, complete attempt."""
+    """
+    Submit test with answers, compute score, complete attempt.
+    Autosaved drafts are merged with the submitted answers and graded together.
+    Questions come from the definition cache with precompiled graders (app/tests/grading.py);
+    answers go in one bulk upsert and the lesson completion (final test passed)
+    is an ON CONFLICT DO NOTHING insert.
+    """
     result = await db.execute(
         select(TestAttempt).where(
             TestAttempt.id == attempt_id,
@@ -46,37 +242,42 @@ async def submit_test(
         raise ValueError("Attempt not found")
     if attempt.completed_at:
         raise ValueError("Attempt already completed")
+    if attempt.current_question_id is not None:
+        raise ValueError("Adaptive attempt: answer the current question instead")
+
+    test = await get_test_definition(db, attempt.test_id)
+    questions = _attempt_questions(test, attempt_id)
 
-    questions_result = await db.execute(
-        select(TestQuestion).where(TestQuestion.test_id == attempt.test_id)
+    # Stored drafts < drafts still buffered < answers sent with the submission
+    stored = await db.execute(
+        select(TestAttemptAnswer.question_id, TestAttemptAnswer.user_answer).where(
+            TestAttemptAnswer.test_attempt_id == attempt_id
+        )
     )
-    questions = {q.id: q for q in questions_result.scalars().all()}
-
-    total_points = 0.0
-    earned_points = 0.0
-    for ans in answers:
-        qid = ans.get("question_id")
-        user_ans = ans.get("user_answer", {})
-        q = questions.get(qid)
-        if not q:
-            continue
-        is_correct, pts = evaluate_question(q, user_ans)
-        max_pts = (q.content or {}).get("points", 1.0)
-        total_points += max_pts
-        earned_points += pts
-        db.add(
-            TestAttemptAnswer(
-                test_attempt_id=attempt_id,
-                question_id=qid,
-                user_answer=user_ans,
-                is_correct=is_correct,
-                points_earned=pts,
-            )
+    merged = {qid: user_answer for qid, user_answer in stored.all()}
+    merged.update(autosave.pending_answers(attempt_id))
+    merged.update({ans.get("question_id"): ans.get("user_answer", {}) for ans in answers})
+
+    rows, earned_points, total_points = grade_answers(
+        questions, [{"question_id": qid, "user_answer": ua} for qid, ua in merged.items()]
+    )
+    for row in rows:
+        row["test_attempt_id"] = attempt_id
+    if rows:
+        stmt = dialect_insert(db, TestAttemptAnswer)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["test_attempt_id", "question_id"],
+            set_={
+                "user_answer": stmt.excluded.user_answer,
+                "is_correct": stmt.excluded.is_correct,
+                "points_earned": stmt.excluded.points_earned,
+            },
         )
+        await db.execute(stmt, rows)
+    # A rolled-back submission keeps its buffered drafts
+    run_after_commit(db, lambda: autosave.discard_attempt(attempt_id))
 
-    test_result = await db.execute(select(Test).where(Test.id == attempt.test_id))
-    test = test_result.scalar_one_or_none()
-    passing = test.passing_score if test else 70.0
+    passing = test["passing_score"] if test else 70.0
     score = (earned_points / total_points * 100) if total_points > 0 else 0
     passed = score >= passing
 
@@ -84,18 +285,44 @@ async def submit_test(
     attempt.passed = passed
     attempt.completed_at = datetime.utcnow()
     await db.flush()
+    await record_attempt_stats(db, attempt.test_id, rows, attempt.score)
+    await bump_progress(db, user_id, test_passed=int(passed))
+    await award_test_xp(db, user_id, attempt)
+    await record_activity(db, user_id, tests=1)
+    if not passed:
+        emit_event(db, user_id, TEST_FAILED)
 
     # Auto-complete lesson when user passes final test
-    if passed and test and getattr(test, "is_final", False):
-        existing = await db.execute(
-            select(LessonCompletion).where(
-                LessonCompletion.user_id == user_id,
-                LessonCompletion.lesson_id == test.lesson_id,
+    if passed and test and test["is_final"]:
+        await complete_final_test_lesson(db, user_id, test["lesson_id"])
+
+    return attempt
+
+
+async def award_test_xp(db: AsyncSession, user_id: int, attempt: TestAttempt) -> None:
+    """Test XP for a passed attempt, only the first time the user passes this test."""
+    if not attempt.passed:
+        return
+    passed_before = await db.execute(
+        select(
+            exists().where(
+                TestAttempt.user_id == user_id,
+                TestAttempt.test_id == attempt.test_id,
+                TestAttempt.passed == True,
+                TestAttempt.id != attempt.id,
             )
         )
-        if not existing.scalar_one_or_none():
-            db.add(LessonCompletion(user_id=user_id, lesson_id=test.lesson_id))
-            await db.flush()
+    )
+    if not passed_before.scalar():
+        await record_xp(db, user_id, {"test_first_passed": 1})
 
-    await db.refresh(attempt)
-    return attempt
+
+async def complete_final_test_lesson(db: AsyncSession, user_id: int, lesson_id: int) -> None:
+    """Mark the lesson completed after its final test was passed (no-op if already completed)."""
+    result = await db.execute(
+        dialect_insert(db, LessonCompletion)
+        .values(user_id=user_id, lesson_id=lesson_id, completed_at=datetime.utcnow())
+        .on_conflict_do_nothing(index_elements=["user_id", "lesson_id"])
+    )
+    await bump_progress(db, user_id, lessons_completed=result.rowcount)
+    await record_activity(db, user_id, lessons=result.rowcount)
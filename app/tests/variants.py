@@ -0,0 +1,76 @@
+"""
+Per-attempt randomized test variants.
+For each test version a pool of POOL_SIZE pre-shuffled variants (question subset and
+order, option permutations) is generated once with a seeded RNG and cached. An attempt
+uses variant attempt_id % POOL_SIZE, so nothing is stored per attempt and the same
+attempt always sees the same variant. Options are permuted, not relabelled: answers are
+option values, so grading needs no mapping beyond the variant's question set.
+"""
+import random
+
+from app.core.cache import VersionedCache
+from app.tests.grading import public_content
+
+POOL_SIZE = 32
+
+_pools = VersionedCache(maxsize=256)
+
+
+def _build_pool(test: dict) -> list[dict]:
+    question_ids = sorted(
+        test["questions"], key=lambda qid: (test["questions"][qid]["order_index"], qid)
+    )
+    k = test.get("questions_per_attempt") or len(question_ids)
+    k = min(k, len(question_ids))
+    rng = random.Random(test["id"])
+    pool = []
+    for _ in range(POOL_SIZE):
+        order = question_ids[:]
+        rng.shuffle(order)
+        order = order[:k]
+        options = {}
+        for qid in order:
+            opts = list(public_content(test["questions"][qid]["content"]).get("options") or [])
+            rng.shuffle(opts)
+            options[qid] = opts
+        pool.append(
+            {
+                "question_ids": order,
+                "questions": {qid: test["questions"][qid] for qid in order},
+                "options": options,
+            }
+        )
+    return pool
+
+
+def get_variant(test: dict, version: int, attempt_id: int) -> dict:
+    """
+    Variant of a test definition for one attempt:
+    {"question_ids": [...] in display order, "questions": {id: definition entry}, "options": {id: [...]}}.
+    """
+    key = (test["id"], version)
+    pool = _pools.get(key)
+    if pool is None:
+        pool = _build_pool(test)
+        _pools.set(key, pool, _pools.version(key))
+    return pool[attempt_id % POOL_SIZE]
+
+
+def variant_questions(test: dict, variant: dict) -> list[dict]:
+    """Questions as shown to the student (TestQuestionRead shape, no answer key), options in variant order."""
+    out = []
+    for position, qid in enumerate(variant["question_ids"]):
+        q = test["questions"][qid]
+        content = public_content(q["content"])
+        if "options" in content:
+            content["options"] = variant["options"][qid]
+        out.append(
+            {
+                "id": qid,
+                "test_id": test["id"],
+                "question_text": q["question_text"],
+                "content": content,
+                "order_index": position,
+            }
+        )
+    return out
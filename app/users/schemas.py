@@ -9,6 +9,7 @@ class UserProfile(BaseModel):
     full_name: str
     role: UserRole
     language_level: LanguageLevel | None
+    placement_level: LanguageLevel | None = None
     interface_language: InterfaceLanguage
 
     class Config:
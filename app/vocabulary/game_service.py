@@ -6,6 +6,9 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.vocabulary import Vocabulary, UserVocabulary
+from app.vocabulary.lesson_index import related_translations
+from app.progress.service import bump_progress
+from app.progress.activity import record_activity
 
 MASTERY_LEARNED = 5
 GAME_MODES = ["flashcard", "reverse", "multiple_choice"]
@@ -74,14 +77,19 @@ async def get_next_question(
         payload["prompt"] = v.word_kz
         payload["expected_language"] = "ru"
         correct = v.translation_ru
-        q_others = (
-            select(Vocabulary.translation_ru)
-            .where(Vocabulary.id != v.id)
-            .limit(10)
-        )
-        others_result = await db.execute(q_others)
-        others = list({row[0] for row in others_result.all() if row[0] != correct})
+        # Distractors from the same lessons first: same topic makes the choice non-trivial
+        others = list({t for t in await related_translations(db, v.id) if t != correct})
         random.shuffle(others)
+        if len(others) < 3:
+            q_others = (
+                select(Vocabulary.translation_ru)
+                .where(Vocabulary.id != v.id)
+                .limit(10)
+            )
+            others_result = await db.execute(q_others)
+            fill = [row[0] for row in others_result.all() if row[0] != correct and row[0] not in others]
+            random.shuffle(fill)
+            others += list(dict.fromkeys(fill))
         options = [correct] + others[:3]
         random.shuffle(options)
         payload["options"] = options[:4]
@@ -117,11 +125,14 @@ async def submit_answer(
         uv.mastery = max(uv.mastery - 1, 0)
 
     uv.last_reviewed_at = datetime.utcnow()
-    if uv.mastery >= MASTERY_LEARNED:
+    newly_learned = uv.mastery >= MASTERY_LEARNED and uv.status != "learned"
+    if newly_learned:
         uv.status = "learned"
 
     await db.flush()
     await db.refresh(uv)
+    await bump_progress(db, user_id, vocabulary_learned=int(newly_learned))
+    await record_activity(db, user_id, reviews=1)
 
     return {
         "is_correct": is_correct,
@@ -0,0 +1,184 @@
+"""
+Word <-> lesson inverted index (table lesson_vocabulary).
+Lesson content is tokenized and matched against dictionary words; rows are
+rewritten per lesson on lesson writes and per word on vocabulary writes.
+Lookups both ways are single indexed queries.
+"""
+from sqlalchemy import select, delete, func, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.lessons.content import tokenize
+from app.models.lesson import Lesson
+from app.models.vocabulary import Vocabulary, LessonVocabulary
+
+# Shorter words ("ол", "бар") must match a whole token; longer ones also match
+# inflected forms ("мұғалім" in "мұғаліммін")
+_PREFIX_MIN = 4
+
+
+class VocabularyMatcher:
+    """Finds dictionary words (single words and phrases) in tokenized text."""
+
+    def __init__(self, words: list[tuple[int, str]]):
+        self._words: dict[str, list[int]] = {}
+        self._phrases: dict[str, list[tuple[tuple[str, ...], int]]] = {}
+        for vocab_id, word_kz in words:
+            self.add(vocab_id, word_kz)
+
+    def add(self, vocab_id: int, word_kz: str) -> None:
+        tokens = tuple(tokenize(word_kz))
+        if len(tokens) == 1:
+            self._words.setdefault(tokens[0], []).append(vocab_id)
+        elif tokens:
+            self._phrases.setdefault(tokens[0], []).append((tokens, vocab_id))
+
+    def _word(self, token: str) -> str | None:
+        """Dictionary form for a token: the token itself or its longest dictionary prefix."""
+        if token in self._words:
+            return token
+        for end in range(len(token) - 1, _PREFIX_MIN - 1, -1):
+            if token[:end] in self._words:
+                return token[:end]
+        return None
+
+    @staticmethod
+    def _token_matches(token: str, word: str, last: bool) -> bool:
+        return token == word or (last and len(word) >= _PREFIX_MIN and token.startswith(word))
+
+    def count(self, text: str) -> dict[int, int]:
+        """vocabulary_id -> occurrences in text."""
+        tokens = tokenize(text)
+        counts: dict[int, int] = {}
+        for i, token in enumerate(tokens):
+            word = self._word(token)
+            if word:
+                for vocab_id in self._words[word]:
+                    counts[vocab_id] = counts.get(vocab_id, 0) + 1
+            for phrase, vocab_id in self._phrases.get(token, []):
+                window = tokens[i:i + len(phrase)]
+                if len(window) == len(phrase) and all(
+                    self._token_matches(t, w, j == len(phrase) - 1)
+                    for j, (t, w) in enumerate(zip(window, phrase))
+                ):
+                    counts[vocab_id] = counts.get(vocab_id, 0) + 1
+        return counts
+
+
+async def _load_matcher(db: AsyncSession) -> VocabularyMatcher:
+    rows = (await db.execute(select(Vocabulary.id, Vocabulary.word_kz))).all()
+    return VocabularyMatcher([(r[0], r[1]) for r in rows])
+
+
+async def _write_lesson_rows(db: AsyncSession, lesson_id: int, counts: dict[int, int]) -> None:
+    await db.execute(delete(LessonVocabulary).where(LessonVocabulary.lesson_id == lesson_id))
+    if counts:
+        await db.execute(
+            insert(LessonVocabulary),
+            [
+                {"lesson_id": lesson_id, "vocabulary_id": vid, "occurrences": n}
+                for vid, n in counts.items()
+            ],
+        )
+
+
+async def index_lesson_vocabulary(
+    db: AsyncSession, lesson: Lesson, matcher: VocabularyMatcher | None = None
+) -> None:
+    """Rewrite the index rows of one lesson after it was created or edited."""
+    matcher = matcher or await _load_matcher(db)
+    await _write_lesson_rows(db, lesson.id, matcher.count(f"{lesson.title}\n{lesson.content or ''}"))
+
+
+async def remove_lesson_vocabulary(db: AsyncSession, lesson_id: int) -> None:
+    """Drop the index rows of a deleted lesson (SQLite doesn't enforce ON DELETE CASCADE)."""
+    await db.execute(delete(LessonVocabulary).where(LessonVocabulary.lesson_id == lesson_id))
+
+
+async def index_vocabulary_words(db: AsyncSession, words: list[Vocabulary]) -> None:
+    """Match newly created dictionary words against all lessons."""
+    if not words:
+        return
+    matcher = VocabularyMatcher([(v.id, v.word_kz) for v in words])
+    lessons = (await db.execute(select(Lesson.id, Lesson.title, Lesson.content))).all()
+    rows = []
+    for lesson_id, title, content in lessons:
+        for vid, n in matcher.count(f"{title}\n{content or ''}").items():
+            rows.append({"lesson_id": lesson_id, "vocabulary_id": vid, "occurrences": n})
+    if rows:
+        await db.execute(insert(LessonVocabulary), rows)
+
+
+async def rebuild_lesson_vocabulary(db: AsyncSession) -> None:
+    """Re-index every lesson."""
+    matcher = await _load_matcher(db)
+    await db.execute(delete(LessonVocabulary))
+    lessons = (await db.execute(select(Lesson))).scalars().all()
+    for lesson in lessons:
+        await index_lesson_vocabulary(db, lesson, matcher)
+
+
+async def ensure_lesson_vocabulary(db: AsyncSession) -> None:
+    """Backfill the index at startup when it is empty but lessons and words exist."""
+    if (await db.execute(select(LessonVocabulary.lesson_id).limit(1))).first():
+        return
+    has_lessons = (await db.execute(select(func.count(Lesson.id)))).scalar() or 0
+    has_words = (await db.execute(select(func.count(Vocabulary.id)))).scalar() or 0
+    if has_lessons and has_words:
+        await rebuild_lesson_vocabulary(db)
+
+
+async def lessons_for_word(
+    db: AsyncSession, vocabulary_id: int, limit: int = 5
+) -> list[dict]:
+    """Lessons containing a word, in curriculum order: [{id, title, order_index, occurrences}]."""
+    result = await db.execute(
+        select(Lesson.id, Lesson.title, Lesson.order_index, LessonVocabulary.occurrences)
+        .join(LessonVocabulary, LessonVocabulary.lesson_id == Lesson.id)
+        .where(LessonVocabulary.vocabulary_id == vocabulary_id)
+        .order_by(Lesson.order_index, Lesson.id)
+        .limit(limit)
+    )
+    return [
+        {"id": r[0], "title": r[1], "order_index": r[2], "occurrences": r[3]}
+        for r in result.all()
+    ]
+
+
+async def lesson_contains_word(db: AsyncSession, lesson_id: int, vocabulary_id: int) -> bool:
+    result = await db.execute(
+        select(LessonVocabulary.lesson_id).where(
+            LessonVocabulary.lesson_id == lesson_id,
+            LessonVocabulary.vocabulary_id == vocabulary_id,
+        )
+    )
+    return result.first() is not None
+
+
+async def words_for_lesson(db: AsyncSession, lesson_id: int) -> list[int]:
+    """Vocabulary ids used in a lesson, most frequent first."""
+    result = await db.execute(
+        select(LessonVocabulary.vocabulary_id)
+        .where(LessonVocabulary.lesson_id == lesson_id)
+        .order_by(LessonVocabulary.occurrences.desc(), LessonVocabulary.vocabulary_id)
+    )
+    return [r[0] for r in result.all()]
+
+
+async def related_translations(
+    db: AsyncSession, vocabulary_id: int, limit: int = 10
+) -> list[str]:
+    """Translations of other words that share a lesson with this one (game distractors)."""
+    other = LessonVocabulary.__table__.alias("other")
+    result = await db.execute(
+        select(Vocabulary.translation_ru)
+        .select_from(LessonVocabulary)
+        .join(other, other.c.lesson_id == LessonVocabulary.lesson_id)
+        .join(Vocabulary, Vocabulary.id == other.c.vocabulary_id)
+        .where(
+            LessonVocabulary.vocabulary_id == vocabulary_id,
+            other.c.vocabulary_id != vocabulary_id,
+        )
+        .distinct()
+        .limit(limit)
+    )
+    return [r[0] for r in result.all()]
@@ -8,6 +8,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import get_db
 from app.core.deps import get_current_user
 from app.models.user import User
+from app.models.lesson import Lesson
 from app.models.vocabulary import Vocabulary, UserVocabulary
 from app.vocabulary.schemas import (
     UserVocabularyAdd,
@@ -16,8 +17,10 @@ from app.vocabulary.schemas import (
     GameAnswerRequest,
     GameAnswerResponse,
 )
-from app.vocabulary.service import add_word_to_user
+from app.vocabulary.service import add_word_to_user, add_lesson_words_to_user
+from app.lessons.service import get_completed_lesson_ids, get_prerequisites_map, lesson_is_accessible
 from app.vocabulary.game_service import get_next_question, submit_answer
+from app.progress.service import bump_progress
 
 router = APIRouter(prefix="/vocabulary", tags=["vocabulary"])
 
@@ -90,6 +93,24 @@ async def add_word(
     )
 
 
+@router.post("/lessons/{lesson_id}")
+async def add_lesson_words(
+    lesson_id: int,
+    current_user: Annotated[User, Depends(get_current_user)],
+    db: Annotated[AsyncSession, Depends(get_db)],
+):
+    """Add all dictionary words used in a lesson to personal vocabulary."""
+    result = await db.execute(select(Lesson.id).where(Lesson.id == lesson_id))
+    if not result.first():
+        raise HTTPException(status_code=404, detail="Lesson not found")
+    completed = await get_completed_lesson_ids(db, current_user.id)
+    prereq_map = await get_prerequisites_map(db)
+    accessible, _ = lesson_is_accessible(lesson_id, completed, prereq_map)
+    if not accessible:
+        raise HTTPException(status_code=403, detail="Complete prerequisite lessons first")
+    return await add_lesson_words_to_user(db, current_user.id, lesson_id)
+
+
 @router.get("/game/next")
 async def game_next(
     current_user: Annotated[User, Depends(get_current_user)],
@@ -136,8 +157,10 @@ async def update_status(
     uv = result.scalar_one_or_none()
     if not uv:
         raise HTTPException(status_code=404, detail="Not found")
+    learned_delta = int(data.status == "learned") - int(uv.status == "learned")
     uv.status = data.status
     await db.flush()
+    await bump_progress(db, current_user.id, vocabulary_learned=learned_delta)
     return {"status": "ok"}
 
 
@@ -158,4 +181,11 @@ async def remove_word(
     if not uv:
         raise HTTPException(status_code=404, detail="Not found")
     await db.delete(uv)
+    await db.flush()
+    await bump_progress(
+        db,
+        current_user.id,
+        vocabulary_size=-1,
+        vocabulary_learned=-int(uv.status == "learned"),
+    )
     return {"status": "ok"}
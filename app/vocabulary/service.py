@@ -1,9 +1,11 @@
 """Vocabulary business logic."""
 import re
-from sqlalchemy import select, or_
+from sqlalchemy import select, or_, insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.vocabulary import Vocabulary, UserVocabulary
+from app.progress.service import bump_progress
+from app.vocabulary.lesson_index import index_vocabulary_words, words_for_lesson
 
 
 async def lookup_word(db: AsyncSession, query: str) -> dict | None:
@@ -146,6 +148,7 @@ async def add_word_to_user(
         )
         db.add(vocab)
         await db.flush()
+        await index_vocabulary_words(db, [vocab])
         uv = UserVocabulary(
             user_id=user_id,
             vocabulary_id=vocab.id,
@@ -154,4 +157,36 @@ async def add_word_to_user(
     db.add(uv)
     await db.flush()
     await db.refresh(uv)
+    await bump_progress(db, user_id, vocabulary_size=1)
     return uv
+
+
+async def add_lesson_words_to_user(db: AsyncSession, user_id: int, lesson_id: int) -> dict:
+    """Add every dictionary word used in a lesson to user vocabulary. Returns {added, total}."""
+    vocab_ids = await words_for_lesson(db, lesson_id)
+    if not vocab_ids:
+        return {"added": 0, "total": 0}
+    existing = await db.execute(
+        select(UserVocabulary.vocabulary_id).where(
+            UserVocabulary.user_id == user_id,
+            UserVocabulary.vocabulary_id.in_(vocab_ids),
+        )
+    )
+    have = {r[0] for r in existing.all()}
+    new_ids = [vid for vid in vocab_ids if vid not in have]
+    if new_ids:
+        await db.execute(
+            insert(UserVocabulary),
+            [
+                {
+                    "user_id": user_id,
+                    "vocabulary_id": vid,
+                    "status": "in_progress",
+                    "mastery": 0,
+                    "source": "lesson",
+                }
+                for vid in new_ids
+            ],
+        )
+        await bump_progress(db, user_id, vocabulary_size=len(new_ids))
+    return {"added": len(new_ids), "total": len(vocab_ids)}
@@ -56,6 +56,7 @@ const api = {
     list: () => request('/lessons/'),
     get: (id) => request(`/lessons/${id}`),
     getNext: (id) => request(`/lessons/${id}/next`),
+    bundle: (id) => request(`/lessons/${id}/bundle`),
     complete: (id) => request(`/lessons/${id}/complete`, { method: 'POST' }),
   },
   exercises: {
@@ -67,6 +68,11 @@ const api = {
         method: 'POST',
         body: JSON.stringify({ user_answer: userAnswer }),
       }),
+    submitBatch: (items) =>
+      request('/exercises/attempts/batch', {
+        method: 'POST',
+        body: JSON.stringify({ items }),
+      }),
   },
   tests: {
     list: (lessonId) =>
@@ -80,6 +86,12 @@ const api = {
         method: 'POST',
         body: JSON.stringify({ answers }),
       }),
+    getAttemptQuestions: (attemptId) => request(`/tests/attempts/${attemptId}/questions`),
+    saveAnswers: (attemptId, answers) =>
+      request(`/tests/attempts/${attemptId}/answers`, {
+        method: 'PUT',
+        body: JSON.stringify({ answers }),
+      }),
     getAttempt: (attemptId) => request(`/tests/attempts/${attemptId}`),
   },
   assistant: {
@@ -103,6 +115,8 @@ const api = {
         body: JSON.stringify({ status }),
       }),
     remove: (id) => request(`/vocabulary/${id}`, { method: 'DELETE' }),
+    addLessonWords: (lessonId) =>
+      request(`/vocabulary/lessons/${lessonId}`, { method: 'POST' }),
     gameNext: (lastVocabId) =>
       request(lastVocabId ? `/vocabulary/game/next?last_vocab_id=${lastVocabId}` : '/vocabulary/game/next'),
     gameAnswer: (vocabId, mode, userAnswer) =>
@@ -113,9 +127,16 @@ const api = {
   },
   progress: {
     summary: () => request('/progress/summary'),
+    timeseries: (days = 30) => request(`/progress/timeseries?days=${days}`),
+    leaderboard: (period = 'weekly', limit = 10) =>
+      request(`/progress/leaderboard?period=${period}&limit=${limit}`),
   },
   recommendations: {
-    list: () => request('/recommendations/'),
+    list: (cursor = null, limit = 20, unread = false) =>
+      request(`/recommendations/?limit=${limit}${unread ? '&unread=true' : ''}${cursor ? '&cursor=' + encodeURIComponent(cursor) : ''}`),
+    unreadCount: () => request('/recommendations/unread-count'),
+    markManyRead: (ids = null) =>
+      request('/recommendations/read', { method: 'POST', body: JSON.stringify({ ids }) }),
     markRead: (id) =>
       request(`/recommendations/${id}/read`, { method: 'PATCH' }),
   },
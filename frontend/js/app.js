@@ -90,7 +90,14 @@
 
   // Dashboard
   async function renderDashboard(el) {
-    const prog = await api.progress.summary();
+    const [prog, unread] = await Promise.all([api.progress.summary(), api.recommendations.unreadCount()]);
+    const recs = unread.unread ? await api.recommendations.list(null, 5, true) : { items: [] };
+    const recItems = recs.items.map((r) => `
+      <li style="margin-bottom: 0.5rem;">
+        ${r.target_lesson_id ? `<a href="/lesson/${r.target_lesson_id}">${escapeHtml(r.title)}</a>` : escapeHtml(r.title)}
+        ${r.description ? `<div style="color: #64748b; font-size: 0.875rem;">${escapeHtml(r.description)}</div>` : ''}
+      </li>
+    `).join('');
     const acc = prog.exercise_attempts
       ? Math.round((prog.exercise_correct / prog.exercise_attempts) * 100)
       : 0;
@@ -119,6 +126,12 @@
           <div class="stat-label">Слов изучено</div>
         </div>
       </div>
+      ${unread.unread ? `
+      <div class="card">
+        <h2>Рекомендации <span class="badge badge-success">${unread.unread}</span></h2>
+        <ul style="margin: 0 0 1rem 1.25rem; padding: 0;">${recItems}</ul>
+        <button type="button" class="btn" id="recsReadAll">Отметить все как прочитанные</button>
+      </div>` : ''}
       <div class="card">
         <h2>Быстрые действия</h2>
         <div class="quick-actions">
@@ -129,6 +142,13 @@
         </div>
       </div>
     `;
+    const readAll = document.getElementById('recsReadAll');
+    if (readAll) {
+      readAll.addEventListener('click', async () => {
+        await api.recommendations.markManyRead();
+        await renderDashboard(el);
+      });
+    }
   }
 
   // Lessons
@@ -164,10 +184,12 @@
   function showLesson(id) {
     const content = document.getElementById('content');
     content.innerHTML = '<div class="loading">Загрузка урока...</div>';
-    Promise.all([api.lessons.get(id), api.lessons.getNext(id)]).then(async ([lesson, nextInfo]) => {
+    api.lessons.bundle(id).then(async (bundle) => {
+      const lesson = bundle.lesson;
+      const nextInfo = bundle.next_lesson;
+      const tests = bundle.tests || [];
       let finalTestHtml = '';
-      try {
-        const tests = await api.tests.list(id);
+      {
         const finalTest = tests.find((t) => t.is_final);
         if (finalTest) {
           finalTestHtml = `
@@ -177,7 +199,7 @@
               <button class="btn" id="finalTestBtn">Пройти итоговый тест</button>
             </div>`;
         }
-      } catch (_) {}
+      }
       content.innerHTML = `
         <div class="card">
           <div style="margin-bottom: 1rem;">
@@ -191,6 +213,7 @@
           ${finalTestHtml}
           <div class="btn-group" style="margin-top: 1rem;">
             <button class="btn btn-success" id="completeBtn">Завершить урок</button>
+            <button class="btn btn-secondary" id="addLessonWordsBtn">Слова урока в словарь</button>
             <a href="/chat?lesson_id=${lesson.id}" class="btn btn-secondary">Спросить помощника</a>
           </div>
           <div class="card" style="margin-top: 1rem; background: #f8fafc;">
@@ -207,7 +230,6 @@
       `;
       const finalTestBtn = document.getElementById('finalTestBtn');
       if (finalTestBtn) {
-        const tests = await api.tests.list(id);
         const ft = tests.find((t) => t.is_final);
         if (ft) {
           finalTestBtn.onclick = async () => {
@@ -226,6 +248,16 @@
           alert(err.data?.detail || err.message || 'Ошибка');
         }
       };
+      document.getElementById('addLessonWordsBtn').onclick = async () => {
+        const btn = document.getElementById('addLessonWordsBtn');
+        try {
+          const res = await api.vocabulary.addLessonWords(id);
+          btn.textContent = res.total ? `Добавлено слов: ${res.added} из ${res.total}` : 'В уроке нет слов из словаря';
+          btn.disabled = true;
+        } catch (err) {
+          alert(err.data?.detail || err.message || 'Ошибка');
+        }
+      };
 
       const lessonChatForm = document.getElementById('lessonChatForm');
       const lessonChatInput = document.getElementById('lessonChatInput');
@@ -380,7 +412,7 @@
 
   async function runTest(attemptId, testId) {
     const content = document.getElementById('content');
-    const questions = await api.tests.getQuestions(testId);
+    const questions = await api.tests.getAttemptQuestions(attemptId);
     if (!questions.length) {
       content.innerHTML = '<div class="card"><div class="empty-state"><p>Нет вопросов в тесте.</p></div></div>';
       return;
@@ -398,6 +430,24 @@
     });
     html += '<button type="submit" class="btn">Отправить тест</button></form><div id="testResult" style="margin-top: 1rem;"></div></div>';
     content.innerHTML = html;
+    // Autosave: send changed answers in small batches while the test is in progress
+    const changed = new Map();
+    let saveTimer = null;
+    const saveChanged = () => {
+      saveTimer = null;
+      if (!changed.size) return;
+      const batch = [...changed.values()];
+      changed.clear();
+      api.tests.saveAnswers(attemptId, batch).catch(() => {});
+    };
+    const onAnswerChange = (e) => {
+      const m = (e.target.name || '').match(/^q_(\d+)$/);
+      if (!m) return;
+      changed.set(m[1], { question_id: parseInt(m[1], 10), user_answer: { answer: e.target.value } });
+      if (!saveTimer) saveTimer = setTimeout(saveChanged, 1500);
+    };
+    document.getElementById('testForm').addEventListener('change', onAnswerChange);
+    document.getElementById('testForm').addEventListener('input', onAnswerChange);
     document.getElementById('testForm').onsubmit = async (e) => {
       e.preventDefault();
       const form = e.target;
@@ -406,11 +456,19 @@
         const val = el ? (el.type === 'radio' ? (form.querySelector('input[name="q_' + q.id + '"]:checked')?.value || '') : el.value) : '';
         return { question_id: q.id, user_answer: { answer: val } };
       });
+      if (saveTimer) clearTimeout(saveTimer);
+      saveTimer = null;
+      changed.clear();
       try {
         const res = await api.tests.submitAttempt(attemptId, answers);
         document.getElementById('testResult').innerHTML =
           '<div class="' + (res.passed ? 'success' : 'error') + '">Результат: ' + res.score + '%. ' + (res.passed ? 'Тест сдан!' : 'Для сдачи нужно ≥70%. Попробуйте ещё раз.') + '</div>' +
           (!res.passed ? '<p style="margin-top: 0.5rem;"><a href="/tests" class="btn btn-secondary">К списку тестов (пройти снова)</a></p>' : '');
+        const review = await api.tests.getAttempt(attemptId);
+        document.getElementById('testResult').innerHTML += '<div style="margin-top: 1rem;">' + review.answers.map((a, i) =>
+          `<p>${i + 1}. ${escapeHtml(a.question_text)}<br>${a.is_correct ? '✓' : '✗'} ${escapeHtml(String(a.user_answer?.answer ?? ''))}` +
+          (a.correct_answer != null && !a.is_correct ? ` — правильно: ${escapeHtml(String(a.correct_answer))}` : '') + '</p>'
+        ).join('') + '</div>';
       } catch (err) {
         document.getElementById('testResult').innerHTML = '<div class="error">' + escapeHtml(err.data?.detail || err.message) + '</div>';
       }
@@ -737,7 +795,20 @@
 
   // Progress
   async function renderProgress(el) {
-    const prog = await api.progress.summary();
+    const [prog, activity, board] = await Promise.all([
+      api.progress.summary(),
+      api.progress.timeseries(30),
+      api.progress.leaderboard('weekly', 10),
+    ]);
+    const boardRows = board.entries.map((e) => `
+      <tr${e.user_id === user?.id ? ' style="font-weight: 600;"' : ''}>
+        <td>${e.rank}</td><td>${escapeHtml(e.full_name || '')}</td><td>${e.xp} XP</td>
+      </tr>
+    `).join('');
+    const maxMinutes = Math.max(1, ...activity.days.map((d) => d.minutes));
+    const bars = activity.days.map((d) => `
+      <div title="${d.day}: ${d.minutes} мин" style="flex: 1; background: #3b82f6; border-radius: 2px; height: ${Math.round((d.minutes / maxMinutes) * 100)}%; min-height: ${d.minutes ? 2 : 0}px;"></div>
+    `).join('');
     const acc = prog.exercise_attempts ? Math.round((prog.exercise_correct / prog.exercise_attempts) * 100) : 0;
     el.innerHTML = `
       <h1 class="page-title">Прогресс и статистика</h1>
@@ -770,6 +841,23 @@
           <div class="stat-value">${prog.vocabulary_learned}</div>
           <div class="stat-label">Изучено слов</div>
         </div>
+        <div class="stat-card">
+          <div class="stat-value">${activity.current_streak}</div>
+          <div class="stat-label">Дней подряд</div>
+        </div>
+        <div class="stat-card">
+          <div class="stat-value">${activity.active_days}</div>
+          <div class="stat-label">Активных дней за 30 дней</div>
+        </div>
+      </div>
+      <div class="card">
+        <h2>Активность за 30 дней (минуты)</h2>
+        <div style="display: flex; align-items: flex-end; gap: 2px; height: 120px;">${bars}</div>
+      </div>
+      <div class="card">
+        <h2>Рейтинг недели</h2>
+        <p style="color: #64748b;">Ваше место: ${board.my_rank ?? '—'} из ${board.total}, ${board.my_xp} XP</p>
+        <table style="width: 100%;">${boardRows}</table>
       </div>
     `;
   }
@@ -7,7 +7,16 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 
-from app.core.database import init_db
+from app.core.config import get_settings
+from app.core.database import init_db, async_session_maker
+from app.core.tasks import PeriodicTask
+from app.lessons.service import build_lesson_indexes
+from app.tests.autosave import flush_buffered_answers
+from app.cohort.aggregation import run_cohort_aggregation
+from app.progress.leaderboard import load_leaderboards, persist_leaderboards
+from app.recommendations.service import run_recommendations
+from app.recommendations.events import recommendation_worker
+from app.logging_mod.service import audit_log_worker
 from app.auth.router import router as auth_router
 from app.users.router import router as users_router
 from app.lessons.router import router as lessons_router
@@ -19,13 +28,38 @@ from app.progress.router import router as progress_router
 from app.recommendations.router import router as recommendations_router
 from app.logging_mod.router import router as logs_router
 from app.files.router import router as files_router
+from app.cohort.router import router as cohort_router
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Initialize DB on startup."""
+    """Initialize DB, lesson indexes and leaderboards on startup; run background jobs until shutdown."""
     await init_db()
+    audit_log_worker.start()
+    async with async_session_maker() as db:
+        await build_lesson_indexes(db)
+        await load_leaderboards(db)
+        await db.commit()
+    tasks = [
+        PeriodicTask("autosave-flush", get_settings().AUTOSAVE_FLUSH_SECONDS, flush_buffered_answers),
+        PeriodicTask(
+            "cohort-aggregate", get_settings().COHORT_AGGREGATE_SECONDS, run_cohort_aggregation, run_on_stop=False
+        ),
+        PeriodicTask("leaderboard-persist", get_settings().LEADERBOARD_PERSIST_SECONDS, persist_leaderboards),
+        PeriodicTask(
+            "recommendations", get_settings().RECOMMENDATIONS_SECONDS, run_recommendations, run_on_stop=False
+        ),
+    ]
+    for task in tasks:
+        task.start()
+    recommendation_worker.start()
     yield
+    # Queued events are processed before the jobs stop; the flushing jobs (autosave,
+    # leaderboard persist) run once more so buffered writes are saved
+    await recommendation_worker.stop()
+    for task in tasks:
+        await task.stop()
+    await audit_log_worker.stop()
 
 
 app = FastAPI(
@@ -53,6 +87,7 @@ app.include_router(progress_router, prefix="/api")
 app.include_router(recommendations_router, prefix="/api")
 app.include_router(logs_router, prefix="/api")
 app.include_router(files_router, prefix="/api")
+app.include_router(cohort_router, prefix="/api")
 
 # Serve frontend static assets
 app.mount("/static", StaticFiles(directory="frontend"), name="static")
@@ -0,0 +1,152 @@
+"""
+Benchmark the teacher cohort views on a synthetic database.
+Run: python -m scripts.bench_cohort [students] [attempts] [db_path]
+Defaults: 50k students, 5M attempts (90% exercises, 10% tests) in a temporary SQLite
+file; the app database is never touched. Generates the source tables, runs the full
+aggregation once, then an incremental run, then times the read paths (p50/p95).
+"""
+import asyncio
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+LESSONS = 60
+EXERCISES_PER_LESSON = 10
+
+
+def generate(path: str, students: int, attempts: int) -> None:
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=OFF")
+    conn.execute("PRAGMA synchronous=OFF")
+    now = datetime.utcnow()
+    ts = lambda: (now - timedelta(minutes=random.randint(60, 60 * 24 * 90))).isoformat(" ")
+    conn.executemany(
+        "INSERT INTO lessons (id, title, level, topic, content, order_index, created_at, updated_at) VALUES (?,?,?,?,?,?,?,?)",
+        [(i, f"Lesson {i}", "A1", "", "", i, now, now) for i in range(1, LESSONS + 1)],
+    )
+    conn.executemany(
+        "INSERT INTO exercises (id, lesson_id, title, exercise_type, content, order_index, retry_allowed, created_at, updated_at)"
+        " VALUES (?,?,?,?,?,?,?,?,?)",
+        [
+            (i, (i - 1) // EXERCISES_PER_LESSON + 1, f"Exercise {i}", "multiple_choice", "{}", 0, 1, now, now)
+            for i in range(1, LESSONS * EXERCISES_PER_LESSON + 1)
+        ],
+    )
+    conn.executemany(
+        "INSERT INTO tests (id, lesson_id, title, passing_score, is_final, created_at, updated_at) VALUES (?,?,?,?,?,?,?)",
+        [(i, i, f"Test {i}", 70.0, 1, now, now) for i in range(1, LESSONS + 1)],
+    )
+    conn.executemany(
+        "INSERT INTO users (id, email, hashed_password, full_name, role, interface_language, is_active, created_at, updated_at)"
+        " VALUES (?,?,?,?,?,?,?,?,?)",
+        [(i, f"s{i}@bench", "x", f"Student {i}", "STUDENT", "RUSSIAN", 1, now, now) for i in range(1, students + 1)],
+    )
+    # Per-student skill so some students struggle
+    skill = [random.betavariate(5, 2) for _ in range(students + 1)]
+    n_tests = attempts // 10
+    batch = []
+    for i in range(attempts - n_tests):
+        uid = random.randint(1, students)
+        batch.append((uid, random.randint(1, LESSONS * EXERCISES_PER_LESSON), "{}", random.random() < skill[uid], ts()))
+        if len(batch) == 100_000:
+            conn.executemany(
+                "INSERT INTO exercise_attempts (user_id, exercise_id, user_answer, is_correct, created_at) VALUES (?,?,?,?,?)", batch
+            )
+            batch = []
+    if batch:
+        conn.executemany(
+            "INSERT INTO exercise_attempts (user_id, exercise_id, user_answer, is_correct, created_at) VALUES (?,?,?,?,?)", batch
+        )
+    rows = []
+    for _ in range(n_tests):
+        uid = random.randint(1, students)
+        score = round(min(100.0, max(0.0, random.gauss(skill[uid] * 100, 15))), 2)
+        at = ts()
+        rows.append((uid, random.randint(1, LESSONS), score, score >= 70, at, at))
+    conn.executemany(
+        "INSERT INTO test_attempts (user_id, test_id, score, passed, started_at, completed_at) VALUES (?,?,?,?,?,?)", rows
+    )
+    completions = {(uid, lid) for uid, lid, score, passed, _, _ in rows if passed}
+    conn.executemany(
+        "INSERT INTO lesson_completions (user_id, lesson_id, completed_at) VALUES (?,?,?)",
+        [(uid, lid, now - timedelta(hours=1)) for uid, lid in sorted(completions)],
+    )
+    conn.commit()
+    conn.close()
+
+
+def timed(label: str, samples: list[float]) -> None:
+    samples = sorted(samples)
+    p95 = samples[max(0, int(len(samples) * 0.95) - 1)]
+    print(f"{label:<36} p50 {statistics.median(samples) * 1000:7.2f} ms   p95 {p95 * 1000:7.2f} ms")
+
+
+async def main(students: int, attempts: int, path: str) -> None:
+    from app.core.database import init_db, async_session_maker
+    from app.cohort.aggregation import aggregate_cohort
+    from app.cohort.service import get_cohort_overview, list_lesson_funnel, list_students
+
+    await init_db()
+    t = time.perf_counter()
+    generate(path, students, attempts)
+    print(f"generated {students:,} students, {attempts:,} attempts in {time.perf_counter() - t:.1f} s")
+
+    async with async_session_maker() as db:
+        t = time.perf_counter()
+        stats = await aggregate_cohort(db)
+        print(f"full aggregation: {stats} in {time.perf_counter() - t:.1f} s")
+
+    conn = sqlite3.connect(path)
+    at = (datetime.utcnow() - timedelta(minutes=1)).isoformat(" ")
+    conn.executemany(
+        "INSERT INTO exercise_attempts (user_id, exercise_id, user_answer, is_correct, created_at) VALUES (?,?,?,?,?)",
+        [(random.randint(1, students), random.randint(1, LESSONS * EXERCISES_PER_LESSON), "{}", random.random() < 0.7, at)
+         for _ in range(10_000)],
+    )
+    conn.commit()
+    conn.close()
+    async with async_session_maker() as db:
+        t = time.perf_counter()
+        stats = await aggregate_cohort(db)
+        print(f"incremental run (10k new attempts): {stats} in {time.perf_counter() - t:.2f} s")
+
+    reads = {
+        "overview": lambda db: get_cohort_overview(db),
+        "lessons page (20)": lambda db: list_lesson_funnel(db, 20, 20),
+        "students page (50)": lambda db: list_students(db, 50),
+        "struggling page 1 (50)": lambda db: list_students(db, 50, None, True),
+    }
+    async with async_session_maker() as db:
+        page = await list_students(db, 50, None, True)
+        if page["next_cursor"]:
+            cursor = page["next_cursor"]
+            reads["struggling page 2 (50)"] = lambda db: list_students(db, 50, cursor, True)
+        for label, fn in reads.items():
+            samples = []
+            for _ in range(30):
+                t = time.perf_counter()
+                await fn(db)
+                samples.append(time.perf_counter() - t)
+            timed(label, samples)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    n_students = int(args[0]) if len(args) > 0 else 50_000
+    n_attempts = int(args[1]) if len(args) > 1 else 5_000_000
+    db_path = args[2] if len(args) > 2 else os.path.join(tempfile.mkdtemp(), "bench_cohort.db")
+    if Path(db_path).exists():
+        sys.exit(f"{db_path} exists; pass a new path")
+    # Must be set before the app modules create their engine
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{db_path}"
+    random.seed(42)
+    print(f"database: {db_path}")
+    asyncio.run(main(n_students, n_attempts, db_path))
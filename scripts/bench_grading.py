@@ -0,0 +1,78 @@
+"""
+Benchmark test grading: compiled graders vs compiling per answer.
+Run: python -m scripts.bench_grading [answers]
+Scores batches of synthetic answers (default 10k) across all question types.
+"""
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.tests.grading import compile_grader, get_grader, grade_answers
+
+
+def make_questions(n: int = 20) -> dict[int, dict]:
+    contents = []
+    for i in range(n):
+        kind = i % 4
+        if kind == 0:
+            contents.append({"type": "multiple_choice", "options": ["сәлем", "рақмет", "сау бол"], "correct_answer": "сәлем"})
+        elif kind == 1:
+            contents.append({"type": "fill_blank", "correct_answer": "Кітап", "accepted_answers": ["кітапты", "кiтап"]})
+        elif kind == 2:
+            contents.append({"type": "matching", "pairs": {"үй": "дом", "су": "вода", "нан": "хлеб", "ат": "лошадь"}})
+        else:
+            contents.append({"type": "ordering", "correct_answer": ["Мен", "кітап", "оқимын"], "points": 2})
+    return {
+        qid: {"content": c, "points": c.get("points", 1.0), "grade": get_grader(qid, 0, c)}
+        for qid, c in enumerate(contents, 1)
+    }
+
+
+def make_answers(questions: dict[int, dict], n: int) -> list[dict]:
+    samples = {
+        "multiple_choice": ["сәлем", "рақмет"],
+        "fill_blank": [" кітап ", "Кітапты!", "дәптер"],
+        "matching": [{"үй": "дом", "су": "вода", "нан": "хлеб", "ат": "лошадь"}, {"үй": "вода", "су": "дом"}],
+        "ordering": [["Мен", "кітап", "оқимын"], ["кітап", "Мен", "оқимын"]],
+    }
+    qids = list(questions)
+    out = []
+    for _ in range(n):
+        qid = random.choice(qids)
+        value = random.choice(samples[questions[qid]["content"]["type"]])
+        out.append({"question_id": qid, "user_answer": {"answer": value}})
+    return out
+
+
+def bench(label: str, fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t)
+    print(f"{label:<32} {best * 1000:8.2f} ms")
+    return best
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    random.seed(42)
+    questions = make_questions()
+    answers = make_answers(questions, n)
+    print(f"{n} answers, {len(questions)} questions")
+
+    def uncompiled():
+        for ans in answers:
+            q = questions[ans["question_id"]]
+            compile_grader(q["content"])(ans["user_answer"]["answer"])
+
+    t_naive = bench("compile per answer", uncompiled)
+    t_fast = bench("grade_answers (compiled)", lambda: grade_answers(questions, answers))
+    print(f"speedup x{t_naive / t_fast:.1f}, {n / t_fast:,.0f} answers/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+"""
+Generate recommendations now instead of waiting for the periodic job:
+python -m scripts.generate_recommendations [--all]
+--all evaluates every student, not only those active since the last run.
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.database import async_session_maker
+from app.recommendations.service import generate_recommendations
+
+
+async def main(all_students: bool) -> None:
+    async with async_session_maker() as db:
+        stats = await generate_recommendations(db, all_students)
+    print(f"Students evaluated: {stats['users']}, recommendations created: {stats['created']}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main("--all" in sys.argv[1:]))
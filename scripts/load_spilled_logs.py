@@ -0,0 +1,24 @@
+"""
+Load audit log entries spilled to a file while the buffer was full or the database
+unavailable (AUDIT_LOG_SPILL_FILE), then remove the file. Lines that cannot be
+loaded are moved to AUDIT_LOG_SPILL_FILE + ".rejected":
+python -m scripts.load_spilled_logs [path]
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.database import async_session_maker
+from app.logging_mod.service import load_spilled_logs
+
+
+async def main(path: str | None) -> None:
+    async with async_session_maker() as db:
+        loaded, rejected = await load_spilled_logs(db, path)
+    print(f"Log entries loaded: {loaded}, rejected: {rejected}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(sys.argv[1] if len(sys.argv) > 1 else None))
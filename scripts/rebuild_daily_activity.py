@@ -0,0 +1,24 @@
+"""
+Rebuild user_daily_activity from lesson completions, exercise attempts and completed
+tests. Run after migrating an existing database:
+python -m scripts.rebuild_daily_activity [user_id]
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.database import async_session_maker
+from app.progress.activity import rebuild_daily_activity
+
+
+async def main(user_id: int | None) -> None:
+    async with async_session_maker() as db:
+        written = await rebuild_daily_activity(db, user_id)
+        await db.commit()
+    print(f"Activity rows written: {written}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else None))
@@ -0,0 +1,24 @@
+"""
+Rebuild the user_exercise_progress rollup from exercise_attempts.
+Run on databases created with create_all (migration 011 backfills by itself):
+python -m scripts.rebuild_exercise_progress [user_id]
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.database import async_session_maker
+from app.exercises.progress import rebuild_exercise_progress
+
+
+async def main(user_id: int | None) -> None:
+    async with async_session_maker() as db:
+        written = await rebuild_exercise_progress(db, user_id)
+        await db.commit()
+    print(f"Progress rows written: {written}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else None))
@@ -0,0 +1,24 @@
+"""
+Rebuild test question analytics (test_question_stats, test_question_option_stats)
+from stored answers. Run after migrating an existing database:
+python -m scripts.rebuild_item_stats [test_id]
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.database import async_session_maker
+from app.tests.analytics import rebuild_test_analytics
+
+
+async def main(test_id: int | None) -> None:
+    async with async_session_maker() as db:
+        counted = await rebuild_test_analytics(db, test_id)
+        await db.commit()
+    print(f"Attempts counted: {counted}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else None))
@@ -0,0 +1,24 @@
+"""
+Rebuild user_progress_counters from the source tables (lesson completions,
+exercise and test attempts, user vocabulary). Safe to run at any time, e.g. nightly:
+python -m scripts.reconcile_progress [user_id]
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.database import async_session_maker
+from app.progress.service import reconcile_progress
+
+
+async def main(user_id: int | None) -> None:
+    async with async_session_maker() as db:
+        written = await reconcile_progress(db, user_id)
+        await db.commit()
+    print(f"Counter rows written: {written}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else None))